@@ -0,0 +1,113 @@
+from collections import Counter
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+REBUILD_BATCH_SIZE = 1000
+
+
+def departure_day(departure_time):
+    """Return the day a flight counts for in ``RouteDailyLoad``."""
+    from airport.models import Flight
+
+    return timezone.localdate(
+        Flight._meta.get_field("departure_time").to_python(departure_time)
+    )
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _route_day_totals():
+    return dict(
+        flights=Count("id"),
+        seats=Sum(F("airplane__rows") * F("airplane__seats_in_row")),
+        sold=Sum("tickets_sold"),
+    )
+
+
+def refresh_route_days(route_days):
+    """Recompute the ``RouteDailyLoad`` rows of ``(route_id, day)`` keys.
+
+    Each key costs one aggregate over the flights of that route and day.
+    Rows of days left without flights are deleted.
+    """
+    from airport.models import Flight, RouteDailyLoad
+
+    for route_id, day in sorted(set(route_days)):
+        flights = Flight.objects.filter(
+            route_id=route_id,
+            departure_time__gte=_day_start(day),
+            departure_time__lt=_day_start(day + timedelta(days=1)),
+        )
+        totals = flights.aggregate(**_route_day_totals())
+        if not totals["flights"]:
+            RouteDailyLoad.objects.filter(route_id=route_id, day=day).delete()
+            continue
+        RouteDailyLoad.objects.update_or_create(
+            route_id=route_id, day=day, defaults=totals
+        )
+
+
+def record_sold_seats(changes):
+    """Apply ``(route_id, departure_time, count)`` sold seat changes.
+
+    Changes of one route and day become a single ``UPDATE`` with an
+    increment, issued in key order so concurrent orders lock the rows in
+    the same order. Keys without a row yet are recomputed instead, so call
+    this after ``tickets_sold`` of the flights was written.
+    """
+    from airport.models import RouteDailyLoad
+
+    deltas = Counter()
+    for route_id, departure_time, count in changes:
+        deltas[route_id, departure_day(departure_time)] += count
+
+    missing = []
+    for (route_id, day), delta in sorted(deltas.items()):
+        if not delta:
+            continue
+        updated = RouteDailyLoad.objects.filter(
+            route_id=route_id, day=day
+        ).update(sold=F("sold") + delta)
+        if not updated:
+            missing.append((route_id, day))
+    refresh_route_days(missing)
+
+
+def rebuild_route_loads(first_day=None, last_day=None):
+    """Recompute every ``RouteDailyLoad`` row, or those of a day range.
+
+    Uses one grouped query over the flights and replaces the rows in a
+    single transaction. Returns the number of rows written.
+    """
+    from airport.models import Flight, RouteDailyLoad
+
+    loads = RouteDailyLoad.objects.all()
+    flights = Flight.objects.all()
+    if first_day is not None:
+        loads = loads.filter(day__gte=first_day)
+        flights = flights.filter(departure_time__gte=_day_start(first_day))
+    if last_day is not None:
+        loads = loads.filter(day__lte=last_day)
+        flights = flights.filter(
+            departure_time__lt=_day_start(last_day + timedelta(days=1))
+        )
+
+    rows = (
+        flights.annotate(day=TruncDate("departure_time"))
+        .values("route_id", "day")
+        .annotate(**_route_day_totals())
+        .order_by()
+    )
+    with transaction.atomic():
+        loads.delete()
+        created = RouteDailyLoad.objects.bulk_create(
+            (RouteDailyLoad(**row) for row in rows.iterator()),
+            batch_size=REBUILD_BATCH_SIZE,
+        )
+    return len(created)
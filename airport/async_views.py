@@ -0,0 +1,129 @@
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from airport.models import Flight
+from airport.replicas import choose_replica, reads_from
+from airport.serializers import FlightListSerializer, FlightDetailSerializer
+from airport.views import (
+    FlightPagination,
+    FlightViewSet,
+    annotate_tickets_available,
+    filter_flights,
+)
+from user.authentication import StatelessJWTAuthentication
+
+
+class AsyncReadView(View):
+    """Base class for read-only endpoints served by the async ORM.
+
+    Under ASGI these views never hold a worker thread while waiting on the
+    database or on a slow client. Authentication, throttling and error
+    bodies follow the DRF viewsets: a JWT bearer token is required, the
+    default throttle classes apply and reads go to a replica when one is
+    configured.
+    """
+
+    authentication = StatelessJWTAuthentication()
+    throttle_classes = api_settings.DEFAULT_THROTTLE_CLASSES
+    renderer = JSONRenderer()
+
+    async def get(self, request, *args, **kwargs):
+        request = Request(request)
+        try:
+            request.user = await self.authenticate(request)
+            await self.check_throttles(request)
+            replica = await sync_to_async(choose_replica)(request.user)
+            with reads_from(replica):
+                data = await self.read(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            return self.handle_exception(request, exc)
+        return self.render(data)
+
+    async def read(self, request, *args, **kwargs):
+        """Return the response data of a GET request.
+
+        Called with the DRF ``Request`` and the URL keyword arguments after
+        authentication and throttling, inside ``reads_from`` the chosen
+        replica. Raise an ``APIException`` for an error response.
+        """
+        raise NotImplementedError(
+            "subclasses of AsyncReadView must provide a read() method"
+        )
+
+    async def authenticate(self, request):
+        header = self.authentication.get_header(request)
+        raw_token = header and self.authentication.get_raw_token(header)
+        if raw_token is None:
+            raise exceptions.NotAuthenticated()
+
+        token = self.authentication.get_validated_token(raw_token)
+        return await self.authentication.aget_user(token)
+
+    async def check_throttles(self, request):
+        for throttle_class in self.throttle_classes:
+            throttle = throttle_class()
+            allowed = await sync_to_async(throttle.allow_request)(
+                request, self
+            )
+            if not allowed:
+                raise exceptions.Throttled(throttle.wait())
+
+    def render(self, data, status=200, headers=None):
+        return HttpResponse(
+            self.renderer.render(data),
+            status=status,
+            content_type=self.renderer.media_type,
+            headers=headers,
+        )
+
+    def handle_exception(self, request, exc):
+        headers = {}
+        if isinstance(
+            exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)
+        ):
+            exc.status_code = 401
+            headers["WWW-Authenticate"] = (
+                self.authentication.authenticate_header(request)
+            )
+        if getattr(exc, "wait", None):
+            headers["Retry-After"] = str(int(exc.wait))
+
+        if isinstance(exc.detail, (list, dict)):
+            data = exc.detail
+        else:
+            data = {"detail": exc.detail}
+        return self.render(data, status=exc.status_code, headers=headers)
+
+
+class AsyncFlightListView(AsyncReadView):
+    """Async twin of ``GET /flights/`` with the same filters and cursors"""
+
+    async def read(self, request):
+        queryset = annotate_tickets_available(
+            filter_flights(FlightViewSet.queryset.all(), request.query_params)
+        )
+        paginator = FlightPagination()
+        page = await paginator.apaginate_queryset(queryset, request)
+        serializer = FlightListSerializer(
+            page, many=True, context={"request": request}
+        )
+        return paginator.get_paginated_response(serializer.data).data
+
+
+class AsyncFlightDetailView(AsyncReadView):
+    """Async twin of ``GET /flights/<pk>/``"""
+
+    async def read(self, request, pk):
+        queryset = FlightViewSet.queryset.prefetch_related("crew", "tickets")
+        try:
+            flight = await queryset.aget(pk=pk)
+        except Flight.DoesNotExist:
+            raise exceptions.NotFound()
+        return FlightDetailSerializer(
+            flight, context={"request": request}
+        ).data
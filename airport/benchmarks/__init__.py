@@ -0,0 +1,32 @@
+import os
+
+from django.conf import settings
+
+BUDGETS_PATH = os.path.join(os.path.dirname(__file__), "budgets.json")
+
+# seed_perf_data options of the dataset used by the --seed benchmarks.
+SMALL_DATASET = {
+    "airports": 50,
+    "routes_per_airport": 5,
+    "airplanes": 20,
+    "crew": 100,
+    "users": 50,
+    "flights": 500,
+    "tickets": 20000,
+    "days": 30,
+}
+
+
+def allowed_host():
+    """Return a host name that passes ``ALLOWED_HOSTS`` validation"""
+    return next(
+        (host for host in settings.ALLOWED_HOSTS
+         if host != "*" and not host.startswith(".")),
+        "localhost",
+    )
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(0, int(round(len(sorted_values) * fraction)) - 1)
+    return sorted_values[min(index, len(sorted_values) - 1)]
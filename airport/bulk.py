@@ -0,0 +1,129 @@
+import io
+import json
+from datetime import date, datetime
+
+from django.db import connections
+
+COPY_BUFFER_ROWS = 10000
+
+
+def can_copy(using="default"):
+    """Return True when ``using`` is PostgreSQL through psycopg2"""
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        return hasattr(cursor.cursor, "copy_expert")
+
+
+def reserve_pks(model, count, using="default"):
+    """Take ``count`` primary keys from the sequence of ``model``'s table.
+
+    ``COPY`` cannot return generated keys, so rows that other rows refer
+    to get their keys up front.
+    """
+    if not count:
+        return []
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, %s)) "
+            "FROM generate_series(1, %s)",
+            [model._meta.db_table, model._meta.pk.column, count],
+        )
+        return [pk for pk, in cursor.fetchall()]
+
+
+def _copy_value(value):
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return "\\\\x" + bytes(value).hex()
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def copy_rows(model, field_names, rows, using="default"):
+    """Load ``rows`` into ``model``'s table with ``COPY ... FROM STDIN``.
+
+    ``rows`` is an iterable of tuples ordered like ``field_names``. Values
+    go through the fields' ``get_prep_value`` first, and other fields with
+    a default get it, so rows are stored the way ``bulk_create`` would
+    store them. Returns the row count.
+    """
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    fields = [model._meta.get_field(name) for name in field_names]
+    defaults = [
+        field for field in model._meta.concrete_fields
+        if field not in fields and not field.primary_key
+        and field.has_default()
+    ]
+    fields += defaults
+    sql = "COPY {} ({}) FROM STDIN".format(
+        quote(model._meta.db_table),
+        ", ".join(quote(field.column) for field in fields),
+    )
+
+    count = 0
+    buffer = io.StringIO()
+    with connection.cursor() as cursor:
+        for row in rows:
+            row = (*row, *(field.get_default() for field in defaults))
+            buffer.write("\t".join(
+                _copy_value(field.get_prep_value(value))
+                for field, value in zip(fields, row)
+            ))
+            buffer.write("\n")
+            count += 1
+            if count % COPY_BUFFER_ROWS == 0:
+                buffer.seek(0)
+                cursor.cursor.copy_expert(sql, buffer)
+                buffer = io.StringIO()
+        if buffer.tell():
+            buffer.seek(0)
+            cursor.cursor.copy_expert(sql, buffer)
+    return count
+
+
+def insert_rows(model, field_names, rows, use_copy=False, batch_size=None,
+                using="default"):
+    """Insert tuples of ``field_names`` values with COPY or bulk_create"""
+    if use_copy:
+        return copy_rows(model, field_names, rows, using=using)
+    objects = model.objects.using(using).bulk_create(
+        (model(**dict(zip(field_names, row))) for row in rows),
+        batch_size=batch_size,
+    )
+    return len(objects)
+
+
+def insert_rows_returning_pks(model, field_names, rows, use_copy=False,
+                              batch_size=None, using="default"):
+    """Insert ``rows`` like ``insert_rows`` and return their primary keys"""
+    rows = list(rows)
+    if use_copy:
+        pks = reserve_pks(model, len(rows), using=using)
+        copy_rows(
+            model,
+            (model._meta.pk.attname, *field_names),
+            ((pk, *row) for pk, row in zip(pks, rows)),
+            using=using,
+        )
+        return pks
+    objects = model.objects.using(using).bulk_create(
+        (model(**dict(zip(field_names, row))) for row in rows),
+        batch_size=batch_size,
+    )
+    return [obj.pk for obj in objects]
@@ -0,0 +1,99 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def _cache():
+    return caches[getattr(settings, "AIRPORT_CATALOG_CACHE", "default")]
+
+
+def _version_cache():
+    return caches[
+        getattr(settings, "AIRPORT_CATALOG_VERSION_CACHE", "shared")
+    ]
+
+
+def _version_ttl():
+    return getattr(settings, "AIRPORT_CATALOG_VERSION_TTL", 5)
+
+
+def _version_key(model):
+    return f"airport:version:{model._meta.label_lower}"
+
+
+def model_version(model):
+    """Return the current cache version of ``model``.
+
+    Versions live in ``AIRPORT_CATALOG_VERSION_CACHE``, shared by all
+    workers, and are kept in the local catalog cache for
+    ``AIRPORT_CATALOG_VERSION_TTL`` seconds, so a change made by another
+    worker shows after at most that long. Versions start from a timestamp
+    rather than 1, so an evicted version key can never bring back
+    responses cached under an older version.
+    """
+    key = _version_key(model)
+    version = _cache().get(key)
+    if version is None:
+        _version_cache().add(key, time.time_ns(), None)
+        version = _version_cache().get(key)
+        if version is None:
+            version = time.time_ns()
+            _version_cache().set(key, version, None)
+        _cache().set(key, version, _version_ttl())
+    return version
+
+
+def bump_model_version(model):
+    key = _version_key(model)
+    try:
+        version = _version_cache().incr(key)
+    except ValueError:
+        version = time.time_ns()
+        _version_cache().set(key, version, None)
+    _cache().set(key, version, _version_ttl())
+
+
+class CachedListMixin:
+    """Serve ``list`` from a cache keyed by the versions of ``cache_models``.
+
+    Saving or deleting any instance of ``cache_models`` bumps its version,
+    which changes both the cache key and the ETag of every cached list.
+    Requests with a matching ``If-None-Match`` get an empty 304 response.
+    """
+
+    cache_models = ()
+
+    def get_cache_models(self):
+        return self.cache_models or (self.queryset.model,)
+
+    def _list_etag(self, request):
+        versions = ":".join(
+            str(model_version(model)) for model in self.get_cache_models()
+        )
+        digest = hashlib.md5(
+            f"{request.get_full_path()}|{versions}".encode()
+        ).hexdigest()
+        return f'"{digest}"'
+
+    def list(self, request, *args, **kwargs):
+        etag = self._list_etag(request)
+        if_none_match = request.headers.get("If-None-Match", "")
+        if etag in (tag.strip() for tag in if_none_match.split(",")):
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+            )
+
+        key = f"airport:list:{etag}"
+        data = _cache().get(key)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            _cache().set(
+                key,
+                data,
+                getattr(settings, "AIRPORT_CATALOG_CACHE_TIMEOUT", 60)
+            )
+        return Response(data, headers={"ETag": etag})
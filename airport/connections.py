@@ -0,0 +1,220 @@
+import bisect
+import heapq
+import itertools
+import threading
+from collections import defaultdict, namedtuple
+from datetime import datetime, time, timedelta
+from time import monotonic
+
+from django.conf import settings
+from django.utils import timezone
+
+Leg = namedtuple(
+    "Leg",
+    ["departure_time", "flight_id", "source_id", "destination_id",
+     "arrival_time"],
+)
+
+
+def _day_bounds(day):
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def _local_day(value):
+    return timezone.localtime(value).date()
+
+
+class ConnectionIndex:
+    """In-memory, per-day adjacency of flights keyed by source airport.
+
+    Days are loaded lazily with one query and kept up to date from flight
+    signals. Entries older than ``ttl`` seconds are reloaded, which bounds
+    staleness for changes made by other worker processes.
+    """
+
+    max_days = 64
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl
+        self._days = {}
+        self._flight_days = {}
+        self._lock = threading.RLock()
+
+    def _get_ttl(self):
+        if self.ttl is not None:
+            return self.ttl
+        return getattr(settings, "AIRPORT_CONNECTION_INDEX_TTL", 60)
+
+    def _load_day(self, day):
+        from airport.models import Flight
+
+        start, end = _day_bounds(day)
+        rows = Flight.objects.filter(
+            departure_time__gte=start, departure_time__lt=end
+        ).values_list(
+            "departure_time",
+            "id",
+            "route__source_id",
+            "route__destination_id",
+            "arrival_time",
+        )
+        adjacency = defaultdict(list)
+        for row in rows:
+            leg = Leg(*row)
+            adjacency[leg.source_id].append(leg)
+            self._flight_days[leg.flight_id] = day
+        for legs in adjacency.values():
+            legs.sort()
+        return adjacency
+
+    def _day(self, day):
+        with self._lock:
+            entry = self._days.get(day)
+            now = monotonic()
+            if entry is None or now - entry[0] > self._get_ttl():
+                if entry is None and len(self._days) >= self.max_days:
+                    oldest = min(self._days, key=lambda d: self._days[d][0])
+                    self._evict(oldest)
+                entry = (now, self._load_day(day))
+                self._days[day] = entry
+            return entry[1]
+
+    def _evict(self, day):
+        _, adjacency = self._days.pop(day)
+        for legs in adjacency.values():
+            for leg in legs:
+                self._flight_days.pop(leg.flight_id, None)
+
+    def departures(self, airport_id, after, before):
+        """Return legs leaving ``airport_id`` within ``[after, before]``."""
+        day = _local_day(after)
+        last_day = _local_day(before)
+        legs = []
+        while day <= last_day:
+            day_legs = self._day(day).get(airport_id, ())
+            start = bisect.bisect_left(day_legs, (after,))
+            for leg in day_legs[start:]:
+                if leg.departure_time > before:
+                    break
+                legs.append(leg)
+            day += timedelta(days=1)
+        return legs
+
+    def remove_flight(self, flight_id):
+        with self._lock:
+            day = self._flight_days.pop(flight_id, None)
+            if day is None or day not in self._days:
+                return
+            for legs in self._days[day][1].values():
+                legs[:] = [leg for leg in legs if leg.flight_id != flight_id]
+
+    def update_flight(self, leg):
+        with self._lock:
+            self.remove_flight(leg.flight_id)
+            day = _local_day(leg.departure_time)
+            if day not in self._days:
+                return
+            bisect.insort(self._days[day][1][leg.source_id], leg)
+            self._flight_days[leg.flight_id] = day
+
+    def is_tracked(self, flight_id, departure_time):
+        with self._lock:
+            return (
+                flight_id in self._flight_days
+                or _local_day(departure_time) in self._days
+            )
+
+    def clear(self):
+        with self._lock:
+            self._days.clear()
+            self._flight_days.clear()
+
+    def search(
+        self,
+        source_id,
+        destination_id,
+        day,
+        min_layover,
+        max_layover,
+        max_legs,
+        limit=50,
+    ):
+        """Find itineraries from ``source_id`` to ``destination_id``.
+
+        The first leg departs on ``day``; every connection waits between
+        ``min_layover`` and ``max_layover``. Itineraries never visit the
+        same airport twice and are ordered by arrival time, then by
+        number of legs.
+
+        Partial itineraries are expanded in arrival order from a priority
+        queue, so the search stops as soon as ``limit`` itineraries were
+        found. A leg is only queued when the destination can still be
+        reached from it within the remaining legs and layover windows,
+        which is memoized per flight, so dead ends such as early arrivals
+        at a hub with one late onward flight are never expanded.
+        """
+        start, end = _day_bounds(day)
+        queue = []
+        order = itertools.count()
+        onward = {}
+        reaches = {}
+
+        def departures_after(leg):
+            key = (leg.destination_id, leg.arrival_time)
+            if key not in onward:
+                onward[key] = self.departures(
+                    leg.destination_id,
+                    leg.arrival_time + min_layover,
+                    leg.arrival_time + max_layover,
+                )
+            return onward[key]
+
+        def can_reach(leg, legs_left):
+            # Ignores the visited airports, so it never prunes a leg that
+            # leads to an itinerary.
+            if leg.destination_id == destination_id:
+                return True
+            if legs_left == 1 or leg.destination_id == source_id:
+                return False
+            key = (leg.flight_id, legs_left)
+            if key not in reaches:
+                reaches[key] = any(
+                    can_reach(next_leg, legs_left - 1)
+                    for next_leg in departures_after(leg)
+                )
+            return reaches[key]
+
+        def push(path):
+            heapq.heappush(queue, (
+                path[-1].arrival_time,
+                len(path),
+                path[0].departure_time,
+                next(order),
+                path,
+            ))
+
+        for leg in self.departures(
+            source_id, start, end - timedelta(microseconds=1)
+        ):
+            if leg.destination_id != source_id and can_reach(leg, max_legs):
+                push((leg,))
+
+        itineraries = []
+        while queue and len(itineraries) < limit:
+            path = heapq.heappop(queue)[-1]
+            last = path[-1]
+            if last.destination_id == destination_id:
+                itineraries.append(list(path))
+                continue
+            visited = {source_id, *(leg.destination_id for leg in path)}
+            legs_left = max_legs - len(path)
+            for leg in departures_after(last):
+                if leg.destination_id not in visited and can_reach(
+                    leg, legs_left
+                ):
+                    push(path + (leg,))
+        return itineraries
+
+
+connection_index = ConnectionIndex()
@@ -0,0 +1,20 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class SeatsAlreadyTaken(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = _("Some of the requested seats are already taken.")
+    default_code = "seats_taken"
+
+    def __init__(self, places):
+        super().__init__()
+        self.places = sorted(places)
+        self.detail = {
+            "detail": self.detail,
+            "taken_places": [
+                {"flight": flight_id, "row": row, "seat": seat}
+                for flight_id, row, seat in self.places
+            ],
+        }
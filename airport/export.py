@@ -0,0 +1,148 @@
+import csv
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import ValidationError
+
+EXPORT_CHUNK_SIZE = 2000
+
+FLIGHT_COLUMNS = (
+    ("id", "id"),
+    ("route_id", "route_id"),
+    ("source", "route__source__name"),
+    ("destination", "route__destination__name"),
+    ("airplane_id", "airplane_id"),
+    ("airplane", "airplane__name"),
+    ("departure_time", "departure_time"),
+    ("arrival_time", "arrival_time"),
+    ("tickets_sold", "tickets_sold"),
+)
+
+ORDER_COLUMNS = (
+    ("id", "id"),
+    ("created_at", "created_at"),
+    ("user_id", "user_id"),
+)
+
+TICKET_COLUMNS = (
+    ("id", "id"),
+    ("order_id", "order_id"),
+    ("order_created_at", "order__created_at"),
+    ("flight_id", "flight_id"),
+    ("departure_time", "flight__departure_time"),
+    ("source", "flight__route__source__name"),
+    ("destination", "flight__route__destination__name"),
+    ("row", "row"),
+    ("seat", "seat"),
+)
+
+FILE_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+class _Line:
+    """File-like object that hands back what ``csv.writer`` writes"""
+
+    def write(self, value):
+        return value
+
+
+def _ndjson_lines(names, rows):
+    encoder = DjangoJSONEncoder(separators=(",", ":"))
+    for row in rows:
+        yield encoder.encode(dict(zip(names, row))) + "\n"
+
+
+def _csv_lines(names, rows):
+    writer = csv.writer(_Line())
+    yield writer.writerow(names)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+async def _arows(rows, chunk_size):
+    """Yield the rows of a sync iterator, reading each chunk in a thread."""
+    read_chunk = sync_to_async(lambda: list(islice(rows, chunk_size)))
+    while True:
+        chunk = await read_chunk()
+        if not chunk:
+            return
+        for row in chunk:
+            yield row
+
+
+async def _ndjson_alines(names, rows):
+    encoder = DjangoJSONEncoder(separators=(",", ":"))
+    async for row in rows:
+        yield encoder.encode(dict(zip(names, row))) + "\n"
+
+
+async def _csv_alines(names, rows):
+    writer = csv.writer(_Line())
+    yield writer.writerow(names)
+    async for row in rows:
+        yield writer.writerow(row)
+
+
+def export_rows(
+    queryset,
+    columns,
+    file_format,
+    chunk_size=EXPORT_CHUNK_SIZE,
+    asynchronous=False,
+):
+    """Yield ``queryset`` as NDJSON or CSV lines of flat ``columns``.
+
+    Rows are read as tuples with ``values_list().iterator()``, so neither
+    model instances nor the whole result set are kept in memory; on
+    PostgreSQL the iterator uses a server-side cursor. With
+    ``asynchronous`` the lines come from an async generator that reads the
+    same iterator a chunk at a time in a thread, which ASGI servers stream
+    as it goes; they would read a sync iterator into memory first.
+    """
+    names = [name for name, _ in columns]
+    rows = queryset.values_list(
+        *(lookup for _, lookup in columns)
+    ).iterator(chunk_size=chunk_size)
+    if asynchronous:
+        rows = _arows(rows, chunk_size)
+        lines = _csv_alines if file_format == "csv" else _ndjson_alines
+    else:
+        lines = _csv_lines if file_format == "csv" else _ndjson_lines
+    return lines(names, rows)
+
+
+def get_file_format(request):
+    file_format = request.query_params.get("file_format", "ndjson")
+    if file_format not in FILE_FORMATS:
+        raise ValidationError(
+            {"file_format": f"Choose one of: {', '.join(FILE_FORMATS)}."}
+        )
+    return file_format
+
+
+def export_response(request, queryset, columns, filename):
+    """Stream an export, asynchronously when served by the ASGI handler.
+
+    WSGI servers get a sync iterator and ASGI servers an async one, so the
+    export is written with constant memory under both.
+    """
+    file_format = get_file_format(request)
+    asynchronous = isinstance(
+        getattr(request, "_request", request), ASGIRequest
+    )
+    response = StreamingHttpResponse(
+        export_rows(
+            queryset, columns, file_format, asynchronous=asynchronous
+        ),
+        content_type=FILE_FORMATS[file_format],
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="{filename}.{file_format}"'
+    )
+    return response
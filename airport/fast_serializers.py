@@ -0,0 +1,192 @@
+from operator import itemgetter
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.response import Response
+
+from airport.images import variant_urls
+from airport.models import Airplane
+from airport.timing import TimedSerializerMixin
+
+
+def datetime_value(lookup):
+    """Format like DRF's ``DateTimeField`` in the current time zone"""
+    get = itemgetter(lookup)
+    zone = timezone.get_current_timezone() if settings.USE_TZ else None
+
+    def convert(row):
+        value = get(row)
+        if value is None:
+            return None
+        if zone is not None and timezone.is_aware(value):
+            value = value.astimezone(zone)
+        value = value.isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+        return value
+
+    return convert
+
+
+def file_url_value(lookup, field, request):
+    """Return the URL of a stored file like DRF's ``FileField``"""
+    get = itemgetter(lookup)
+    storage = field.storage
+
+    def convert(row):
+        name = get(row)
+        if not name:
+            return None
+        url = storage.url(name)
+        if request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+    return convert
+
+
+class ValuesListSerializer:
+    """Serialize ``values()`` rows instead of model instances.
+
+    DRF builds a model instance per row and walks its field objects for
+    every attribute. Subclasses instead name the ``lookups`` to select and
+    return ``(key, converter)`` pairs from ``get_converters``, built once
+    per response; by default every lookup is output as is under its own
+    name. The output must stay identical to the ``ModelSerializer`` it
+    replaces, key order included.
+    """
+
+    lookups = ()
+
+    def __init__(self, context=None):
+        self.context = context or {}
+        self.converters = tuple(self.get_converters())
+
+    def get_converters(self):
+        return tuple((lookup, itemgetter(lookup)) for lookup in self.lookups)
+
+    def values(self, queryset):
+        return queryset.values(*self.lookups)
+
+    def to_representation(self, rows):
+        converters = self.converters
+        return [
+            {name: convert(row) for name, convert in converters}
+            for row in rows
+        ]
+
+
+class FlightListValuesSerializer(TimedSerializerMixin, ValuesListSerializer):
+    """Rows of ``FlightListSerializer``"""
+
+    lookups = (
+        "id",
+        "route__source__name",
+        "route__destination__name",
+        "route__distance",
+        "airplane__name",
+        "airplane__rows",
+        "airplane__seats_in_row",
+        "tickets_available",
+        "departure_time",
+        "arrival_time",
+    )
+
+    def get_converters(self):
+        return (
+            ("id", itemgetter("id")),
+            # Route.__str__
+            ("route", lambda row: (
+                f"{row['route__source__name']} --> "
+                f"{row['route__destination__name']}, "
+                f"{row['route__distance']}"
+            )),
+            ("airplane", itemgetter("airplane__name")),
+            ("airplane_capacity", lambda row: (
+                row["airplane__rows"] * row["airplane__seats_in_row"]
+            )),
+            ("tickets_available", itemgetter("tickets_available")),
+            ("departure_time", datetime_value("departure_time")),
+            ("arrival_time", datetime_value("arrival_time")),
+        )
+
+
+class RouteListValuesSerializer(TimedSerializerMixin, ValuesListSerializer):
+    """Rows of ``RouteListSerializer``"""
+
+    lookups = ("id", "source__name", "destination__name", "distance")
+
+    def get_converters(self):
+        return (
+            ("id", itemgetter("id")),
+            ("source", itemgetter("source__name")),
+            ("destination", itemgetter("destination__name")),
+            ("distance", itemgetter("distance")),
+        )
+
+
+class AirplaneValuesSerializer(TimedSerializerMixin, ValuesListSerializer):
+    """Rows of ``AirplaneSerializer``"""
+
+    lookups = (
+        "id",
+        "name",
+        "rows",
+        "seats_in_row",
+        "airplane_type",
+        "image",
+        "image_variants",
+    )
+
+    def get_converters(self):
+        request = self.context.get("request")
+
+        def image_variants(row):
+            urls = variant_urls(row["image"], row["image_variants"])
+            if request is not None:
+                urls = {
+                    name: request.build_absolute_uri(url)
+                    for name, url in urls.items()
+                }
+            return urls
+
+        return (
+            ("id", itemgetter("id")),
+            ("name", itemgetter("name")),
+            ("rows", itemgetter("rows")),
+            ("seats_in_row", itemgetter("seats_in_row")),
+            ("airplane_type", itemgetter("airplane_type")),
+            ("capacity", lambda row: row["rows"] * row["seats_in_row"]),
+            ("image", file_url_value(
+                "image", Airplane._meta.get_field("image"), request
+            )),
+            ("image_variants", image_variants),
+        )
+
+
+class FastListMixin:
+    """Serve ``list`` from ``values_serializer_class`` when enabled.
+
+    The fast mode is opt-in with ``AIRPORT_FAST_LISTS = True``. Filtering,
+    pagination and caching stay the same, only the rows are read with
+    ``values()`` and serialized by the converters of the serializer.
+    """
+
+    values_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        if not getattr(settings, "AIRPORT_FAST_LISTS", False):
+            return super().list(request, *args, **kwargs)
+
+        serializer = self.values_serializer_class(
+            context=self.get_serializer_context()
+        )
+        queryset = serializer.values(
+            self.filter_queryset(self.get_queryset())
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(
+                serializer.to_representation(page)
+            )
+        return Response(serializer.to_representation(queryset))
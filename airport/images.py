@@ -0,0 +1,110 @@
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections
+from PIL import Image, ImageOps
+
+from airport.models import Airplane
+
+logger = logging.getLogger(__name__)
+
+# name: (longest side in pixels, Pillow format, file extension, save options)
+VARIANTS = {
+    "thumbnail": (200, "JPEG", "jpg", {"quality": 80, "optimize": True}),
+    "medium": (800, "JPEG", "jpg", {"quality": 85, "optimize": True}),
+    "webp": (800, "WEBP", "webp", {"quality": 80, "method": 4}),
+}
+VARIANTS_DIR = "upload-image/variants/"
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def render_variant(image, size, file_format, options):
+    """Return ``image`` shrunk to fit ``size`` and encoded as bytes"""
+    image = ImageOps.exif_transpose(image)
+    if file_format == "JPEG" and image.mode != "RGB":
+        image = image.convert("RGB")
+    elif image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+    image.thumbnail((size, size), Image.LANCZOS)
+    output = io.BytesIO()
+    image.save(output, format=file_format, **options)
+    return output.getvalue()
+
+
+def generate_variants(airplane_id, source):
+    """Store every variant of the image ``source`` of an airplane.
+
+    The names are saved in ``Airplane.image_variants`` only if the
+    airplane still has that image, otherwise the files are removed again.
+    """
+    storage = Airplane.image.field.storage
+    stem, _ = os.path.splitext(os.path.basename(source))
+    variants = {"source": source}
+    with storage.open(source) as file:
+        with Image.open(file) as image:
+            image.load()
+            for name, variant in VARIANTS.items():
+                size, file_format, extension, options = variant
+                variants[name] = storage.save(
+                    f"{VARIANTS_DIR}{stem}-{name}.{extension}",
+                    ContentFile(
+                        render_variant(image, size, file_format, options)
+                    ),
+                )
+
+    updated = Airplane.objects.filter(pk=airplane_id, image=source).update(
+        image_variants=variants
+    )
+    if not updated:
+        for name in VARIANTS:
+            storage.delete(variants[name])
+    return variants if updated else None
+
+
+def _generate_in_worker(airplane_id, source):
+    try:
+        return generate_variants(airplane_id, source)
+    except Exception:
+        logger.exception(
+            "Could not generate variants of %s for airplane %s",
+            source,
+            airplane_id,
+        )
+    finally:
+        connections.close_all()
+
+
+def schedule_variants(airplane_id, source):
+    """Generate the variants in the worker pool and return the future.
+
+    Pillow releases the GIL while decoding, resizing and encoding, so a
+    few threads keep uploads off the request path without a task queue.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "AIRPORT_IMAGE_WORKERS", 2),
+                thread_name_prefix="airplane-images",
+            )
+    return _executor.submit(_generate_in_worker, airplane_id, source)
+
+
+def variant_urls(image_name, variants):
+    """Return the URLs of ``variants`` if they belong to ``image_name``"""
+    variants = variants or {}
+    if not image_name or variants.get("source") != image_name:
+        return {}
+    storage = Airplane.image.field.storage
+    return {
+        name: storage.url(variants[name])
+        for name in VARIANTS
+        if name in variants
+    }
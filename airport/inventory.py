@@ -0,0 +1,328 @@
+import base64
+import time
+from collections import defaultdict, namedtuple
+
+from django.conf import settings
+from django.db import transaction
+
+from airport.analytics import (
+    departure_day,
+    record_sold_seats,
+    refresh_route_days,
+)
+from airport.exceptions import SeatsAlreadyTaken
+
+
+class SeatMap:
+    """Bitset of taken seats for one flight.
+
+    Seat ``(row, seat)`` is stored in bit ``(row - 1) * seats_in_row
+    + (seat - 1)``, most significant bit first in every byte.
+    """
+
+    def __init__(self, rows, seats_in_row, data=b""):
+        self.rows = rows
+        self.seats_in_row = seats_in_row
+        size = self.size_in_bytes(rows, seats_in_row)
+        self._bits = bytearray(bytes(data)[:size].ljust(size, b"\0"))
+
+    @staticmethod
+    def size_in_bytes(rows, seats_in_row):
+        return (rows * seats_in_row + 7) // 8
+
+    @classmethod
+    def from_tickets(cls, rows, seats_in_row, seats):
+        seat_map = cls(rows, seats_in_row)
+        for row, seat in seats:
+            seat_map.add(row, seat)
+        return seat_map
+
+    def _position(self, row, seat):
+        if not (1 <= row <= self.rows and 1 <= seat <= self.seats_in_row):
+            raise IndexError(f"Seat ({row}, {seat}) is out of range")
+        index = (row - 1) * self.seats_in_row + (seat - 1)
+        return index >> 3, 0x80 >> (index & 7)
+
+    def add(self, row, seat):
+        byte, mask = self._position(row, seat)
+        self._bits[byte] |= mask
+
+    def discard(self, row, seat):
+        byte, mask = self._position(row, seat)
+        self._bits[byte] &= ~mask
+
+    def __contains__(self, place):
+        byte, mask = self._position(*place)
+        return bool(self._bits[byte] & mask)
+
+    def __iter__(self):
+        for byte_index, byte in enumerate(self._bits):
+            if not byte:
+                continue
+            for bit in range(8):
+                if byte & (0x80 >> bit):
+                    row, seat = divmod(byte_index * 8 + bit, self.seats_in_row)
+                    yield row + 1, seat + 1
+
+    def __len__(self):
+        return bin(int.from_bytes(self._bits, "big")).count("1")
+
+    def to_bytes(self):
+        return bytes(self._bits)
+
+    def encode(self):
+        return base64.b64encode(self._bits).decode("ascii")
+
+
+def _load_seat_map(flight):
+    airplane = flight.airplane
+    data = bytes(flight.seat_map or b"")
+    size = SeatMap.size_in_bytes(airplane.rows, airplane.seats_in_row)
+    if len(data) != size:
+        return _seat_map_from_db(flight)
+    return SeatMap(airplane.rows, airplane.seats_in_row, data)
+
+
+def _seat_map_from_db(flight):
+    return SeatMap.from_tickets(
+        flight.airplane.rows,
+        flight.airplane.seats_in_row,
+        flight.tickets.values_list("row", "seat"),
+    )
+
+
+def get_seat_map(flight):
+    """Return the seat map of an already loaded flight without writing."""
+    return _load_seat_map(flight)
+
+
+# Loaded with the row lock: the seat map, its size and the rollup key.
+_LOCKED_FLIGHT_FIELDS = (
+    "seat_map",
+    "route",
+    "departure_time",
+    "airplane__rows",
+    "airplane__seats_in_row",
+)
+
+
+def lock_flight(flight_id):
+    """Return a flight locked until the surrounding transaction ends.
+
+    Loads the seat map, its size, the rollup key and the departure time,
+    which a reschedule cannot change while the lock is held.
+    """
+    from airport.models import Flight
+
+    return (
+        Flight.objects.select_for_update(of=("self",))
+        .select_related("airplane")
+        .only(*_LOCKED_FLIGHT_FIELDS)
+        .get(pk=flight_id)
+    )
+
+
+def take_seats(flight, seats):
+    """Mark seats taken on a flight returned by ``lock_flight``."""
+    return _apply_seats(flight, seats, taken=True)
+
+
+def _apply_seats(flight, seats, taken):
+    from airport.models import Flight
+
+    seat_map = _load_seat_map(flight)
+    sold_before = len(seat_map)
+    for row, seat in seats:
+        if taken:
+            seat_map.add(row, seat)
+        else:
+            seat_map.discard(row, seat)
+    Flight.objects.filter(pk=flight.pk).update(
+        seat_map=seat_map.to_bytes(),
+        tickets_sold=len(seat_map),
+    )
+    record_sold_seats([(
+        flight.route_id,
+        flight.departure_time,
+        len(seat_map) - sold_before,
+    )])
+    return seat_map
+
+
+def _update_seat_map(flight_id, seats, taken):
+    with transaction.atomic():
+        return _apply_seats(lock_flight(flight_id), seats, taken)
+
+
+def mark_seats_taken(flight_id, seats):
+    return _update_seat_map(flight_id, seats, taken=True)
+
+
+def mark_seats_free(flight_id, seats):
+    return _update_seat_map(flight_id, seats, taken=False)
+
+
+def reserve_seats(places):
+    """Mark ``(flight_id, row, seat)`` places as taken on their seat maps.
+
+    Flight rows are locked in primary key order until the surrounding
+    transaction ends, so concurrent orders for the same flight are applied
+    one after another. ``tickets_sold`` and the ``RouteDailyLoad`` rows are
+    written together with the seat map while the lock is held. Raises
+    ``SeatsAlreadyTaken`` listing the places that were sold before the lock
+    was acquired. Returns the departure times of the locked flights by
+    flight id, tickets have to be written with them.
+    """
+    from airport.models import Flight
+
+    seats_by_flight = defaultdict(list)
+    for flight_id, row, seat in places:
+        seats_by_flight[flight_id].append((row, seat))
+
+    flights = (
+        Flight.objects.select_for_update(of=("self",))
+        .select_related("airplane")
+        .only(*_LOCKED_FLIGHT_FIELDS)
+        .filter(pk__in=seats_by_flight)
+        .order_by("pk")
+    )
+    seat_maps = {}
+    departures = {}
+    sold = []
+    taken = []
+    for flight in flights:
+        departures[flight.pk] = flight.departure_time
+        seat_map = _load_seat_map(flight)
+        sold_before = len(seat_map)
+        for row, seat in seats_by_flight[flight.pk]:
+            if (row, seat) in seat_map:
+                taken.append((flight.pk, row, seat))
+            seat_map.add(row, seat)
+        seat_maps[flight.pk] = seat_map
+        sold.append((
+            flight.route_id,
+            flight.departure_time,
+            len(seat_map) - sold_before,
+        ))
+    if taken:
+        raise SeatsAlreadyTaken(taken)
+
+    for flight_id, seat_map in seat_maps.items():
+        Flight.objects.filter(pk=flight_id).update(
+            seat_map=seat_map.to_bytes(),
+            tickets_sold=len(seat_map),
+        )
+    record_sold_seats(sold)
+    return departures
+
+
+AirplaneDimensions = namedtuple("AirplaneDimensions", "rows seats_in_row")
+
+# flight_id: (expires at, AirplaneDimensions)
+_dimensions = {}
+_MAX_CACHED_DIMENSIONS = 10000
+
+
+def airplane_dimensions(flight_id):
+    """Return the ``AirplaneDimensions`` of the airplane of a flight.
+
+    Cached per process for ``AIRPORT_DIMENSIONS_TTL`` seconds and cleared
+    when a flight or an airplane is saved, the ``airport_ticket_range``
+    trigger stays the authority for rows written by other processes.
+    """
+    from airport.models import Flight
+
+    now = time.monotonic()
+    cached = _dimensions.get(flight_id)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+    rows, seats_in_row = (
+        Flight.objects.filter(pk=flight_id)
+        .values_list("airplane__rows", "airplane__seats_in_row")
+        .get()
+    )
+    if len(_dimensions) >= _MAX_CACHED_DIMENSIONS:
+        _dimensions.clear()
+    _dimensions[flight_id] = (
+        now + getattr(settings, "AIRPORT_DIMENSIONS_TTL", 300),
+        AirplaneDimensions(rows, seats_in_row),
+    )
+    return _dimensions[flight_id][1]
+
+
+def forget_airplane_dimensions():
+    _dimensions.clear()
+
+
+def find_taken_places(places):
+    """Return the subset of ``(flight_id, row, seat)`` places with tickets."""
+    from airport.models import Ticket
+
+    places = set(places)
+    if not places:
+        return []
+    sold = Ticket.objects.filter(
+        flight_id__in={flight_id for flight_id, _, _ in places},
+        row__in={row for _, row, _ in places},
+        seat__in={seat for _, _, seat in places},
+    ).values_list("flight_id", "row", "seat")
+    return [place for place in sold if place in places]
+
+
+def rebuild_seat_map(flight):
+    from airport.models import Flight
+
+    seat_map = _seat_map_from_db(flight)
+    Flight.objects.filter(pk=flight.pk).update(
+        seat_map=seat_map.to_bytes(),
+        tickets_sold=len(seat_map),
+    )
+    flight.seat_map = seat_map.to_bytes()
+    flight.tickets_sold = len(seat_map)
+    refresh_route_days(
+        [(flight.route_id, departure_day(flight.departure_time))]
+    )
+    return seat_map
+
+
+def rebuild_airplane_seat_maps(airplane):
+    """Rebuild the seat maps of every flight of a resized airplane.
+
+    Bit positions depend on ``seats_in_row``, so a map written for another
+    layout of the same byte length would be read as other seats. Uses one
+    query for the tickets and a bulk update of the flights. Tickets outside
+    the new layout are left out of the maps. Flights whose tickets were
+    archived by detaching their partition keep their maps.
+    """
+    from airport.models import Flight, Ticket
+    from airport.partitions import archived_before
+
+    rows, seats_in_row = int(airplane.rows), int(airplane.seats_in_row)
+    flights = Flight.objects.filter(airplane_id=airplane.pk)
+    archived = archived_before()
+    if archived is not None:
+        flights = flights.filter(departure_time__gte=archived)
+    seat_maps = {
+        flight_id: SeatMap(rows, seats_in_row)
+        for flight_id in flights.values_list("pk", flat=True)
+    }
+    if not seat_maps:
+        return
+    for flight_id, row, seat in Ticket.objects.filter(
+        flight__airplane_id=airplane.pk,
+        row__lte=rows,
+        seat__lte=seats_in_row,
+    ).values_list("flight_id", "row", "seat"):
+        seat_maps[flight_id].add(row, seat)
+    Flight.objects.bulk_update(
+        [
+            Flight(
+                pk=flight_id,
+                seat_map=seat_map.to_bytes(),
+                tickets_sold=len(seat_map),
+            )
+            for flight_id, seat_map in seat_maps.items()
+        ],
+        ["seat_map", "tickets_sold"],
+        batch_size=1000,
+    )
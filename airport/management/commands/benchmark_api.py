@@ -0,0 +1,271 @@
+import json
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from io import StringIO
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from airport.benchmarks import (
+    BUDGETS_PATH,
+    SMALL_DATASET,
+    allowed_host,
+    percentile,
+)
+from airport.cache import bump_model_version
+from airport.models import Airplane, Route, Flight, Order
+from airport.throttling import throttling_disabled
+from user.authentication import UserClaimsTokenObtainPairSerializer
+
+# name: (url name, object to pass as the pk, query parameters)
+ENDPOINTS = {
+    "airplane_types.list": ("airport:airplanetype-list", None, {}),
+    "airplanes.list": ("airport:airplane-list", None, {}),
+    "airplanes.detail": ("airport:airplane-detail", Airplane, {}),
+    "airports.list": ("airport:airport-list", None, {}),
+    "routes.list": ("airport:route-list", None, {}),
+    "routes.detail": ("airport:route-detail", Route, {}),
+    "crew.list": ("airport:crew-list", None, {}),
+    "flights.list": ("airport:flight-list", None, {}),
+    "flights.list.filtered": (
+        "airport:flight-list", None, {"departure_time": "departure_date"}
+    ),
+    "flights.detail": ("airport:flight-detail", Flight, {}),
+    "flights.detail.compact": (
+        "airport:flight-detail", Flight, {"seat_map": "compact"}
+    ),
+    "flights.connections": (
+        "airport:flight-connections",
+        None,
+        {
+            "source": "source_id",
+            "destination": "destination_id",
+            "date": "departure_date",
+        },
+    ),
+    "orders.list": ("airport:order-list", None, {"page_size": "20"}),
+    "async.flights.list": ("airport:async-flight-list", None, {}),
+    "async.flights.detail": ("airport:async-flight-detail", Flight, {}),
+    "user.me": ("user:manage", None, {}),
+}
+
+
+class Command(BaseCommand):
+    """Django command to check API endpoints against performance budgets"""
+
+    help = (
+        "Request every list and detail endpoint of the airport and user "
+        "APIs and record the number of queries, p50/p95 latency and "
+        "response size. Fails when a result exceeds its budget in "
+        "airport/benchmarks/budgets.json."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument(
+            "--seed",
+            type=int,
+            help="Run against a small seed_perf_data dataset generated "
+                 "with this seed and rolled back afterwards. Byte budgets "
+                 "are the largest responses of seeds 1 to 6 plus 25%%.",
+        )
+        parser.add_argument("--budgets", default=BUDGETS_PATH)
+        parser.add_argument(
+            "--output", help="Write the results to this JSON file."
+        )
+        parser.add_argument(
+            "--ignore-latency",
+            action="store_true",
+            help="Check query and size budgets only.",
+        )
+        parser.add_argument(
+            "--update-budgets",
+            action="store_true",
+            help="Write the measured query counts and sizes as budgets.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options["seed"] is not None:
+                call_command(
+                    "seed_perf_data",
+                    seed=options["seed"],
+                    stdout=StringIO(),
+                    **SMALL_DATASET,
+                )
+            with throttling_disabled():
+                results = self._run(options["iterations"])
+            transaction.set_rollback(True)
+
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<24} {result['queries']:>3} queries  "
+                f"p50 {result['p50_ms']:7.1f} ms  "
+                f"p95 {result['p95_ms']:7.1f} ms  "
+                f"{result['bytes']:>8} bytes"
+            )
+
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                json.dump(
+                    {
+                        "commit": self._commit(),
+                        "created_at": datetime.now(timezone.utc).isoformat(),
+                        "iterations": options["iterations"],
+                        "results": results,
+                    },
+                    file,
+                    indent=2,
+                )
+
+        if options["update_budgets"]:
+            self._update_budgets(options["budgets"], results)
+            return
+
+        with open(options["budgets"]) as file:
+            budgets = json.load(file)
+        failures = self._check(budgets, results, options["ignore_latency"])
+        if failures:
+            raise CommandError(
+                "Budgets exceeded:\n" + "\n".join(failures)
+            )
+        self.stdout.write(self.style.SUCCESS("All budgets met"))
+
+    def _context(self):
+        flight = (
+            Flight.objects.select_related("route").order_by("pk").first()
+        )
+        if flight is None:
+            raise CommandError(
+                "No flights to benchmark, run seed_perf_data or use --seed"
+            )
+        return {
+            "source_id": flight.route.source_id,
+            "destination_id": flight.route.destination_id,
+            "departure_date": flight.departure_time.date().isoformat(),
+        }
+
+    def _client(self):
+        user_id = (
+            Order.objects.order_by("pk").values_list("user", flat=True)
+            .first()
+        )
+        if user_id is None:
+            user = get_user_model().objects.create_user(
+                "api-benchmark@example.com"
+            )
+        else:
+            user = get_user_model().objects.get(pk=user_id)
+        # An address outside INTERNAL_IPS keeps the debug toolbar out.
+        client = APIClient(
+            SERVER_NAME=allowed_host(), REMOTE_ADDR="192.0.2.1"
+        )
+        # A real bearer token, so authentication is part of every result.
+        token = UserClaimsTokenObtainPairSerializer.get_token(user)
+        client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {token.access_token}"
+        )
+        return client
+
+    @staticmethod
+    def _invalidate_cached_lists():
+        for model in apps.get_app_config("airport").get_models():
+            bump_model_version(model)
+
+    def _run(self, iterations):
+        context = self._context()
+        client = self._client()
+        results = {}
+        for name, (url_name, model, params) in ENDPOINTS.items():
+            args = []
+            if model is not None:
+                args.append(model.objects.order_by("pk").values_list(
+                    "pk", flat=True
+                ).first())
+            url = reverse(url_name, args=args)
+            params = {
+                key: context.get(value, value)
+                for key, value in params.items()
+            }
+
+            response = client.get(url, params)
+            if response.status_code != 200:
+                raise CommandError(
+                    f"{name}: GET {url} returned {response.status_code}"
+                )
+            # Count the queries of a cache miss, a hit makes none.
+            self._invalidate_cached_lists()
+            with CaptureQueriesContext(connection) as queries:
+                client.get(url, params)
+            # Later requests reset the query log, count while it is intact.
+            query_count = len(queries)
+
+            timings = []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                response = client.get(url, params)
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            results[name] = {
+                "queries": query_count,
+                "p50_ms": round(statistics.median(timings), 2),
+                "p95_ms": round(percentile(timings, 0.95), 2),
+                "bytes": len(response.content),
+            }
+        return results
+
+    @staticmethod
+    def _check(budgets, results, ignore_latency):
+        checks = [("queries", "queries"), ("bytes", "bytes")]
+        if not ignore_latency:
+            checks.append(("p95_ms", "p95_ms"))
+        failures = []
+        for name, result in results.items():
+            budget = budgets.get(name)
+            if budget is None:
+                failures.append(f"{name}: no budget")
+                continue
+            for key, budget_key in checks:
+                if budget_key in budget and result[key] > budget[budget_key]:
+                    failures.append(
+                        f"{name}: {key} {result[key]} > {budget[budget_key]}"
+                    )
+        return failures
+
+    def _update_budgets(self, path, results):
+        try:
+            with open(path) as file:
+                budgets = json.load(file)
+        except FileNotFoundError:
+            budgets = {}
+        for name, result in results.items():
+            budget = budgets.setdefault(name, {})
+            budget["queries"] = result["queries"]
+            budget["bytes"] = max(
+                budget.get("bytes", 0), int(result["bytes"] * 1.25)
+            )
+            budget.setdefault("p95_ms", max(50, round(result["p95_ms"] * 3)))
+        with open(path, "w") as file:
+            json.dump(budgets, file, indent=2, sort_keys=True)
+            file.write("\n")
+        self.stdout.write(f"Budgets written to {path}")
+
+    @staticmethod
+    def _commit():
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "HEAD"],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -0,0 +1,218 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from django.contrib.auth import get_user_model
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.benchmarks import allowed_host, percentile
+from airport.models import Flight
+from airport.throttling import throttling_disabled
+
+BENCHMARK_USER = "async-benchmark@example.com"
+
+
+class Command(BaseCommand):
+    """Django command to compare the WSGI and ASGI flight read paths"""
+
+    help = (
+        "Send concurrent GET requests for the flight list and detail "
+        "in-process through the WSGI handler backed by a fixed pool of "
+        "worker threads, and through the ASGI handler. Every client holds "
+        "its connection for --client-delay after the response, like a slow "
+        "client would. Reports throughput and p50/p95 latency measured "
+        "from the start of the burst."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=400)
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=100,
+            help="Number of clients connected at the same time.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=8,
+            help="Number of WSGI worker threads.",
+        )
+        parser.add_argument(
+            "--client-delay",
+            type=float,
+            default=50,
+            help="Milliseconds each client needs to read the response.",
+        )
+
+    def handle(self, *args, **options):
+        user, created = get_user_model().objects.get_or_create(
+            email=BENCHMARK_USER
+        )
+        self.authorization = f"Bearer {AccessToken.for_user(user)}"
+        self.delay = options["client_delay"] / 1000
+        self.host = allowed_host()
+        flight = Flight.objects.order_by("pk").first()
+
+        paths = [("list", reverse("airport:flight-list"),
+                  reverse("airport:async-flight-list"))]
+        if flight:
+            paths.append((
+                "detail",
+                reverse("airport:flight-detail", args=[flight.pk]),
+                reverse("airport:async-flight-detail", args=[flight.pk]),
+            ))
+
+        try:
+            with throttling_disabled():
+                for name, sync_path, async_path in paths:
+                    self.stdout.write(
+                        f"{name} ({options['requests']} requests, "
+                        f"{options['concurrency']} clients)"
+                    )
+                    self._report(
+                        f"wsgi {sync_path}",
+                        self._run_wsgi(
+                            sync_path, options["requests"], options["workers"]
+                        ),
+                    )
+                    self._report(
+                        f"asgi {sync_path}",
+                        self._run_asgi(
+                            sync_path,
+                            options["requests"],
+                            options["concurrency"],
+                        ),
+                    )
+                    self._report(
+                        f"asgi {async_path}",
+                        self._run_asgi(
+                            async_path,
+                            options["requests"],
+                            options["concurrency"],
+                        ),
+                    )
+        finally:
+            if created:
+                user.delete()
+
+    def _report(self, label, result):
+        elapsed, latencies, failed = result
+        latencies.sort()
+        p95 = percentile(latencies, 0.95)
+        line = (
+            f"  {label:<40} {len(latencies) / elapsed:8.1f} req/s  "
+            f"p50 {statistics.median(latencies) * 1000:7.1f} ms  "
+            f"p95 {p95 * 1000:7.1f} ms"
+        )
+        if failed:
+            line += f"  {failed} non-200"
+        self.stdout.write(line)
+
+    def _run_wsgi(self, path, total, workers):
+        application = get_wsgi_application()
+        url = urlsplit(path)
+
+        def request(submitted):
+            status = []
+            environ = {
+                "REQUEST_METHOD": "GET",
+                "PATH_INFO": url.path,
+                "QUERY_STRING": url.query,
+                "SERVER_NAME": self.host,
+                "SERVER_PORT": "80",
+                "SERVER_PROTOCOL": "HTTP/1.1",
+                "HTTP_HOST": self.host,
+                "HTTP_AUTHORIZATION": self.authorization,
+                "wsgi.version": (1, 0),
+                "wsgi.url_scheme": "http",
+                "wsgi.input": BytesIO(),
+                "wsgi.errors": BytesIO(),
+                "wsgi.multithread": True,
+                "wsgi.multiprocess": False,
+                "wsgi.run_once": False,
+            }
+            response = application(
+                environ, lambda code, headers: status.append(code)
+            )
+            try:
+                b"".join(response)
+            finally:
+                response.close()
+            latency = time.perf_counter() - submitted
+            time.sleep(self.delay)
+            return latency, status[0].startswith("200")
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(workers) as pool:
+            results = list(pool.map(request, [start] * total))
+            pool.submit(connections.close_all).result()
+        elapsed = time.perf_counter() - start
+        return (
+            elapsed,
+            [latency for latency, _ in results],
+            sum(not ok for _, ok in results),
+        )
+
+    def _run_asgi(self, path, total, concurrency):
+        application = get_asgi_application()
+        url = urlsplit(path)
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": url.path,
+            "raw_path": url.path.encode(),
+            "query_string": url.query.encode(),
+            "root_path": "",
+            "headers": [
+                (b"host", self.host.encode()),
+                (b"authorization", self.authorization.encode()),
+            ],
+            "server": (self.host, 80),
+        }
+
+        async def request(slots, submitted):
+            status = []
+            done = asyncio.Event()
+
+            async def receive():
+                return {"type": "http.request", "body": b""}
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    status.append(message["status"])
+                elif not message.get("more_body"):
+                    done.set()
+
+            async with slots:
+                await application(dict(scope), receive, send)
+                await done.wait()
+                latency = time.perf_counter() - submitted
+                await asyncio.sleep(self.delay)
+            return latency, status[0] == 200
+
+        async def run():
+            slots = asyncio.Semaphore(concurrency)
+            start = time.perf_counter()
+            results = await asyncio.gather(
+                *(request(slots, start) for _ in range(total))
+            )
+            return time.perf_counter() - start, results
+
+        elapsed, results = asyncio.run(run())
+        return (
+            elapsed,
+            [latency for latency, _ in results],
+            sum(not ok for _, ok in results),
+        )
@@ -0,0 +1,130 @@
+import time
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from airport.benchmarks import SMALL_DATASET, allowed_host
+from airport.fast_serializers import (
+    AirplaneValuesSerializer,
+    FlightListValuesSerializer,
+    RouteListValuesSerializer,
+)
+from airport.serializers import (
+    AirplaneSerializer,
+    FlightListSerializer,
+    RouteListSerializer,
+)
+from airport.views import (
+    AirplaneViewSet,
+    FlightViewSet,
+    RouteViewSet,
+    annotate_tickets_available,
+)
+
+
+def _lists():
+    # name: (queryset, ModelSerializer, values serializer)
+    return {
+        "flights": (
+            annotate_tickets_available(
+                FlightViewSet.queryset.order_by("departure_time", "id")
+            ),
+            FlightListSerializer,
+            FlightListValuesSerializer,
+        ),
+        "routes": (
+            RouteViewSet.queryset.order_by("id"),
+            RouteListSerializer,
+            RouteListValuesSerializer,
+        ),
+        "airplanes": (
+            AirplaneViewSet.queryset.order_by("id"),
+            AirplaneSerializer,
+            AirplaneValuesSerializer,
+        ),
+    }
+
+
+class Command(BaseCommand):
+    """Django command to compare ModelSerializer and values() list pages"""
+
+    help = (
+        "Fetch, serialize and render pages of the flight, route and "
+        "airplane lists with the ModelSerializers and with the values() "
+        "serializers of AIRPORT_FAST_LISTS, check that both produce the "
+        "same JSON and report pages per second for each page size."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--page-sizes", type=int, nargs="+", default=[20, 100, 500]
+        )
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument(
+            "--seed",
+            type=int,
+            help="Run against a small seed_perf_data dataset generated "
+                 "with this seed and rolled back afterwards.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options["seed"] is not None:
+                call_command(
+                    "seed_perf_data",
+                    seed=options["seed"],
+                    stdout=StringIO(),
+                    **SMALL_DATASET,
+                )
+            self._run(options["page_sizes"], options["iterations"])
+            transaction.set_rollback(True)
+
+    def _run(self, page_sizes, iterations):
+        request = Request(
+            APIRequestFactory().get("/", SERVER_NAME=allowed_host())
+        )
+        context = {"request": request}
+        renderer = JSONRenderer()
+
+        for name, classes in _lists().items():
+            queryset, serializer_class, values_class = classes
+            for page_size in page_sizes:
+                def model_page():
+                    rows = list(queryset[:page_size])
+                    return renderer.render(serializer_class(
+                        rows, many=True, context=context
+                    ).data), len(rows)
+
+                def values_page():
+                    serializer = values_class(context=context)
+                    rows = list(serializer.values(queryset)[:page_size])
+                    return renderer.render(
+                        serializer.to_representation(rows)
+                    ), len(rows)
+
+                (expected, rows), (content, _) = model_page(), values_page()
+                if content != expected:
+                    raise CommandError(
+                        f"{name}: values() output differs from "
+                        f"{serializer_class.__name__}"
+                    )
+                model_rate = self._pages_per_second(model_page, iterations)
+                values_rate = self._pages_per_second(values_page, iterations)
+                self.stdout.write(
+                    f"{name:<10} {page_size:>5} per page ({rows:>5} rows)  "
+                    f"ModelSerializer {model_rate:8.1f} pages/s  "
+                    f"values() {values_rate:8.1f} pages/s  "
+                    f"{values_rate / model_rate:4.1f}x"
+                )
+
+    @staticmethod
+    def _pages_per_second(render_page, iterations):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            render_page()
+        return iterations / (time.perf_counter() - start)
@@ -0,0 +1,84 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework.throttling import UserRateThrottle
+
+from airport.throttling import SharedUserRateThrottle
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    """Django command to measure the per-request cost of throttling"""
+
+    help = (
+        "Compare DRF's cache-backed UserRateThrottle with the shared "
+        "token-bucket throttle. Reports microseconds and queries per "
+        "request as the request history grows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=5000,
+            help="Number of throttled requests per throttle class.",
+        )
+        parser.add_argument(
+            "--checkpoints",
+            type=int,
+            default=5,
+            help="Number of points at which to report the cost.",
+        )
+
+    def handle(self, *args, **options):
+        total = options["requests"]
+        step = max(1, total // options["checkpoints"])
+        rate = f"{total * 2}/day"
+
+        try:
+            with transaction.atomic():
+                user = get_user_model().objects.create_user(
+                    "throttle-benchmark@example.com", "benchmark"
+                )
+                request = Request(APIRequestFactory().get("/"))
+                request.user = user
+                for throttle_class in (
+                    UserRateThrottle,
+                    SharedUserRateThrottle,
+                ):
+                    self._run(throttle_class, rate, request, total, step)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _run(self, throttle_class, rate, request, total, step):
+        throttle_class = type(
+            throttle_class.__name__, (throttle_class,), {"rate": rate}
+        )
+        throttle = throttle_class()
+        cache.delete(throttle.get_cache_key(request, None))
+        self.stdout.write(throttle_class.__name__)
+
+        done = 0
+        while done < total:
+            batch = min(step, total - done)
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                for _ in range(batch):
+                    throttle_class().allow_request(request, None)
+                elapsed = time.perf_counter() - start
+            done += batch
+            self.stdout.write(
+                f"  {done:>8} requests: "
+                f"{elapsed / batch * 1e6:8.1f} us/request, "
+                f"{len(queries) / batch:.1f} queries/request"
+            )
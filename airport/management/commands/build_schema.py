@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from airport.schema import forget_schema, generate_schema, schema_file
+
+
+class Command(BaseCommand):
+    """Django command to regenerate the precomputed OpenAPI schema"""
+
+    help = (
+        "Write the OpenAPI schema served at /api/schema/ to "
+        "AIRPORT_SCHEMA_FILE, or with --check fail when that file is out "
+        "of date."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only compare the file with a freshly generated schema.",
+        )
+
+    def handle(self, *args, **options):
+        path = schema_file()
+        schema = generate_schema()
+
+        if options["check"]:
+            if not path.exists() or path.read_bytes() != schema:
+                raise CommandError(
+                    f"{path} is out of date, run "
+                    "'python manage.py build_schema' and commit it"
+                )
+            self.stdout.write(self.style.SUCCESS(f"{path} is up to date"))
+            return
+
+        path.write_bytes(schema)
+        forget_schema()
+        self.stdout.write(self.style.SUCCESS(f"Schema written to {path}"))
@@ -0,0 +1,479 @@
+import csv
+import json
+import os
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from airport.analytics import departure_day, rebuild_route_loads
+from airport.bulk import (
+    can_copy,
+    insert_rows,
+    insert_rows_returning_pks,
+)
+from airport.cache import bump_model_version
+from airport.inventory import SeatMap
+from airport.models import (
+    Airport,
+    AirplaneType,
+    Airplane,
+    Route,
+    Crew,
+    Flight,
+)
+
+KINDS = (
+    "airports",
+    "airplane_types",
+    "airplanes",
+    "routes",
+    "crew",
+    "flights",
+)
+
+
+class LineError(Exception):
+    pass
+
+
+def _required(record, name):
+    value = record.get(name)
+    if value is None or str(value).strip() == "":
+        raise LineError(f"{name} is required")
+    return str(value).strip()
+
+
+def _positive_int(record, name):
+    try:
+        value = int(_required(record, name))
+    except ValueError:
+        raise LineError(f"{name} must be an integer")
+    if value < 1:
+        raise LineError(f"{name} must be positive")
+    return value
+
+
+def _datetime(record, name):
+    try:
+        value = parse_datetime(_required(record, name))
+    except ValueError:
+        value = None
+    if value is None:
+        raise LineError(f"{name} must be an ISO 8601 datetime")
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def _crew_names(record):
+    names = record.get("crew") or []
+    if isinstance(names, str):
+        names = names.split(";")
+    result = []
+    for name in names:
+        first_name, _, last_name = str(name).strip().partition(" ")
+        if first_name:
+            result.append((first_name, last_name.strip()))
+    return result
+
+
+class Command(BaseCommand):
+    """Django command to bulk-import airports, fleet and flights"""
+
+    help = (
+        "Import schedule data from CSV or JSONL files named after what "
+        "they contain: airports, airplane_types, airplanes, routes, crew "
+        "and flights (ex. flights.csv). Files are loaded in that order, "
+        "other models are referenced by name. Rows that already exist are "
+        "skipped, rows with errors are reported with their line number."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="+")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Number of lines resolved and inserted at a time.",
+        )
+        parser.add_argument(
+            "--no-copy",
+            action="store_true",
+            help="Use bulk_create even when PostgreSQL COPY is available.",
+        )
+
+    def handle(self, *args, **options):
+        files = []
+        for path in options["paths"]:
+            kind, extension = os.path.splitext(os.path.basename(path))
+            if kind not in KINDS:
+                raise CommandError(
+                    f"{path}: file name must be one of {', '.join(KINDS)}"
+                )
+            if extension not in (".csv", ".jsonl"):
+                raise CommandError(f"{path}: use a .csv or .jsonl file")
+            files.append((KINDS.index(kind), kind, path))
+
+        self.batch_size = options["batch_size"]
+        self.use_copy = not options["no_copy"] and can_copy()
+        self.errors = 0
+        self.flight_days = set()
+        imported_kinds = set()
+
+        for _, kind, path in sorted(files):
+            if self._import_file(kind, path):
+                imported_kinds.add(kind)
+
+        for kind, model in (
+            ("airports", Airport),
+            ("airplane_types", AirplaneType),
+            ("routes", Route),
+            ("crew", Crew),
+        ):
+            if kind in imported_kinds:
+                bump_model_version(model)
+        if self.flight_days:
+            count = rebuild_route_loads(
+                min(self.flight_days), max(self.flight_days)
+            )
+            self.stdout.write(f"route loads: {count} route day(s) rebuilt")
+
+        message = f"Done, {self.errors} line(s) with errors"
+        if self.errors:
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS(message))
+
+    def _read(self, path):
+        with open(path, newline="", encoding="utf-8") as file:
+            if path.endswith(".csv"):
+                reader = csv.DictReader(file)
+                for record in reader:
+                    yield reader.line_num, record
+                return
+            for line_number, line in enumerate(file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as error:
+                    yield line_number, LineError(f"invalid JSON: {error}")
+                    continue
+                if not isinstance(record, dict):
+                    record = LineError("expected a JSON object")
+                yield line_number, record
+
+    def _import_file(self, kind, path):
+        handler = getattr(self, f"_import_{kind}")
+        lines = self._read(path)
+        totals = {"lines": 0, "imported": 0, "skipped": 0, "errors": 0}
+        start = time.perf_counter()
+
+        while True:
+            batch = list(islice(lines, self.batch_size))
+            if not batch:
+                break
+            records = []
+            for line_number, record in batch:
+                if isinstance(record, LineError):
+                    self._error(path, line_number, record, totals)
+                else:
+                    records.append((line_number, record))
+
+            with transaction.atomic():
+                rows = []
+                for line_number, record in records:
+                    try:
+                        rows.append((line_number, handler(record)))
+                    except LineError as error:
+                        self._error(path, line_number, error, totals)
+                imported, skipped = getattr(self, f"_insert_{kind}")(
+                    rows, path, totals
+                )
+
+            totals["lines"] += len(batch)
+            totals["imported"] += imported
+            totals["skipped"] += skipped
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f"{kind}: {totals['lines']} lines, "
+                f"{totals['imported']} imported, "
+                f"{totals['skipped']} skipped, "
+                f"{totals['errors']} errors, "
+                f"{totals['lines'] / elapsed:.0f} lines/s"
+            )
+        return totals["imported"]
+
+    def _error(self, path, line_number, error, totals):
+        totals["errors"] += 1
+        self.errors += 1
+        self.stderr.write(f"{path}:{line_number}: {error}")
+
+    @staticmethod
+    def _lookup(queryset, key_fields, keys, value_fields=("pk",)):
+        """Map ``key_fields`` tuples to ``value_fields`` in one query"""
+        keys = set(keys)
+        if not keys:
+            return {}
+        filters = {
+            f"{field}__in": {key[index] for key in keys}
+            for index, field in enumerate(key_fields)
+        }
+        found = {}
+        for row in queryset.filter(**filters).values_list(
+            *key_fields, *value_fields
+        ).order_by("pk"):
+            key = row[:len(key_fields)]
+            if key in keys:
+                found.setdefault(key, row[len(key_fields):])
+        return found
+
+    @staticmethod
+    def _unique_new(rows, existing):
+        """Drop rows whose key exists or repeats an earlier row"""
+        new, seen, skipped = [], set(existing), 0
+        for line_number, (key, values) in rows:
+            if key in seen:
+                skipped += 1
+                continue
+            seen.add(key)
+            new.append(values)
+        return new, skipped
+
+    def _import_airports(self, record):
+        name = _required(record, "name")
+        return (name,), (name, _required(record, "closest_big_city"))
+
+    def _insert_airports(self, rows, path, totals):
+        existing = self._lookup(
+            Airport.objects, ("name",), (key for _, (key, _) in rows)
+        )
+        new, skipped = self._unique_new(rows, existing)
+        insert_rows(
+            Airport, ("name", "closest_big_city"), new, self.use_copy
+        )
+        return len(new), skipped
+
+    def _import_airplane_types(self, record):
+        name = _required(record, "name")
+        return (name,), (name,)
+
+    def _insert_airplane_types(self, rows, path, totals):
+        existing = self._lookup(
+            AirplaneType.objects, ("name",), (key for _, (key, _) in rows)
+        )
+        new, skipped = self._unique_new(rows, existing)
+        insert_rows(AirplaneType, ("name",), new, self.use_copy)
+        return len(new), skipped
+
+    def _import_airplanes(self, record):
+        name = _required(record, "name")
+        airplane_type = (record.get("airplane_type") or "").strip()
+        return (name,), (
+            name,
+            _positive_int(record, "rows"),
+            _positive_int(record, "seats_in_row"),
+            airplane_type or None,
+        )
+
+    def _insert_airplanes(self, rows, path, totals):
+        types = self._lookup(
+            AirplaneType.objects,
+            ("name",),
+            ((values[3],) for _, (_, values) in rows if values[3]),
+        )
+        resolved = []
+        for line_number, (key, values) in rows:
+            airplane_type = values[3]
+            if airplane_type and (airplane_type,) not in types:
+                self._error(
+                    path,
+                    line_number,
+                    f"unknown airplane_type {airplane_type!r}",
+                    totals,
+                )
+                continue
+            type_id = types[(airplane_type,)][0] if airplane_type else None
+            resolved.append((line_number, (key, (*values[:3], type_id))))
+
+        existing = self._lookup(
+            Airplane.objects, ("name",), (key for _, (key, _) in resolved)
+        )
+        new, skipped = self._unique_new(resolved, existing)
+        insert_rows(
+            Airplane,
+            ("name", "rows", "seats_in_row", "airplane_type_id"),
+            new,
+            self.use_copy,
+        )
+        return len(new), skipped
+
+    def _import_routes(self, record):
+        source = _required(record, "source")
+        destination = _required(record, "destination")
+        return (source, destination), _positive_int(record, "distance")
+
+    def _airport_ids(self, rows, path, totals):
+        airports = self._lookup(
+            Airport.objects,
+            ("name",),
+            ((name,) for _, (key, _) in rows for name in key[:2]),
+        )
+        resolved = []
+        for line_number, (key, values) in rows:
+            missing = [name for name in key[:2] if (name,) not in airports]
+            if missing:
+                self._error(
+                    path,
+                    line_number,
+                    f"unknown airport {missing[0]!r}",
+                    totals,
+                )
+                continue
+            route = (airports[(key[0],)][0], airports[(key[1],)][0])
+            resolved.append((line_number, route, key, values))
+        return resolved
+
+    def _insert_routes(self, rows, path, totals):
+        resolved = [
+            (line_number, (route, (*route, distance)))
+            for line_number, route, _, distance in self._airport_ids(
+                rows, path, totals
+            )
+        ]
+        existing = self._lookup(
+            Route.objects,
+            ("source_id", "destination_id"),
+            (route for _, (route, _) in resolved),
+        )
+        new, skipped = self._unique_new(resolved, existing)
+        insert_rows(
+            Route,
+            ("source_id", "destination_id", "distance"),
+            new,
+            self.use_copy,
+        )
+        return len(new), skipped
+
+    def _import_crew(self, record):
+        name = (
+            _required(record, "first_name"), _required(record, "last_name")
+        )
+        return name, name
+
+    def _insert_crew(self, rows, path, totals):
+        existing = self._lookup(
+            Crew.objects,
+            ("first_name", "last_name"),
+            (key for _, (key, _) in rows),
+        )
+        new, skipped = self._unique_new(rows, existing)
+        insert_rows(
+            Crew, ("first_name", "last_name"), new, self.use_copy
+        )
+        return len(new), skipped
+
+    def _import_flights(self, record):
+        departure_time = _datetime(record, "departure_time")
+        arrival_time = _datetime(record, "arrival_time")
+        if arrival_time <= departure_time:
+            raise LineError("arrival_time must be after departure_time")
+        return (
+            (_required(record, "source"), _required(record, "destination")),
+            (
+                _required(record, "airplane"),
+                departure_time,
+                arrival_time,
+                _crew_names(record),
+            ),
+        )
+
+    def _insert_flights(self, rows, path, totals):
+        airports = self._airport_ids(rows, path, totals)
+        routes = self._lookup(
+            Route.objects,
+            ("source_id", "destination_id"),
+            (route for _, route, _, _ in airports),
+        )
+        airplanes = self._lookup(
+            Airplane.objects,
+            ("name",),
+            ((values[0],) for _, _, _, values in airports),
+            ("pk", "rows", "seats_in_row"),
+        )
+        crew = self._lookup(
+            Crew.objects,
+            ("first_name", "last_name"),
+            (name for _, _, _, values in airports for name in values[3]),
+        )
+
+        resolved = []
+        for line_number, route, key, values in airports:
+            airplane, departure_time, arrival_time, crew_names = values
+            error = None
+            if route not in routes:
+                error = f"no route from {key[0]!r} to {key[1]!r}"
+            elif (airplane,) not in airplanes:
+                error = f"unknown airplane {airplane!r}"
+            else:
+                unknown = [name for name in crew_names if name not in crew]
+                if unknown:
+                    error = f"unknown crew member {' '.join(unknown[0])!r}"
+            if error:
+                self._error(path, line_number, error, totals)
+                continue
+            route_id = routes[route][0]
+            airplane_id, rows_count, seats_in_row = airplanes[(airplane,)]
+            resolved.append((
+                line_number,
+                (
+                    (route_id, airplane_id, departure_time),
+                    (
+                        route_id,
+                        airplane_id,
+                        departure_time,
+                        arrival_time,
+                        SeatMap(rows_count, seats_in_row).to_bytes(),
+                        0,
+                        [crew[name][0] for name in crew_names],
+                    ),
+                ),
+            ))
+
+        existing = self._lookup(
+            Flight.objects,
+            ("route_id", "airplane_id", "departure_time"),
+            (flight for _, (flight, _) in resolved),
+        )
+        new, skipped = self._unique_new(resolved, existing)
+        fields = (
+            "route_id",
+            "airplane_id",
+            "departure_time",
+            "arrival_time",
+            "seat_map",
+            "tickets_sold",
+        )
+        pks = insert_rows_returning_pks(
+            Flight,
+            fields,
+            (values[:-1] for values in new),
+            self.use_copy,
+        )
+
+        insert_rows(
+            Flight.crew.through,
+            ("flight_id", "crew_id"),
+            (
+                (pk, crew_id)
+                for pk, values in zip(pks, new)
+                for crew_id in dict.fromkeys(values[-1])
+            ),
+            self.use_copy,
+        )
+        self.flight_days.update(departure_day(values[2]) for values in new)
+        return len(new), skipped
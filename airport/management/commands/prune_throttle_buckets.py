@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from airport.throttling import delete_idle_buckets, refill_seconds
+
+
+class Command(BaseCommand):
+    """Django command to delete throttle buckets of idle clients"""
+
+    help = (
+        "Delete ThrottleBucket rows that were not used for longer than the "
+        "longest throttle rate duration. They have refilled completely, so "
+        "the clients start over with the same tokens."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--idle-seconds",
+            type=int,
+            default=None,
+            help=(
+                "Delete buckets idle for longer than this. Defaults to the "
+                "longest duration in DEFAULT_THROTTLE_RATES."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        idle_seconds = options["idle_seconds"]
+        if idle_seconds is None:
+            idle_seconds = refill_seconds()
+        deleted = delete_idle_buckets(idle_seconds)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{deleted} bucket(s) idle for over {idle_seconds}s deleted"
+            )
+        )
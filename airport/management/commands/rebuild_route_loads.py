@@ -0,0 +1,39 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from airport.analytics import rebuild_route_loads
+
+
+def _date(value):
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+class Command(BaseCommand):
+    """Django command to recompute the route load factor rollup"""
+
+    help = (
+        "Recompute the RouteDailyLoad rows from the flights, for every day "
+        "or for the days from --from to --to."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--from",
+            dest="first_day",
+            type=_date,
+            help="First departure day, YYYY-MM-DD.",
+        )
+        parser.add_argument(
+            "--to",
+            dest="last_day",
+            type=_date,
+            help="Last departure day, YYYY-MM-DD.",
+        )
+
+    def handle(self, *args, **options):
+        first_day, last_day = options["first_day"], options["last_day"]
+        if first_day and last_day and first_day > last_day:
+            raise CommandError("--from must not be after --to")
+        count = rebuild_route_loads(first_day, last_day)
+        self.stdout.write(self.style.SUCCESS(f"{count} route day(s) rebuilt"))
@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F
+
+from airport.inventory import rebuild_seat_map
+from airport.models import Flight
+from airport.partitions import archived_before
+
+
+class Command(BaseCommand):
+    """Django command to fix flights whose tickets_sold counter drifted"""
+
+    help = (
+        "Compare Flight.tickets_sold with the real number of tickets and "
+        "rebuild the counter and seat map of every flight that differs. "
+        "Flights of detached ticket partitions are skipped, their tickets "
+        "are archived and no longer counted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report drifted flights, do not change them.",
+        )
+
+    def handle(self, *args, **options):
+        drifted = (
+            Flight.objects.select_related("airplane")
+            .annotate(tickets_count=Count("tickets"))
+            .exclude(tickets_sold=F("tickets_count"))
+            .order_by("pk")
+        )
+        archived = archived_before()
+        if archived is not None:
+            drifted = drifted.filter(departure_time__gte=archived)
+        fixed = 0
+        for flight in drifted.iterator():
+            self.stdout.write(
+                f"Flight {flight.pk}: tickets_sold={flight.tickets_sold}, "
+                f"tickets={flight.tickets_count}"
+            )
+            if not options["dry_run"]:
+                with transaction.atomic():
+                    locked = (
+                        Flight.objects.select_for_update(of=("self",))
+                        .select_related("airplane")
+                        .get(pk=flight.pk)
+                    )
+                    rebuild_seat_map(locked)
+            fixed += 1
+
+        if options["dry_run"]:
+            self.stdout.write(f"{fixed} flight(s) drifted")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{fixed} flight(s) fixed"))
@@ -0,0 +1,437 @@
+import math
+import random
+import time
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from airport.analytics import rebuild_route_loads
+from airport.bulk import can_copy, insert_rows, insert_rows_returning_pks
+from airport.cache import bump_model_version
+from airport.inventory import SeatMap
+from airport.models import (
+    Airport,
+    AirplaneType,
+    Airplane,
+    Route,
+    Crew,
+    Flight,
+    Order,
+    Ticket,
+)
+from airport.partitions import create_ticket_partitions, tickets_partitioned
+
+FLEET = (
+    ("Airbus A320", "Narrow-body", 30, 6),
+    ("Airbus A321neo", "Narrow-body", 37, 6),
+    ("Boeing 737-800", "Narrow-body", 32, 6),
+    ("Boeing 737 MAX 8", "Narrow-body", 33, 6),
+    ("Embraer E190", "Regional", 25, 4),
+    ("ATR 72-600", "Regional", 18, 4),
+    ("Boeing 787-9", "Wide-body", 33, 9),
+    ("Airbus A350-900", "Wide-body", 36, 9),
+    ("Boeing 777-300ER", "Wide-body", 42, 10),
+)
+
+FIRST_NAMES = (
+    "Ivan", "Olena", "Andrii", "Maria", "Taras", "Sofia", "Dmytro", "Anna",
+    "Mykola", "Iryna", "Oleh", "Kateryna", "Yurii", "Natalia", "Petro",
+    "Oksana", "Serhii", "Yulia", "Bohdan", "Daryna",
+)
+
+LAST_NAMES = (
+    "Shevchenko", "Kovalenko", "Bondarenko", "Tkachenko", "Kravchenko",
+    "Oliinyk", "Shevchuk", "Polishchuk", "Lysenko", "Melnyk", "Boiko",
+    "Savchenko", "Rudenko", "Marchenko", "Moroz", "Petrenko", "Klymenko",
+    "Pavlenko", "Ponomarenko", "Hrytsenko",
+)
+
+ORDER_SIZES = (1, 1, 1, 1, 2, 2, 2, 3, 4)
+CRUISE_KM_PER_MINUTE = 13.3
+FLIGHT_CHUNK = 1000
+
+
+def _code(index):
+    letters = []
+    for _ in range(3):
+        index, letter = divmod(index, 26)
+        letters.append(chr(ord("A") + letter))
+    return "".join(reversed(letters))
+
+
+def _distance(first, second):
+    lat1, lon1 = map(math.radians, first)
+    lat2, lon2 = map(math.radians, second)
+    haversine = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return max(50, int(6371 * 2 * math.asin(math.sqrt(haversine))))
+
+
+class Command(BaseCommand):
+    """Django command to fill the database with synthetic airport data"""
+
+    help = (
+        "Generate airports, a route graph, a fleet with real seat layouts, "
+        "crew, flights, users, orders and tickets in bulk. The same --seed "
+        "always generates the same data. Seat maps and tickets_sold are "
+        "filled in consistently with the generated tickets."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--airports", type=int, default=2000)
+        parser.add_argument(
+            "--routes-per-airport",
+            type=int,
+            default=10,
+            help="Outgoing routes of every airport.",
+        )
+        parser.add_argument("--airplanes", type=int, default=500)
+        parser.add_argument("--crew", type=int, default=5000)
+        parser.add_argument("--users", type=int, default=10000)
+        parser.add_argument("--flights", type=int, default=100000)
+        parser.add_argument(
+            "--tickets",
+            type=int,
+            default=2000000,
+            help="Approximate total, no flight gets more than capacity.",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=365,
+            help="Flights depart within this many days from --start.",
+        )
+        parser.add_argument(
+            "--start",
+            type=lambda value: datetime.strptime(value, "%Y-%m-%d"),
+            default=datetime(2024, 1, 1),
+            help="First departure date, YYYY-MM-DD.",
+        )
+        parser.add_argument(
+            "--no-copy",
+            action="store_true",
+            help="Use bulk_create even when PostgreSQL COPY is available.",
+        )
+
+    def handle(self, *args, **options):
+        minimums = {
+            "airports": 2,
+            "routes_per_airport": 1,
+            "airplanes": 1,
+            "users": 1,
+        }
+        for name, minimum in minimums.items():
+            if options[name] < minimum:
+                raise CommandError(
+                    f"--{name.replace('_', '-')} must be at least {minimum}"
+                )
+        if get_user_model().objects.filter(
+            email=self._email(options["seed"], 0)
+        ).exists():
+            raise CommandError(
+                f"Data for seed {options['seed']} already exists, "
+                f"use another --seed"
+            )
+
+        self.seed = options["seed"]
+        self.random = random.Random(options["seed"])
+        self.use_copy = not options["no_copy"] and can_copy()
+        self.started = time.perf_counter()
+        start = timezone.make_aware(options["start"])
+
+        with transaction.atomic():
+            airports = self._airports(options["airports"])
+            routes = self._routes(airports, options["routes_per_airport"])
+            airplanes = self._airplanes(options["airplanes"])
+            crew = self._crew(options["crew"])
+            users = self._users(
+                options["users"], joined=start - timedelta(days=365)
+            )
+        bump_model_version(Airport)
+        bump_model_version(AirplaneType)
+        bump_model_version(Route)
+        bump_model_version(Crew)
+
+        if tickets_partitioned():
+            create_ticket_partitions(
+                start, start + timedelta(days=options["days"])
+            )
+        self._flights(
+            routes,
+            airplanes,
+            crew,
+            users,
+            options["flights"],
+            options["tickets"],
+            start,
+            options["days"],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Done in {time.perf_counter() - self.started:.1f}s"
+        ))
+
+    def _progress(self, message):
+        self.stdout.write(
+            f"[{time.perf_counter() - self.started:7.1f}s] {message}"
+        )
+
+    def _airports(self, count):
+        positions = [
+            (self.random.uniform(-60, 70), self.random.uniform(-180, 180))
+            for _ in range(count)
+        ]
+        pks = insert_rows_returning_pks(
+            Airport,
+            ("name", "closest_big_city"),
+            (
+                (f"{_code(index)} International", f"City {_code(index)}")
+                for index in range(count)
+            ),
+            self.use_copy,
+        )
+        self._progress(f"{count} airports")
+        return list(zip(pks, positions))
+
+    def _routes(self, airports, per_airport):
+        rows = []
+        for index, (source, position) in enumerate(airports):
+            others = self.random.sample(
+                range(len(airports) - 1), min(per_airport, len(airports) - 1)
+            )
+            for other in others:
+                if other >= index:
+                    other += 1
+                destination, destination_position = airports[other]
+                rows.append((
+                    source,
+                    destination,
+                    _distance(position, destination_position),
+                ))
+        pks = insert_rows_returning_pks(
+            Route,
+            ("source_id", "destination_id", "distance"),
+            rows,
+            self.use_copy,
+        )
+        self._progress(f"{len(pks)} routes")
+        return [(pk, distance) for pk, (_, _, distance) in zip(pks, rows)]
+
+    def _airplanes(self, count):
+        type_names = sorted({type_name for _, type_name, _, _ in FLEET})
+        type_pks = dict(zip(type_names, insert_rows_returning_pks(
+            AirplaneType,
+            ("name",),
+            ((name,) for name in type_names),
+            self.use_copy,
+        )))
+        rows = []
+        for index in range(count):
+            model, type_name, rows_count, seats_in_row = self.random.choice(
+                FLEET
+            )
+            rows.append((
+                f"{model} #{index + 1}",
+                rows_count,
+                seats_in_row,
+                type_pks[type_name],
+            ))
+        pks = insert_rows_returning_pks(
+            Airplane,
+            ("name", "rows", "seats_in_row", "airplane_type_id"),
+            rows,
+            self.use_copy,
+        )
+        self._progress(f"{count} airplanes")
+        return [(pk, row[1], row[2]) for pk, row in zip(pks, rows)]
+
+    def _crew(self, count):
+        pks = insert_rows_returning_pks(
+            Crew,
+            ("first_name", "last_name"),
+            (
+                (
+                    self.random.choice(FIRST_NAMES),
+                    self.random.choice(LAST_NAMES),
+                )
+                for _ in range(count)
+            ),
+            self.use_copy,
+        )
+        self._progress(f"{count} crew members")
+        return pks
+
+    @staticmethod
+    def _email(seed, index):
+        return f"perf-{seed}-{index}@example.com"
+
+    def _users(self, count, joined):
+        # A fixed salt keeps the hash, and so the rows, equal between runs.
+        password = make_password("perf-password", salt=f"perf{self.seed}")
+        pks = insert_rows_returning_pks(
+            get_user_model(),
+            (
+                "email",
+                "password",
+                "first_name",
+                "last_name",
+                "is_staff",
+                "is_superuser",
+                "is_active",
+                "date_joined",
+            ),
+            (
+                (
+                    self._email(self.seed, index),
+                    password,
+                    self.random.choice(FIRST_NAMES),
+                    self.random.choice(LAST_NAMES),
+                    False,
+                    False,
+                    True,
+                    joined,
+                )
+                for index in range(count)
+            ),
+            self.use_copy,
+        )
+        self._progress(f"{count} users (password: perf-password)")
+        return pks
+
+    def _flights(
+        self, routes, airplanes, crew, users, count, tickets, start, days
+    ):
+        per_flight = tickets / count if count else 0
+        done = tickets_done = 0
+        while done < count:
+            size = min(FLIGHT_CHUNK, count - done)
+            with transaction.atomic():
+                tickets_done += self._flight_chunk(
+                    routes,
+                    airplanes,
+                    crew,
+                    users,
+                    size,
+                    per_flight,
+                    start,
+                    days,
+                )
+            done += size
+            self._progress(f"{done} flights, {tickets_done} tickets")
+
+        count = rebuild_route_loads(
+            timezone.localdate(start),
+            timezone.localdate(start + timedelta(days=days)),
+        )
+        self._progress(f"{count} route load days")
+
+    def _flight_chunk(
+        self, routes, airplanes, crew, users, size, per_flight, start, days
+    ):
+        flights, flight_seats = [], []
+        for _ in range(size):
+            route, distance = self.random.choice(routes)
+            airplane, rows_count, seats_in_row = self.random.choice(airplanes)
+            departure_time = start + timedelta(
+                minutes=5 * self.random.randrange(days * 24 * 12)
+            )
+            arrival_time = departure_time + timedelta(
+                minutes=30 + int(distance / CRUISE_KM_PER_MINUTE)
+            )
+
+            capacity = rows_count * seats_in_row
+            sold = min(
+                capacity, int(per_flight * self.random.uniform(0.5, 1.5))
+            )
+            places = [
+                divmod(position, seats_in_row)
+                for position in self.random.sample(range(capacity), sold)
+            ]
+            places = [(row + 1, seat + 1) for row, seat in places]
+            seat_map = SeatMap.from_tickets(rows_count, seats_in_row, places)
+
+            flights.append((
+                route,
+                airplane,
+                departure_time,
+                arrival_time,
+                seat_map.to_bytes(),
+                sold,
+            ))
+            flight_seats.append((departure_time, places))
+
+        flight_pks = insert_rows_returning_pks(
+            Flight,
+            (
+                "route_id",
+                "airplane_id",
+                "departure_time",
+                "arrival_time",
+                "seat_map",
+                "tickets_sold",
+            ),
+            flights,
+            self.use_copy,
+        )
+        insert_rows(
+            Flight.crew.through,
+            ("flight_id", "crew_id"),
+            (
+                (flight, member)
+                for flight in flight_pks
+                for member in self.random.sample(
+                    crew, min(len(crew), self.random.randint(2, 4))
+                )
+            ),
+            self.use_copy,
+        )
+
+        orders, order_places = [], []
+        for flight, (departure_time, places) in zip(flight_pks, flight_seats):
+            while places:
+                order_size = self.random.choice(ORDER_SIZES)
+                orders.append((
+                    self.random.choice(users),
+                    departure_time - timedelta(
+                        minutes=self.random.randrange(60, 90 * 24 * 60)
+                    ),
+                ))
+                order_places.append(
+                    (flight, departure_time, places[:order_size])
+                )
+                places = places[order_size:]
+
+        order_pks = self._insert_orders(orders)
+        return insert_rows(
+            Ticket,
+            ("order_id", "flight_id", "flight_departure", "row", "seat"),
+            (
+                (order, flight, departure_time, row, seat)
+                for order, (flight, departure_time, places)
+                in zip(order_pks, order_places)
+                for row, seat in places
+            ),
+            self.use_copy,
+        )
+
+    def _insert_orders(self, orders):
+        pks = insert_rows_returning_pks(
+            Order, ("user_id", "created_at"), orders, self.use_copy
+        )
+        if not self.use_copy:
+            # bulk_create stamps auto_now_add fields with the current time.
+            Order.objects.bulk_update(
+                [
+                    Order(pk=pk, created_at=created_at)
+                    for pk, (_, created_at) in zip(pks, orders)
+                ],
+                ["created_at"],
+                batch_size=1000,
+            )
+        return pks
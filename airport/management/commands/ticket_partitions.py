@@ -0,0 +1,83 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from airport.partitions import (
+    add_months,
+    create_ticket_partitions,
+    detach_ticket_partitions,
+    month_start,
+    ticket_partitions,
+    tickets_partitioned,
+)
+
+
+class Command(BaseCommand):
+    """Django command to keep the monthly ticket partitions up to date"""
+
+    help = (
+        "Create the airport_ticket partitions of the current and the next "
+        "--months-ahead months, and detach the partitions older than "
+        "--retention-months. Run it daily, e.g. from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=getattr(settings, "AIRPORT_TICKET_MONTHS_AHEAD", 3),
+            help="Months after the current one that get a partition.",
+        )
+        parser.add_argument(
+            "--retention-months",
+            type=int,
+            default=getattr(settings, "AIRPORT_TICKET_RETENTION_MONTHS", None),
+            help=(
+                "Detach the partitions of months that ended more than this "
+                "many months ago. Nothing is detached by default."
+            ),
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only list the partitions that would change.",
+        )
+
+    def handle(self, *args, **options):
+        if not tickets_partitioned():
+            raise CommandError(
+                "airport_ticket is not partitioned, it is on PostgreSQL "
+                "after migration 0013."
+            )
+        for name in ("months_ahead", "retention_months"):
+            if options[name] is not None and options[name] < 0:
+                raise CommandError(
+                    f"--{name.replace('_', '-')} must not be negative"
+                )
+
+        this_month = month_start(timezone.now())
+        last_month = add_months(this_month, options["months_ahead"])
+        attached = dict(ticket_partitions())
+        if options["dry_run"]:
+            month = this_month
+            while month <= last_month:
+                if month not in attached:
+                    self.stdout.write(f"Would create {month:%Y-%m}")
+                month = add_months(month, 1)
+        else:
+            for name in create_ticket_partitions(this_month, last_month):
+                self.stdout.write(f"Created {name}")
+
+        if options["retention_months"] is not None:
+            before = add_months(this_month, -options["retention_months"])
+            if options["dry_run"]:
+                for month, name in sorted(attached.items()):
+                    if month < before:
+                        self.stdout.write(f"Would detach {name}")
+            else:
+                for name in detach_ticket_partitions(before):
+                    self.stdout.write(f"Detached {name}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(ticket_partitions())} month partition(s) attached"
+        ))
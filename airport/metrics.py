@@ -0,0 +1,94 @@
+import hmac
+import os
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Every worker process started with PROMETHEUS_MULTIPROC_DIR set writes
+# its values to files in that directory, and /metrics adds them up. The
+# directory has to be emptied before the workers start.
+MULTIPROCESS_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+REQUEST_DURATION = Histogram(
+    "airport_request_duration_seconds",
+    "Time to respond to a request, by route name.",
+    ["route", "method"],
+)
+DB_QUERIES = Counter(
+    "airport_db_queries",
+    "Database queries made while responding, by route name.",
+    ["route"],
+)
+DB_DURATION = Counter(
+    "airport_db_duration_seconds",
+    "Time spent in database queries while responding, by route name.",
+    ["route"],
+)
+ORDERS_CREATED = Counter("airport_orders_created", "Orders created.")
+TICKETS_SOLD = Counter(
+    "airport_tickets_sold", "Tickets sold with the created orders."
+)
+SEAT_CONFLICTS = Counter(
+    "airport_seat_conflicts",
+    "Orders rejected because one of their seats was already taken.",
+)
+THROTTLED_REQUESTS = Counter(
+    "airport_throttled_requests",
+    "Requests rejected by a throttle, by throttle scope.",
+    ["scope"],
+)
+
+
+def observe_request(route, method, duration_ms, timings):
+    REQUEST_DURATION.labels(route, method).observe(duration_ms / 1000)
+    DB_QUERIES.labels(route).inc(timings.queries)
+    DB_DURATION.labels(route).inc(timings.db_ms / 1000)
+
+
+def record_order(tickets):
+    ORDERS_CREATED.inc()
+    TICKETS_SOLD.inc(tickets)
+
+
+def collector_registry():
+    """Return the registry to expose, merging all processes if needed"""
+    if MULTIPROCESS_ENV not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def _may_scrape(request):
+    token = getattr(settings, "AIRPORT_METRICS_TOKEN", None)
+    if token:
+        scheme, _, credentials = request.headers.get(
+            "Authorization", ""
+        ).partition(" ")
+        if scheme.lower() == "bearer" and hmac.compare_digest(
+            credentials.encode(), token.encode()
+        ):
+            return True
+    return request.META.get("REMOTE_ADDR") in settings.INTERNAL_IPS
+
+
+def metrics_view(request):
+    """Serve the metrics to ``INTERNAL_IPS`` or ``AIRPORT_METRICS_TOKEN``.
+
+    Anyone else gets a 403, the metrics name every route and how busy it is.
+    """
+    if not _may_scrape(request):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        generate_latest(collector_registry()),
+        content_type=CONTENT_TYPE_LATEST,
+    )
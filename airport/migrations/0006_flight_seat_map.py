@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:19
+
+from django.db import migrations, models
+
+
+def build_seat_maps(apps, schema_editor):
+    from airport.inventory import SeatMap
+
+    Flight = apps.get_model("airport", "Flight")
+    Ticket = apps.get_model("airport", "Ticket")
+
+    flights = Flight.objects.select_related("airplane").filter(
+        tickets__isnull=False
+    ).distinct()
+    for flight in flights.iterator():
+        seat_map = SeatMap.from_tickets(
+            flight.airplane.rows,
+            flight.airplane.seats_in_row,
+            Ticket.objects.filter(flight=flight).values_list("row", "seat"),
+        )
+        Flight.objects.filter(pk=flight.pk).update(
+            seat_map=seat_map.to_bytes()
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("airport", "0005_alter_flight_crew"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="flight",
+            name="seat_map",
+            field=models.BinaryField(blank=True, default=bytes),
+        ),
+        migrations.RunPython(build_seat_maps, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("airport", "0008_flight_departure_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ThrottleBucket",
+            fields=[
+                (
+                    "key",
+                    models.CharField(max_length=255, primary_key=True, serialize=False),
+                ),
+                ("tokens", models.FloatField()),
+                ("updated_at", models.FloatField()),
+                ("allowed", models.BooleanField(default=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0009_throttlebucket"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="airplane",
+            name="image_variants",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
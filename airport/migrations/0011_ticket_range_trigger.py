@@ -0,0 +1,76 @@
+from django.db import migrations
+
+# Rejects tickets outside the rows and seats of the airplane of the flight
+# with the message of Ticket.validate_ticket, so bulk_create(), COPY and
+# raw SQL writes are checked too. Ticket.save() turns the error back into
+# a ValidationError by the constraint name, see Ticket.range_violation().
+CREATE_TRIGGER = """
+CREATE FUNCTION airport_ticket_check_range() RETURNS trigger AS $$
+DECLARE
+    max_rows integer;
+    max_seats integer;
+BEGIN
+    SELECT airplane.rows, airplane.seats_in_row
+    INTO max_rows, max_seats
+    FROM airport_flight flight
+    JOIN airport_airplane airplane ON airplane.id = flight.airplane_id
+    WHERE flight.id = NEW.flight_id;
+    IF NOT FOUND THEN
+        -- Left to the deferred foreign key check.
+        RETURN NEW;
+    END IF;
+    IF NEW."row" NOT BETWEEN 1 AND max_rows THEN
+        RAISE EXCEPTION USING
+            ERRCODE = 'check_violation',
+            CONSTRAINT = 'airport_ticket_range',
+            COLUMN = 'row',
+            MESSAGE = format(
+                'row number must be in available range: (1, rows): (1, %s)',
+                max_rows
+            );
+    END IF;
+    IF NEW.seat NOT BETWEEN 1 AND max_seats THEN
+        RAISE EXCEPTION USING
+            ERRCODE = 'check_violation',
+            CONSTRAINT = 'airport_ticket_range',
+            COLUMN = 'seat',
+            MESSAGE = format(
+                'seat number must be in available range: '
+                '(1, seats_in_row): (1, %s)',
+                max_seats
+            );
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER airport_ticket_range
+BEFORE INSERT OR UPDATE OF "row", seat, flight_id ON airport_ticket
+FOR EACH ROW EXECUTE FUNCTION airport_ticket_check_range();
+"""
+
+DROP_TRIGGER = """
+DROP TRIGGER IF EXISTS airport_ticket_range ON airport_ticket;
+DROP FUNCTION IF EXISTS airport_ticket_check_range();
+"""
+
+
+def _run_on_postgresql(sql):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == "postgresql":
+            schema_editor.execute(sql, params=None)
+
+    return run
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("airport", "0010_airplane_image_variants"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run_on_postgresql(CREATE_TRIGGER),
+            _run_on_postgresql(DROP_TRIGGER),
+        ),
+    ]
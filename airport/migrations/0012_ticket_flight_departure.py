@@ -0,0 +1,40 @@
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_flight_departure(apps, schema_editor):
+    Flight = apps.get_model("airport", "Flight")
+    Ticket = apps.get_model("airport", "Ticket")
+    Ticket.objects.using(schema_editor.connection.alias).update(
+        flight_departure=Subquery(
+            Flight.objects.filter(pk=OuterRef("flight_id")).values(
+                "departure_time"
+            )[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("airport", "0011_ticket_range_trigger"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ticket",
+            name="flight_departure",
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(
+            fill_flight_departure, migrations.RunPython.noop
+        ),
+        migrations.AlterField(
+            model_name="ticket",
+            name="flight_departure",
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.AlterUniqueTogether(
+            name="ticket",
+            unique_together={("flight", "row", "seat", "flight_departure")},
+        ),
+    ]
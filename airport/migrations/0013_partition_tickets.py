@@ -0,0 +1,188 @@
+from django.db import migrations
+
+# Months created ahead of today when the table is partitioned, the
+# ticket_partitions command keeps this window moving afterwards.
+MONTHS_AHEAD = 3
+
+# Creates the airport_ticket_YYYY_MM partition of a month, moving its rows
+# out of the default partition first. Returns NULL when a table of that
+# name exists already, attached or detached. Used by airport.partitions.
+CREATE_PARTITION_FUNCTION = """
+CREATE FUNCTION airport_ticket_create_partition(in_month date)
+RETURNS text AS $$
+DECLARE
+    first_day date := date_trunc('month', in_month)::date;
+    start_at timestamptz := first_day::timestamp AT TIME ZONE 'UTC';
+    end_at timestamptz := (first_day + interval '1 month') AT TIME ZONE 'UTC';
+    partition_name text := 'airport_ticket_' || to_char(first_day, 'YYYY_MM');
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN NULL;
+    END IF;
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE airport_ticket INCLUDING DEFAULTS)',
+        partition_name
+    );
+    EXECUTE format(
+        'WITH moved AS ('
+        '    DELETE FROM airport_ticket_default'
+        '    WHERE flight_departure >= $1 AND flight_departure < $2'
+        '    RETURNING *'
+        ') INSERT INTO %I SELECT * FROM moved',
+        partition_name
+    ) USING start_at, end_at;
+    EXECUTE format(
+        'ALTER TABLE airport_ticket ATTACH PARTITION %I '
+        'FOR VALUES FROM (%L) TO (%L)',
+        partition_name, start_at, end_at
+    );
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+CREATE_RANGE_TRIGGER = """
+CREATE TRIGGER airport_ticket_range
+BEFORE INSERT OR UPDATE OF "row", seat, flight_id ON airport_ticket
+FOR EACH ROW EXECUTE FUNCTION airport_ticket_check_range();
+"""
+
+# Every unique index of a partitioned table has to contain the partition
+# key, flight_departure is a copy of the flight departure time so
+# (flight_id, row, seat) stays unique.
+PARTITION_TICKETS = """
+DROP TRIGGER IF EXISTS airport_ticket_range ON airport_ticket;
+ALTER TABLE airport_ticket RENAME TO airport_ticket_unpartitioned;
+ALTER TABLE airport_ticket_unpartitioned
+    RENAME CONSTRAINT airport_ticket_pkey TO airport_ticket_unpartitioned_pkey;
+
+CREATE SEQUENCE airport_ticket_partitioned_id_seq;
+CREATE TABLE airport_ticket (
+    id bigint NOT NULL DEFAULT nextval('airport_ticket_partitioned_id_seq'),
+    "row" integer NOT NULL,
+    seat integer NOT NULL,
+    flight_id bigint NOT NULL,
+    order_id bigint NOT NULL,
+    flight_departure timestamp with time zone NOT NULL,
+    CONSTRAINT airport_ticket_pkey PRIMARY KEY (id, flight_departure),
+    CONSTRAINT airport_ticket_flight_row_seat_uniq
+        UNIQUE (flight_id, "row", seat, flight_departure)
+) PARTITION BY RANGE (flight_departure);
+ALTER SEQUENCE airport_ticket_partitioned_id_seq OWNED BY airport_ticket.id;
+CREATE INDEX airport_ticket_order_id_idx ON airport_ticket (order_id);
+CREATE TABLE airport_ticket_default PARTITION OF airport_ticket DEFAULT;
+"""
+
+CREATE_MONTH_PARTITIONS = """
+DO $$
+DECLARE
+    this_month timestamp := date_trunc('month', now() AT TIME ZONE 'UTC');
+BEGIN
+    PERFORM airport_ticket_create_partition(month::date)
+    FROM generate_series(
+        LEAST(
+            date_trunc('month', (
+                SELECT min(flight_departure)
+                FROM airport_ticket_unpartitioned
+            ) AT TIME ZONE 'UTC'),
+            this_month
+        ),
+        GREATEST(
+            date_trunc('month', (
+                SELECT max(flight_departure)
+                FROM airport_ticket_unpartitioned
+            ) AT TIME ZONE 'UTC'),
+            this_month + interval '%(months_ahead)s months'
+        ),
+        interval '1 month'
+    ) AS month;
+END;
+$$;
+""" % {"months_ahead": MONTHS_AHEAD}
+
+COPY_TICKETS = """
+INSERT INTO airport_ticket (id, "row", seat, flight_id, order_id,
+                            flight_departure)
+SELECT id, "row", seat, flight_id, order_id, flight_departure
+FROM airport_ticket_unpartitioned;
+SELECT setval(
+    'airport_ticket_partitioned_id_seq',
+    COALESCE((SELECT max(id) FROM airport_ticket), 0) + 1,
+    false
+);
+DROP TABLE airport_ticket_unpartitioned;
+ALTER SEQUENCE airport_ticket_partitioned_id_seq
+    RENAME TO airport_ticket_id_seq;
+
+-- Added after the copy so the rows are checked in one pass.
+ALTER TABLE airport_ticket
+    ADD FOREIGN KEY (flight_id) REFERENCES airport_flight (id)
+    DEFERRABLE INITIALLY DEFERRED;
+ALTER TABLE airport_ticket
+    ADD FOREIGN KEY (order_id) REFERENCES airport_order (id)
+    DEFERRABLE INITIALLY DEFERRED;
+"""
+
+# Tickets in partitions detached by the ticket_partitions command are not
+# copied back.
+UNPARTITION_TICKETS = """
+DROP TRIGGER IF EXISTS airport_ticket_range ON airport_ticket;
+DROP FUNCTION IF EXISTS airport_ticket_create_partition(date);
+ALTER TABLE airport_ticket RENAME TO airport_ticket_partitioned;
+ALTER TABLE airport_ticket_partitioned
+    RENAME CONSTRAINT airport_ticket_pkey TO airport_ticket_partitioned_pkey;
+ALTER SEQUENCE airport_ticket_id_seq OWNED BY NONE;
+
+CREATE TABLE airport_ticket (
+    id bigint NOT NULL DEFAULT nextval('airport_ticket_id_seq'),
+    "row" integer NOT NULL,
+    seat integer NOT NULL,
+    flight_id bigint NOT NULL,
+    order_id bigint NOT NULL,
+    flight_departure timestamp with time zone NOT NULL,
+    CONSTRAINT airport_ticket_pkey PRIMARY KEY (id)
+);
+INSERT INTO airport_ticket (id, "row", seat, flight_id, order_id,
+                            flight_departure)
+SELECT id, "row", seat, flight_id, order_id, flight_departure
+FROM airport_ticket_partitioned;
+DROP TABLE airport_ticket_partitioned;
+ALTER SEQUENCE airport_ticket_id_seq OWNED BY airport_ticket.id;
+
+ALTER TABLE airport_ticket
+    ADD UNIQUE (flight_id, "row", seat, flight_departure);
+CREATE INDEX airport_ticket_order_id_idx ON airport_ticket (order_id);
+ALTER TABLE airport_ticket
+    ADD FOREIGN KEY (flight_id) REFERENCES airport_flight (id)
+    DEFERRABLE INITIALLY DEFERRED;
+ALTER TABLE airport_ticket
+    ADD FOREIGN KEY (order_id) REFERENCES airport_order (id)
+    DEFERRABLE INITIALLY DEFERRED;
+""" + CREATE_RANGE_TRIGGER
+
+
+def _run_on_postgresql(sql):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == "postgresql":
+            schema_editor.execute(sql, params=None)
+
+    return run
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("airport", "0012_ticket_flight_departure"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run_on_postgresql(
+                PARTITION_TICKETS
+                + CREATE_PARTITION_FUNCTION
+                + CREATE_MONTH_PARTITIONS
+                + COPY_TICKETS
+                + CREATE_RANGE_TRIGGER
+            ),
+            _run_on_postgresql(UNPARTITION_TICKETS),
+        ),
+    ]
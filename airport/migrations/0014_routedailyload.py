@@ -0,0 +1,69 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+
+
+def fill_route_loads(apps, schema_editor):
+    Flight = apps.get_model("airport", "Flight")
+    RouteDailyLoad = apps.get_model("airport", "RouteDailyLoad")
+    using = schema_editor.connection.alias
+    rows = (
+        Flight.objects.using(using)
+        .annotate(day=TruncDate("departure_time"))
+        .values("route_id", "day")
+        .annotate(
+            flights=Count("id"),
+            seats=Sum(F("airplane__rows") * F("airplane__seats_in_row")),
+            sold=Sum("tickets_sold"),
+        )
+        .order_by()
+    )
+    RouteDailyLoad.objects.using(using).bulk_create(
+        (RouteDailyLoad(**row) for row in rows.iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("airport", "0013_partition_tickets"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RouteDailyLoad",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("flights", models.IntegerField(default=0)),
+                ("seats", models.IntegerField(default=0)),
+                ("sold", models.IntegerField(default=0)),
+                (
+                    "route",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_loads",
+                        to="airport.route",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["day", "id"], name="route_load_day_idx"
+                    )
+                ],
+                "unique_together": {("route", "day")},
+            },
+        ),
+        migrations.RunPython(fill_route_loads, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,138 @@
+from django.db import migrations
+
+# flight_departure picks the partition of a ticket and is part of the
+# (flight, row, seat, flight_departure) unique index, so a ticket written
+# with a stale departure would land in the wrong month and could take a
+# seat that is already sold. The range trigger now also checks it against
+# the flight, whose row it locks FOR SHARE: a reschedule running at the
+# same time either waits for the ticket, whose departure it then moves,
+# or the ticket waits for the reschedule and is checked against the new
+# departure time.
+CHECK_DEPARTURE = """
+CREATE OR REPLACE FUNCTION airport_ticket_check_range()
+RETURNS trigger AS $$
+DECLARE
+    max_rows integer;
+    max_seats integer;
+    departure timestamptz;
+BEGIN
+    SELECT airplane.rows, airplane.seats_in_row, flight.departure_time
+    INTO max_rows, max_seats, departure
+    FROM airport_flight flight
+    JOIN airport_airplane airplane ON airplane.id = flight.airplane_id
+    WHERE flight.id = NEW.flight_id
+    FOR SHARE OF flight;
+    IF NOT FOUND THEN
+        -- Left to the deferred foreign key check.
+        RETURN NEW;
+    END IF;
+    IF NEW.flight_departure IS DISTINCT FROM departure THEN
+        RAISE EXCEPTION USING
+            ERRCODE = 'check_violation',
+            CONSTRAINT = 'airport_ticket_departure',
+            COLUMN = 'flight_departure',
+            MESSAGE = format(
+                'flight_departure must be the departure time of the '
+                'flight: %s',
+                departure
+            );
+    END IF;
+    IF NEW."row" NOT BETWEEN 1 AND max_rows THEN
+        RAISE EXCEPTION USING
+            ERRCODE = 'check_violation',
+            CONSTRAINT = 'airport_ticket_range',
+            COLUMN = 'row',
+            MESSAGE = format(
+                'row number must be in available range: (1, rows): (1, %s)',
+                max_rows
+            );
+    END IF;
+    IF NEW.seat NOT BETWEEN 1 AND max_seats THEN
+        RAISE EXCEPTION USING
+            ERRCODE = 'check_violation',
+            CONSTRAINT = 'airport_ticket_range',
+            COLUMN = 'seat',
+            MESSAGE = format(
+                'seat number must be in available range: '
+                '(1, seats_in_row): (1, %s)',
+                max_seats
+            );
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS airport_ticket_range ON airport_ticket;
+CREATE TRIGGER airport_ticket_range
+BEFORE INSERT OR UPDATE OF "row", seat, flight_id, flight_departure
+ON airport_ticket
+FOR EACH ROW EXECUTE FUNCTION airport_ticket_check_range();
+"""
+
+RANGE_ONLY = """
+CREATE OR REPLACE FUNCTION airport_ticket_check_range()
+RETURNS trigger AS $$
+DECLARE
+    max_rows integer;
+    max_seats integer;
+BEGIN
+    SELECT airplane.rows, airplane.seats_in_row
+    INTO max_rows, max_seats
+    FROM airport_flight flight
+    JOIN airport_airplane airplane ON airplane.id = flight.airplane_id
+    WHERE flight.id = NEW.flight_id;
+    IF NOT FOUND THEN
+        -- Left to the deferred foreign key check.
+        RETURN NEW;
+    END IF;
+    IF NEW."row" NOT BETWEEN 1 AND max_rows THEN
+        RAISE EXCEPTION USING
+            ERRCODE = 'check_violation',
+            CONSTRAINT = 'airport_ticket_range',
+            COLUMN = 'row',
+            MESSAGE = format(
+                'row number must be in available range: (1, rows): (1, %s)',
+                max_rows
+            );
+    END IF;
+    IF NEW.seat NOT BETWEEN 1 AND max_seats THEN
+        RAISE EXCEPTION USING
+            ERRCODE = 'check_violation',
+            CONSTRAINT = 'airport_ticket_range',
+            COLUMN = 'seat',
+            MESSAGE = format(
+                'seat number must be in available range: '
+                '(1, seats_in_row): (1, %s)',
+                max_seats
+            );
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS airport_ticket_range ON airport_ticket;
+CREATE TRIGGER airport_ticket_range
+BEFORE INSERT OR UPDATE OF "row", seat, flight_id ON airport_ticket
+FOR EACH ROW EXECUTE FUNCTION airport_ticket_check_range();
+"""
+
+
+def _run_on_postgresql(sql):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == "postgresql":
+            schema_editor.execute(sql, params=None)
+
+    return run
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("airport", "0014_routedailyload"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run_on_postgresql(CHECK_DEPARTURE),
+            _run_on_postgresql(RANGE_ONLY),
+        ),
+    ]
@@ -3,9 +3,19 @@ import uuid
 
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.utils.text import slugify
 
+from airport.inventory import (
+    airplane_dimensions,
+    lock_flight,
+    rebuild_seat_map,
+    take_seats,
+)
+
+# Name of the trigger in migration 0011 that checks ticket rows and seats
+TICKET_RANGE_CONSTRAINT = "airport_ticket_range"
+
 
 class Airport(models.Model):
     name = models.CharField(max_length=100)
@@ -62,6 +72,8 @@ class Airplane(models.Model):
         upload_to=movie_image_file_path,
         blank=True
     )
+    # Names of the resized copies of ``image``, see ``airport.images``.
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
 
     @property
     def capacity(self):
@@ -115,14 +127,55 @@ class Flight(models.Model):
         related_name="flights",
         blank=True
     )
+    seat_map = models.BinaryField(default=bytes, blank=True)
+    tickets_sold = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ["departure_time"]
+        indexes = [
+            models.Index(
+                fields=["departure_time", "id"],
+                name="flight_departure_idx"
+            ),
+            models.Index(
+                fields=["route", "departure_time"],
+                name="flight_route_departure_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.route.source} --> {self.route.destination}"
 
 
+class TicketQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        """Fill ``flight_departure`` of the tickets that miss it first.
+
+        ``flight_departure`` is the partition key of ``airport_ticket``, so
+        it has to be known before the INSERT, see ``airport.partitions``.
+        On PostgreSQL the ``airport_ticket_range`` trigger rejects one that
+        is not the departure time of the flight.
+        """
+        objs = list(objs)
+        flight_field = Ticket._meta.get_field("flight")
+        for obj in objs:
+            if obj.flight_departure is None and flight_field.is_cached(obj):
+                obj.flight_departure = obj.flight.departure_time
+        missing = {
+            obj.flight_id for obj in objs if obj.flight_departure is None
+        }
+        if missing:
+            departures = dict(
+                Flight.objects.using(self.db)
+                .filter(pk__in=missing)
+                .values_list("pk", "departure_time")
+            )
+            for obj in objs:
+                if obj.flight_departure is None:
+                    obj.flight_departure = departures.get(obj.flight_id)
+        return super().bulk_create(objs, *args, **kwargs)
+
+
 class Ticket(models.Model):
     flight = models.ForeignKey(
         Flight,
@@ -136,6 +189,10 @@ class Ticket(models.Model):
     )
     row = models.IntegerField()
     seat = models.IntegerField()
+    # Copy of flight.departure_time, tickets are partitioned by its month.
+    flight_departure = models.DateTimeField(editable=False)
+
+    objects = TicketQuerySet.as_manager()
 
     @staticmethod
     def validate_ticket(row, seat, cinema_hall, error_to_raise):
@@ -154,14 +211,36 @@ class Ticket(models.Model):
                     }
                 )
 
+    def _airplane_dimensions(self):
+        flight_field = Ticket._meta.get_field("flight")
+        if flight_field.is_cached(self):
+            flight = self.flight
+            if Flight._meta.get_field("airplane").is_cached(flight):
+                return flight.airplane
+        return airplane_dimensions(self.flight_id)
+
     def clean(self):
+        if self.flight_id is None or self.row is None or self.seat is None:
+            return
         Ticket.validate_ticket(
             self.row,
             self.seat,
-            self.flight.airplane,
+            self._airplane_dimensions(),
             ValidationError,
         )
 
+    @staticmethod
+    def range_violation(error):
+        """Return the ``ValidationError`` of a rejected ticket range.
+
+        The ``airport_ticket_range`` trigger raises the same message as
+        ``validate_ticket`` with the ticket field as column name.
+        """
+        diag = getattr(error.__cause__, "diag", None)
+        if diag is None or diag.constraint_name != TICKET_RANGE_CONSTRAINT:
+            return None
+        return ValidationError({diag.column_name: diag.message_primary})
+
     def save(
         self,
         force_insert=False,
@@ -169,15 +248,100 @@ class Ticket(models.Model):
         using=None,
         update_fields=None,
     ):
-        self.full_clean()
-        return super(Ticket, self).save(
-            force_insert, force_update, using, update_fields
+        # Foreign keys and (flight, row, seat) uniqueness are left to the
+        # database constraints, which check them with the INSERT anyway.
+        self.full_clean(
+            exclude=[
+                "flight_departure",
+                *(
+                    name
+                    for name in ("flight", "order")
+                    if getattr(self, f"{name}_id") is not None
+                ),
+            ],
+            validate_unique=False,
         )
+        adding = self._state.adding
+        try:
+            if adding:
+                # The departure is read under the flight lock the seat map
+                # update takes anyway, a reschedule waits for this ticket.
+                with transaction.atomic(using=using):
+                    flight = lock_flight(self.flight_id)
+                    self.flight_departure = flight.departure_time
+                    result = super(Ticket, self).save(
+                        force_insert, force_update, using, update_fields
+                    )
+                    take_seats(flight, [(self.row, self.seat)])
+            else:
+                self.flight_departure = (
+                    Flight.objects.filter(pk=self.flight_id)
+                    .values_list("departure_time", flat=True)
+                    .get()
+                )
+                result = super(Ticket, self).save(
+                    force_insert, force_update, using, update_fields
+                )
+        except IntegrityError as error:
+            violation = Ticket.range_violation(error)
+            if violation is None:
+                raise
+            raise violation from error
+        if not adding:
+            rebuild_seat_map(self.flight)
+        return result
 
     class Meta:
-        unique_together = ("flight", "row", "seat")
+        # The partition key has to be part of every unique index, a flight
+        # has one departure time so (flight, row, seat) stays unique. The
+        # airport_ticket_range trigger rejects a flight_departure that
+        # differs from the departure time of the flight.
+        unique_together = ("flight", "row", "seat", "flight_departure")
         ordering = ["row", "seat"]
 
     def __str__(self):
         return (f"Flight {self.flight}." 
                 f"row: {self.row}, seat: {self.seat}")
+
+
+class RouteDailyLoad(models.Model):
+    """Flights, seats and sold tickets of a route on one departure day.
+
+    Kept up to date by ``airport.analytics`` as orders and flights are
+    written, rebuilt by the ``rebuild_route_loads`` command.
+    """
+
+    route = models.ForeignKey(
+        Route,
+        on_delete=models.CASCADE,
+        related_name="daily_loads"
+    )
+    day = models.DateField()
+    flights = models.IntegerField(default=0)
+    seats = models.IntegerField(default=0)
+    sold = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("route", "day")
+        indexes = [
+            models.Index(fields=["day", "id"], name="route_load_day_idx"),
+        ]
+
+    @property
+    def load_factor(self):
+        if not self.seats:
+            return 0.0
+        return self.sold / self.seats
+
+    def __str__(self):
+        return f"{self.route_id} {self.day}: {self.sold}/{self.seats}"
+
+
+class ThrottleBucket(models.Model):
+    key = models.CharField(max_length=255, primary_key=True)
+    tokens = models.FloatField()
+    updated_at = models.FloatField()
+    allowed = models.BooleanField(default=True)
+
+    def __str__(self):
+        return f"{self.key}: {self.tokens:.2f}"
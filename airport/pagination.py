@@ -0,0 +1,200 @@
+import base64
+import binascii
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination keyed on a unique tuple of ordering fields.
+
+    The cursor stores the key of the last (or first) row of the current
+    page, and the next page is selected with a row comparison on that key.
+    Fetching any page therefore costs one indexed range scan and no
+    ``COUNT(*)``, regardless of how deep the page is.
+    """
+
+    ordering = ("id",)
+    page_size = 20
+    page_size_query_param = None
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    invalid_cursor_message = _("Invalid cursor")
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                page_size = int(
+                    request.query_params[self.page_size_query_param]
+                )
+                if page_size > 0:
+                    return min(page_size, self.max_page_size)
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self._page_queryset(queryset, request)
+        return self._set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Like ``paginate_queryset`` but fetch the page with the async ORM"""
+        queryset = self._page_queryset(queryset, request)
+        return self._set_page([item async for item in queryset])
+
+    def _page_queryset(self, queryset, request):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.model = queryset.model
+        self.position, self.reverse = self.decode_cursor(request)
+
+        ordering = self.ordering
+        if self.reverse:
+            ordering = tuple(self._flip(field) for field in ordering)
+        queryset = queryset.order_by(*ordering)
+        if self.position is not None:
+            queryset = queryset.filter(self._after(ordering, self.position))
+        return queryset[:self.page_size + 1]
+
+    def _set_page(self, results):
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if self.reverse:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.position is not None
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True},
+                "previous": {"type": "string", "nullable": True},
+                "results": schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_schema_operation_parameters(self, view):
+        parameters = [{
+            "name": self.cursor_query_param,
+            "required": False,
+            "in": "query",
+            "description": "The pagination cursor value.",
+            "schema": {"type": "string"},
+        }]
+        if self.page_size_query_param:
+            parameters.append({
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            })
+        return parameters
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+    @staticmethod
+    def _field_name(field):
+        return field.lstrip("-")
+
+    def _after(self, ordering, position):
+        conditions = []
+        for index, field in enumerate(ordering):
+            lookup = "lt" if field.startswith("-") else "gt"
+            equal = {
+                self._field_name(previous): position[previous_index]
+                for previous_index, previous in enumerate(ordering[:index])
+            }
+            conditions.append(Q(
+                **equal,
+                **{f"{self._field_name(field)}__{lookup}": position[index]}
+            ))
+        first = ordering[0]
+        bound = "lte" if first.startswith("-") else "gte"
+        return Q(
+            **{f"{self._field_name(first)}__{bound}": position[0]}
+        ) & reduce(or_, conditions)
+
+    @staticmethod
+    def _item_value(item, name):
+        if isinstance(item, dict):
+            return item[name]
+        return getattr(item, name)
+
+    def encode_cursor(self, item, reverse):
+        position = [
+            self._item_value(item, self._field_name(field))
+            for field in self.ordering
+        ]
+        payload = json.dumps(
+            {"p": [self._to_json(value) for value in position],
+             "r": int(reverse)},
+            separators=(",", ":"),
+        )
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode("ascii")
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            cursor.rstrip("="),
+        )
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded))
+            values = payload["p"]
+            if len(values) != len(self.ordering):
+                raise ValueError
+            position = [
+                self.model._meta.get_field(
+                    self._field_name(field)
+                ).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+            return position, bool(payload.get("r"))
+        except (
+            binascii.Error, ValueError, TypeError, KeyError, ValidationError
+        ):
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def _to_json(value):
+        if hasattr(value, "isoformat"):
+            return value.isoformat()
+        return value
@@ -0,0 +1,150 @@
+import re
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.db import connections, transaction
+
+TICKET_TABLE = "airport_ticket"
+_MONTH_PARTITION = re.compile(r"^airport_ticket_(\d{4})_(\d{2})$")
+
+
+def month_start(value):
+    """Return the first day of the month of a date or an aware datetime."""
+    return date(value.year, value.month, 1)
+
+
+def add_months(month, count):
+    year, month_index = divmod(month.year * 12 + month.month - 1 + count, 12)
+    return date(year, month_index + 1, 1)
+
+
+def tickets_partitioned(using="default"):
+    """Return True when ``airport_ticket`` is a partitioned table.
+
+    Migration 0013 partitions it on PostgreSQL only.
+    """
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table "
+            "WHERE partrelid = to_regclass(%s)",
+            [TICKET_TABLE],
+        )
+        return cursor.fetchone() is not None
+
+
+def ticket_partitions(using="default"):
+    """Return ``(month, table name)`` of the attached month partitions."""
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = to_regclass(%s)",
+            [TICKET_TABLE],
+        )
+        names = [name for name, in cursor.fetchall()]
+    partitions = []
+    for name in names:
+        match = _MONTH_PARTITION.match(name)
+        if match:
+            year, month = map(int, match.groups())
+            partitions.append((date(year, month, 1), name))
+    return sorted(partitions)
+
+
+def archived_before(using="default"):
+    """Return the start of the first month whose tickets are not archived.
+
+    Archived months are those whose partition was detached, their tickets
+    left ``Ticket`` queries while the flights keep their ``tickets_sold``
+    and seat map. Returns None when no partition was detached.
+    """
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT relname FROM pg_class WHERE relkind = 'r' "
+            "AND NOT relispartition AND pg_table_is_visible(oid) "
+            "AND relname LIKE %s",
+            [TICKET_TABLE + "\\_%"],
+        )
+        names = [name for name, in cursor.fetchall()]
+    months = []
+    for name in names:
+        match = _MONTH_PARTITION.match(name)
+        if match:
+            year, month = map(int, match.groups())
+            months.append(date(year, month, 1))
+    if not months:
+        return None
+    first_kept = add_months(max(months), 1)
+    return datetime(
+        first_kept.year, first_kept.month, 1, tzinfo=dt_timezone.utc
+    )
+
+
+def _check_pending_constraints(cursor):
+    # ATTACH and DETACH refuse to run while deferred foreign key checks of
+    # the same transaction are pending on the table.
+    cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+
+
+def create_ticket_partitions(first_month, last_month, using="default"):
+    """Create the month partitions from ``first_month`` to ``last_month``.
+
+    Tickets of those months already stored in ``airport_ticket_default``
+    move to the new partition. Months whose table exists, even detached,
+    are skipped. Returns the names of the created tables.
+    """
+    created = []
+    month, last_month = month_start(first_month), month_start(last_month)
+    with transaction.atomic(using=using):
+        with connections[using].cursor() as cursor:
+            _check_pending_constraints(cursor)
+            while month <= last_month:
+                cursor.execute(
+                    "SELECT airport_ticket_create_partition(%s)", [month]
+                )
+                name, = cursor.fetchone()
+                if name is not None:
+                    created.append(name)
+                month = add_months(month, 1)
+    return created
+
+
+def detach_ticket_partitions(before, using="default"):
+    """Detach the month partitions of the months before ``before``.
+
+    Detached tables keep their tickets and can be archived or dropped, the
+    tickets no longer show up in queries on ``Ticket``. Their foreign keys
+    are dropped so the flights and orders of those months can still be
+    deleted. The flights keep their ``tickets_sold`` and seat map, see
+    ``archived_before``. Returns their names.
+    """
+    quote = connections[using].ops.quote_name
+    before = month_start(before)
+    detached = []
+    with transaction.atomic(using=using):
+        with connections[using].cursor() as cursor:
+            _check_pending_constraints(cursor)
+            for month, name in ticket_partitions(using):
+                if month >= before:
+                    continue
+                cursor.execute(
+                    f"ALTER TABLE {quote(TICKET_TABLE)} "
+                    f"DETACH PARTITION {quote(name)}"
+                )
+                cursor.execute(
+                    "SELECT conname FROM pg_constraint "
+                    "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+                    [name],
+                )
+                for constraint, in cursor.fetchall():
+                    cursor.execute(
+                        f"ALTER TABLE {quote(name)} "
+                        f"DROP CONSTRAINT {quote(constraint)}"
+                    )
+                detached.append(name)
+    return detached
@@ -0,0 +1,118 @@
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+
+# Alias that reads of the current request go to, None for the primary.
+_read_alias = ContextVar("airport_read_alias", default=None)
+
+
+def _replicas():
+    return list(getattr(settings, "AIRPORT_READ_REPLICAS", ()))
+
+
+def _pin_cache():
+    return caches[getattr(settings, "AIRPORT_REPLICA_PIN_CACHE", "default")]
+
+
+def _pin_key(user):
+    return f"airport:primary-pin:{user.pk}"
+
+
+def pin_to_primary(user):
+    """Send the reads of ``user`` to the primary for a while.
+
+    Called after the user wrote something they will read back right away,
+    so replication lag never shows them stale data. The pin lasts
+    ``AIRPORT_REPLICA_PIN_SECONDS`` and has to live in a cache shared by
+    all workers to hold across them.
+    """
+    if not user or not user.is_authenticated or not _replicas():
+        return
+    seconds = getattr(settings, "AIRPORT_REPLICA_PIN_SECONDS", 10)
+    _pin_cache().set(_pin_key(user), time.time() + seconds, seconds)
+
+
+def is_pinned(user):
+    if not user or not user.is_authenticated:
+        return False
+    pinned_until = _pin_cache().get(_pin_key(user))
+    return pinned_until is not None and pinned_until > time.time()
+
+
+def choose_replica(user):
+    """Return the replica alias for reads of ``user``, None for the primary.
+
+    None when no replica is configured or ``user`` is pinned to the
+    primary.
+    """
+    replicas = _replicas()
+    if not replicas or is_pinned(user):
+        return None
+    return random.choice(replicas)
+
+
+@contextmanager
+def reads_from(alias):
+    """Route the ORM reads inside the block to ``alias``.
+
+    ``None`` keeps them on the primary, writes always go to the primary.
+    """
+    token = _read_alias.set(alias)
+    try:
+        yield alias
+    finally:
+        _read_alias.reset(token)
+
+
+class ReplicaRouter:
+    """Database router sending reads inside ``reads_from`` to replicas.
+
+    Other reads use the default routing. Writes always go to the primary,
+    also for instances that were loaded from a replica. The table of the
+    database cache is read from the primary, a replica could return a pin
+    or revocation mark that was already replaced.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == "django_cache":
+            return None
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in _replicas():
+            return False
+        return None
+
+
+class ReplicaReadMixin:
+    """Serve safe-method requests of a view from a read replica.
+
+    The replica is chosen after authentication, throttling and permission
+    checks, so those still run against the primary, and only for users
+    that are not pinned to it by ``pin_to_primary``.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        token = _read_alias.set(None)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            _read_alias.reset(token)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS:
+            _read_alias.set(choose_replica(request.user))
@@ -0,0 +1,92 @@
+import hashlib
+import json
+import threading
+from pathlib import Path
+
+import yaml
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import condition, require_safe
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+
+YAML_CONTENT_TYPE = OpenApiYamlRenderer.media_type
+JSON_CONTENT_TYPE = OpenApiJsonRenderer.media_type
+
+# path: {"yaml": (body, etag), "json": (body, etag)}
+_schemas = {}
+_lock = threading.Lock()
+
+
+def schema_file():
+    default = Path(settings.BASE_DIR) / "schema.yml"
+    return Path(getattr(settings, "AIRPORT_SCHEMA_FILE", default))
+
+
+def generate_schema():
+    """Introspect the API and return its OpenAPI schema rendered as YAML."""
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=True)
+    return OpenApiYamlRenderer().render(schema, renderer_context={})
+
+
+def _etag(body):
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def _load(path):
+    try:
+        body = path.read_bytes()
+    except FileNotFoundError:
+        body = generate_schema()
+    as_json = json.dumps(
+        yaml.safe_load(body), indent=4, ensure_ascii=False
+    ).encode()
+    return {"yaml": (body, _etag(body)), "json": (as_json, _etag(as_json))}
+
+
+def get_schema(schema_format="yaml"):
+    """Return ``(body, etag)`` of the schema in ``yaml`` or ``json``.
+
+    The schema is read from ``AIRPORT_SCHEMA_FILE`` once per process, or
+    generated once when the file does not exist, and then kept in memory.
+    """
+    path = schema_file()
+    schemas = _schemas.get(path)
+    if schemas is None:
+        with _lock:
+            schemas = _schemas.get(path)
+            if schemas is None:
+                schemas = _schemas[path] = _load(path)
+    return schemas[schema_format]
+
+
+def forget_schema():
+    _schemas.clear()
+
+
+def _requested_format(request):
+    schema_format = request.GET.get("format")
+    if schema_format in ("json", "openapi-json"):
+        return "json"
+    if schema_format is None and "json" in request.headers.get("Accept", ""):
+        return "json"
+    return "yaml"
+
+
+@require_safe
+@condition(
+    etag_func=lambda request: get_schema(_requested_format(request))[1]
+)
+def schema_view(request):
+    """Serve the precomputed OpenAPI schema, 304 when the ETag matches."""
+    schema_format = _requested_format(request)
+    body, _ = get_schema(schema_format)
+    content_type = (
+        JSON_CONTENT_TYPE if schema_format == "json" else YAML_CONTENT_TYPE
+    )
+    response = HttpResponse(body, content_type=content_type)
+    response["Cache-Control"] = "public, max-age=0, must-revalidate"
+    patch_vary_headers(response, ("Accept",))
+    return response
@@ -1,45 +1,82 @@
-from django.db import transaction
-from rest_framework import serializers
+from functools import partial
 
+from django.db import transaction, IntegrityError
+from drf_spectacular.utils import extend_schema_field
+from rest_framework import serializers
+from rest_framework.validators import UniqueTogetherValidator
+
+from airport.exceptions import SeatsAlreadyTaken
+from airport.images import VARIANTS, variant_urls
+from airport.inventory import (
+    get_seat_map,
+    reserve_seats,
+    find_taken_places,
+)
+from airport.metrics import SEAT_CONFLICTS, record_order
 from airport.models import (
     AirplaneType,
     Airplane,
     Airport,
     Route,
+    RouteDailyLoad,
     Crew,
     Flight,
     Ticket,
     Order
 )
+from airport.timing import TimedSerializerMixin
 
 
-class AirplaneTypeSerializer(serializers.ModelSerializer):
+class AirplaneTypeSerializer(
+    TimedSerializerMixin, serializers.ModelSerializer
+):
     class Meta:
         model = AirplaneType
         fields = ("id", "name")
 
 
-class AirplaneSerializer(serializers.ModelSerializer):
+class AirplaneSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    image_variants = serializers.SerializerMethodField()
+
     class Meta:
         model = Airplane
         fields = (
-            "id", "name", "rows", "seats_in_row", "airplane_type", "capacity", "image"
+            "id", "name", "rows", "seats_in_row", "airplane_type", "capacity", "image",
+            "image_variants",
         )
 
-
-class AirplaneImageSerializer(serializers.ModelSerializer):
+    @extend_schema_field({
+        "type": "object",
+        "properties": {
+            name: {"type": "string", "format": "uri"} for name in VARIANTS
+        },
+    })
+    def get_image_variants(self, airplane):
+        request = self.context.get("request")
+        urls = variant_urls(airplane.image.name, airplane.image_variants)
+        if request is not None:
+            urls = {
+                name: request.build_absolute_uri(url)
+                for name, url in urls.items()
+            }
+        return urls
+
+
+class AirplaneImageSerializer(
+    TimedSerializerMixin, serializers.ModelSerializer
+):
     class Meta:
         model = Airplane
         fields = ("id", "image")
 
 
-class AirportSerializer(serializers.ModelSerializer):
+class AirportSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Airport
         fields = ("id", "name", "closest_big_city")
 
 
-class RouteSerializer(serializers.ModelSerializer):
+class RouteSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Route
         fields = ("id", "source", "destination", "distance")
@@ -58,7 +95,31 @@ class RouteDetailSerializer(RouteSerializer):
     destination = AirportSerializer(many=False, read_only=True)
 
 
-class CrewSerializer(serializers.ModelSerializer):
+class RouteDailyLoadSerializer(
+    TimedSerializerMixin, serializers.ModelSerializer
+):
+    source = serializers.CharField(source="route.source.name", read_only=True)
+    destination = serializers.CharField(
+        source="route.destination.name",
+        read_only=True
+    )
+    load_factor = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = RouteDailyLoad
+        fields = (
+            "route",
+            "source",
+            "destination",
+            "day",
+            "flights",
+            "seats",
+            "sold",
+            "load_factor",
+        )
+
+
+class CrewSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     full_name = serializers.CharField(source="__str__", read_only=True)
 
     class Meta:
@@ -66,7 +127,7 @@ class CrewSerializer(serializers.ModelSerializer):
         fields = ("id", "first_name", "last_name", "full_name")
 
 
-class FlightSerializer(serializers.ModelSerializer):
+class FlightSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Flight
         fields = (
@@ -96,14 +157,53 @@ class FlightListSerializer(FlightSerializer):
         )
 
 
-class TicketListSerializer(serializers.ModelSerializer):
+class ConnectionSearchSerializer(TimedSerializerMixin, serializers.Serializer):
+    source = serializers.IntegerField(help_text="Source airport id")
+    destination = serializers.IntegerField(
+        help_text="Destination airport id"
+    )
+    date = serializers.DateField(help_text="Departure date of the first leg")
+    min_layover = serializers.IntegerField(
+        min_value=0, default=30, help_text="Minimum layover in minutes"
+    )
+    max_layover = serializers.IntegerField(
+        min_value=0, default=360, help_text="Maximum layover in minutes"
+    )
+    max_legs = serializers.IntegerField(min_value=1, max_value=4, default=3)
+
+    def validate(self, attrs):
+        if attrs["min_layover"] > attrs["max_layover"]:
+            raise serializers.ValidationError(
+                {"max_layover": "max_layover must not be less "
+                                "than min_layover"}
+            )
+        return attrs
+
+
+class ItinerarySerializer(TimedSerializerMixin, serializers.Serializer):
+    departure_time = serializers.DateTimeField(read_only=True)
+    arrival_time = serializers.DateTimeField(read_only=True)
+    duration = serializers.IntegerField(
+        read_only=True, help_text="Total travel time in minutes"
+    )
+    layovers = serializers.ListField(
+        child=serializers.IntegerField(),
+        read_only=True,
+        help_text="Layover durations in minutes"
+    )
+    legs = FlightListSerializer(many=True, read_only=True)
+
+
+class TicketListSerializer(TimedSerializerMixin, serializers.ModelSerializer):
 
     class Meta:
         model = Ticket
         fields = ("row", "seat")
 
 
-class FlightDetailSerializer(serializers.ModelSerializer):
+class FlightDetailSerializer(
+    TimedSerializerMixin, serializers.ModelSerializer
+):
     route = serializers.CharField(read_only=True)
     crew = serializers.SlugRelatedField(
         many=True,
@@ -130,7 +230,35 @@ class FlightDetailSerializer(serializers.ModelSerializer):
         )
 
 
-class TicketSerializer(serializers.ModelSerializer):
+class SeatMapSerializer(TimedSerializerMixin, serializers.Serializer):
+    rows = serializers.IntegerField(read_only=True)
+    seats_in_row = serializers.IntegerField(read_only=True)
+    taken_count = serializers.IntegerField(source="__len__", read_only=True)
+    taken = serializers.CharField(source="encode", read_only=True)
+
+
+class FlightDetailSeatMapSerializer(FlightDetailSerializer):
+    taken_places = None
+    seat_map = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Flight
+        fields = (
+            "id",
+            "route",
+            "crew",
+            "departure_time",
+            "arrival_time",
+            "airplane",
+            "seat_map"
+        )
+
+    @extend_schema_field(SeatMapSerializer)
+    def get_seat_map(self, obj):
+        return SeatMapSerializer(get_seat_map(obj)).data
+
+
+class TicketSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     flight = FlightListSerializer(many=False, read_only=True)
 
     class Meta:
@@ -138,13 +266,73 @@ class TicketSerializer(serializers.ModelSerializer):
         fields = ("id", "row", "seat", "flight")
 
 
-class TicketCreateSerializer(serializers.ModelSerializer):
+class TicketFlightField(serializers.PrimaryKeyRelatedField):
+    """Primary key field that reuses flights loaded by the list serializer."""
+
+    def to_internal_value(self, data):
+        flights = getattr(self.parent, "flights", None) or {}
+        try:
+            flight = flights.get(int(data))
+        except (TypeError, ValueError):
+            flight = None
+        if flight is not None:
+            return flight
+        return super().to_internal_value(data)
+
+
+class TicketBulkListSerializer(serializers.ListSerializer):
+    """Validates a batch of tickets with a fixed number of queries."""
+
+    def to_internal_value(self, data):
+        flight_ids = set()
+        if isinstance(data, list):
+            for item in data:
+                try:
+                    flight_ids.add(int(item.get("flight")))
+                except (AttributeError, TypeError, ValueError):
+                    continue
+        self.child.flights = Flight.objects.select_related(
+            "airplane"
+        ).in_bulk(flight_ids)
+        return super().to_internal_value(data)
+
+    def validate(self, attrs):
+        places = set()
+        for ticket in attrs:
+            flight = ticket["flight"]
+            Ticket.validate_ticket(
+                ticket["row"],
+                ticket["seat"],
+                flight.airplane,
+                serializers.ValidationError
+            )
+            place = (flight.id, ticket["row"], ticket["seat"])
+            if place in places:
+                raise serializers.ValidationError(
+                    UniqueTogetherValidator.message.format(
+                        field_names="flight, row, seat"
+                    ),
+                    code="unique",
+                )
+            places.add(place)
+        return attrs
+
+
+class TicketCreateSerializer(
+    TimedSerializerMixin, serializers.ModelSerializer
+):
+    flight = TicketFlightField(queryset=Flight.objects.select_related(
+        "airplane"
+    ))
+
     class Meta:
         model = Ticket
         fields = ("row", "seat", "flight")
+        list_serializer_class = TicketBulkListSerializer
+        validators = []
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     tickets = TicketCreateSerializer(
         many=True,
         read_only=False,
@@ -156,11 +344,37 @@ class OrderSerializer(serializers.ModelSerializer):
         fields = ("id", "tickets", "created_at",)
 
     def create(self, validated_data):
+        try:
+            return self._create(validated_data)
+        except SeatsAlreadyTaken:
+            SEAT_CONFLICTS.inc()
+            raise
+
+    def _create(self, validated_data):
         with transaction.atomic():
             tickets_data = validated_data.pop("tickets")
+            places = [
+                (ticket_data["flight"].id, ticket_data["row"],
+                 ticket_data["seat"])
+                for ticket_data in tickets_data
+            ]
+            departures = reserve_seats(places)
             order = Order.objects.create(**validated_data)
-            for ticket_data in tickets_data:
-                Ticket.objects.create(order=order, **ticket_data)
+            try:
+                with transaction.atomic():
+                    Ticket.objects.bulk_create(
+                        Ticket(
+                            order=order,
+                            flight_departure=departures[
+                                ticket_data["flight"].id
+                            ],
+                            **ticket_data,
+                        )
+                        for ticket_data in tickets_data
+                    )
+            except IntegrityError:
+                raise SeatsAlreadyTaken(find_taken_places(places))
+            transaction.on_commit(partial(record_order, len(tickets_data)))
             return order
 
 
@@ -0,0 +1,175 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.functions import TruncDate
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from airport.analytics import departure_day, refresh_route_days
+from airport.cache import bump_model_version
+from airport.connections import Leg, connection_index
+from airport.images import schedule_variants
+from airport.inventory import (
+    forget_airplane_dimensions,
+    mark_seats_free,
+    rebuild_airplane_seat_maps,
+)
+from airport.models import (
+    Airplane,
+    Flight,
+    Ticket,
+    Route,
+    Airport,
+    AirplaneType,
+    Crew,
+)
+from airport.timing import time_query
+
+
+@receiver(post_delete, sender=Ticket)
+def release_ticket_seat(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, Flight) or getattr(origin, "model", None) is Flight:
+        return
+    try:
+        mark_seats_free(instance.flight_id, [(instance.row, instance.seat)])
+    except Flight.DoesNotExist:
+        pass
+
+
+@receiver(post_save, sender=Flight)
+def index_flight(sender, instance, raw=False, **kwargs):
+    departure_time, arrival_time = (
+        Flight._meta.get_field(name).to_python(getattr(instance, name))
+        for name in ("departure_time", "arrival_time")
+    )
+    if raw or not connection_index.is_tracked(instance.pk, departure_time):
+        return
+    source_id, destination_id = Route.objects.values_list(
+        "source_id", "destination_id"
+    ).get(pk=instance.route_id)
+    connection_index.update_flight(Leg(
+        departure_time, instance.pk, source_id, destination_id, arrival_time
+    ))
+
+
+@receiver(post_save, sender=Flight)
+def move_flight_tickets(sender, instance, created=False, raw=False,
+                        update_fields=None, **kwargs):
+    if created or raw:
+        return
+    if update_fields is not None and "departure_time" not in update_fields:
+        return
+    # Rows change partition when the departure moves to another month.
+    Ticket.objects.filter(flight_id=instance.pk).exclude(
+        flight_departure=instance.departure_time
+    ).update(flight_departure=instance.departure_time)
+
+
+@receiver(pre_save, sender=Flight)
+def remember_route_day(sender, instance, raw=False, **kwargs):
+    instance._previous_route_day = None
+    if raw or instance.pk is None:
+        return
+    previous = Flight.objects.filter(pk=instance.pk).values_list(
+        "route_id", "departure_time"
+    ).first()
+    if previous is not None:
+        instance._previous_route_day = (
+            previous[0], departure_day(previous[1])
+        )
+
+
+@receiver(post_save, sender=Flight)
+def refresh_flight_route_load(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    route_days = [
+        (instance.route_id, departure_day(instance.departure_time))
+    ]
+    previous = getattr(instance, "_previous_route_day", None)
+    if previous is not None:
+        route_days.append(previous)
+    refresh_route_days(route_days)
+
+
+@receiver(post_delete, sender=Flight)
+def remove_flight_route_load(sender, instance, **kwargs):
+    refresh_route_days(
+        [(instance.route_id, departure_day(instance.departure_time))]
+    )
+
+
+@receiver(pre_save, sender=Airplane)
+def remember_airplane_size(sender, instance, raw=False, **kwargs):
+    instance._previous_size = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_size = Airplane.objects.filter(
+        pk=instance.pk
+    ).values_list("rows", "seats_in_row").first()
+
+
+@receiver(post_save, sender=Airplane)
+def rebuild_resized_airplane_flights(sender, instance, raw=False, **kwargs):
+    previous = getattr(instance, "_previous_size", None)
+    if raw or previous is None:
+        return
+    if previous == (int(instance.rows), int(instance.seats_in_row)):
+        return
+    rebuild_airplane_seat_maps(instance)
+    refresh_route_days(
+        Flight.objects.filter(airplane_id=instance.pk)
+        .annotate(day=TruncDate("departure_time"))
+        .values_list("route_id", "day")
+        .distinct()
+    )
+
+
+@receiver(post_delete, sender=Flight)
+def unindex_flight(sender, instance, **kwargs):
+    connection_index.remove_flight(instance.pk)
+
+
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+def reset_connection_index(sender, created=False, **kwargs):
+    if not created:
+        connection_index.clear()
+
+
+@receiver(post_save, sender=Airport)
+@receiver(post_delete, sender=Airport)
+@receiver(post_save, sender=AirplaneType)
+@receiver(post_delete, sender=AirplaneType)
+@receiver(post_save, sender=Crew)
+@receiver(post_delete, sender=Crew)
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+def bump_catalog_version(sender, **kwargs):
+    bump_model_version(sender)
+
+
+@receiver(post_save, sender=Flight)
+@receiver(post_delete, sender=Flight)
+@receiver(post_save, sender=Airplane)
+@receiver(post_delete, sender=Airplane)
+def reset_airplane_dimensions(sender, **kwargs):
+    forget_airplane_dimensions()
+
+
+@receiver(post_save, sender=Airplane)
+def generate_image_variants(sender, instance, raw=False, **kwargs):
+    if raw or not instance.image:
+        return
+    if instance.image_variants.get("source") == instance.image.name:
+        return
+    transaction.on_commit(
+        partial(schedule_variants, instance.pk, instance.image.name)
+    )
+
+
+@receiver(connection_created)
+def install_query_timer(sender, connection, **kwargs):
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
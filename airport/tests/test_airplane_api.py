@@ -1,13 +1,18 @@
 import tempfile
 import os
+from io import BytesIO
+from unittest import mock
 
 from PIL import Image
 from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
 from django.urls import reverse
 
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase
 from rest_framework import status
 
+from airport.images import VARIANTS, generate_variants, schedule_variants
+
 from airport.models import AirplaneType, Airplane
 from rest_framework.test import APIClient
 
@@ -220,3 +225,100 @@ class AirplaneImageUploadTests(TestCase):
         res = self.client.get(AIRPLANE_URL)
 
         self.assertIn("image", res.data[0].keys())
+
+
+def jpeg_file(size):
+    output = BytesIO()
+    Image.new("RGB", size, "navy").save(output, format="JPEG")
+    return ContentFile(output.getvalue(), name="airplane.jpg")
+
+
+class AirplaneImageVariantTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@myproject.com", "password"
+        )
+        self.client.force_authenticate(self.user)
+        self.airplane = sample_airplane()
+        self.airplane.image.save("airplane.jpg", jpeg_file((1600, 1200)))
+        self.addCleanup(self.airplane.image.delete, save=False)
+
+    def delete_variants(self, variants):
+        for name in VARIANTS:
+            self.airplane.image.storage.delete(variants[name])
+
+    def test_variants_are_resized_and_reencoded(self):
+        variants = generate_variants(
+            self.airplane.id, self.airplane.image.name
+        )
+        self.addCleanup(self.delete_variants, variants)
+
+        storage = self.airplane.image.storage
+        for name, (size, file_format, _, _) in VARIANTS.items():
+            with storage.open(variants[name]) as file:
+                with Image.open(file) as image:
+                    self.assertEqual(image.format, file_format)
+                    self.assertEqual(max(image.size), size)
+                    self.assertEqual(image.size[0] * 3, image.size[1] * 4)
+
+    def test_variant_urls_in_airplane_and_flight_detail(self):
+        variants = generate_variants(
+            self.airplane.id, self.airplane.image.name
+        )
+        self.addCleanup(self.delete_variants, variants)
+
+        res = self.client.get(detail_url(self.airplane.id))
+
+        self.assertEqual(set(res.data["image_variants"]), set(VARIANTS))
+        self.assertTrue(
+            res.data["image_variants"]["thumbnail"].startswith("http://")
+        )
+        self.assertTrue(
+            res.data["image_variants"]["webp"].endswith(".webp")
+        )
+
+    def test_no_variants_for_a_replaced_image(self):
+        source = self.airplane.image.name
+        self.airplane.image.save("other.jpg", jpeg_file((10, 10)))
+
+        self.assertIsNone(generate_variants(self.airplane.id, source))
+        self.airplane.refresh_from_db()
+        self.assertEqual(self.airplane.image_variants, {})
+        res = self.client.get(detail_url(self.airplane.id))
+        self.assertEqual(res.data["image_variants"], {})
+        self.airplane.image.storage.delete(source)
+
+
+class AirplaneImageUploadVariantTests(TransactionTestCase):
+    def test_upload_generates_variants_in_worker(self):
+        user = get_user_model().objects.create_superuser(
+            "admin@myproject.com", "password"
+        )
+        client = APIClient()
+        client.force_authenticate(user)
+        airplane = sample_airplane()
+        futures = []
+
+        def schedule(*args):
+            futures.append(schedule_variants(*args))
+            return futures[-1]
+
+        with mock.patch(
+            "airport.signals.schedule_variants", side_effect=schedule
+        ):
+            res = client.post(
+                image_upload_url(airplane.id),
+                {"image": jpeg_file((1200, 900))},
+                format="multipart",
+            )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        variants = futures[0].result(timeout=30)
+        airplane.refresh_from_db()
+        self.addCleanup(airplane.image.delete, save=False)
+        for name in VARIANTS:
+            self.addCleanup(airplane.image.storage.delete, variants[name])
+
+        self.assertEqual(len(futures), 1)
+        self.assertEqual(airplane.image_variants, variants)
+        self.assertEqual(variants["source"], airplane.image.name)
@@ -0,0 +1,130 @@
+from io import StringIO
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.models import Crew, Order, Ticket
+from airport.tests.test_flight_api import sample_flight, sample_airplane
+
+FLIGHT_URL = reverse("airport:flight-list")
+ASYNC_FLIGHT_URL = reverse("airport:async-flight-list")
+
+
+def async_detail_url(flight_id):
+    return reverse("airport:async-flight-detail", args=[flight_id])
+
+
+class AsyncFlightViewTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test1234",
+        )
+        self.headers = {
+            "Authorization": f"Bearer {AccessToken.for_user(self.user)}"
+        }
+        self.sync_client = APIClient()
+        self.sync_client.force_authenticate(self.user)
+
+        airplane = sample_airplane()
+        self.flights = [sample_flight(airplane=airplane) for _ in range(3)]
+        self.flights[0].crew.add(
+            Crew.objects.create(first_name="Ivan", last_name="Petrenko")
+        )
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(
+            flight=self.flights[0], order=order, row=1, seat=2
+        )
+
+    async def test_list_matches_sync_endpoint(self):
+        res = await self.async_client.get(
+            ASYNC_FLIGHT_URL, {"page_size": 2}, headers=self.headers
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        expected = await sync_to_async(self.sync_client.get)(
+            FLIGHT_URL, {"page_size": 2}
+        )
+        self.assertEqual(
+            res.json()["results"], expected.json()["results"]
+        )
+        self.assertIsNotNone(res.json()["next"])
+
+    async def test_list_follows_cursor(self):
+        first = await self.async_client.get(
+            ASYNC_FLIGHT_URL, {"page_size": 2}, headers=self.headers
+        )
+        second = await self.async_client.get(
+            first.json()["next"], headers=self.headers
+        )
+
+        self.assertEqual(
+            [flight["id"] for flight in second.json()["results"]],
+            [self.flights[2].id],
+        )
+
+    async def test_list_rejects_invalid_date(self):
+        res = await self.async_client.get(
+            ASYNC_FLIGHT_URL,
+            {"departure_time": "20-09-2023"},
+            headers=self.headers,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("departure_time", res.json())
+
+    async def test_detail_matches_sync_endpoint(self):
+        flight = self.flights[0]
+        res = await self.async_client.get(
+            async_detail_url(flight.id), headers=self.headers
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        expected = await sync_to_async(self.sync_client.get)(
+            reverse("airport:flight-detail", args=[flight.id])
+        )
+        self.assertEqual(res.json(), expected.json())
+
+    async def test_detail_not_found(self):
+        res = await self.async_client.get(
+            async_detail_url(0), headers=self.headers
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_auth_required(self):
+        res = await self.async_client.get(ASYNC_FLIGHT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn("Bearer", res["WWW-Authenticate"])
+
+    async def test_invalid_token(self):
+        res = await self.async_client.get(
+            ASYNC_FLIGHT_URL, headers={"Authorization": "Bearer nonsense"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class BenchmarkAsyncReadsTests(TransactionTestCase):
+    def test_all_requests_succeed(self):
+        sample_flight()
+        out = StringIO()
+
+        call_command(
+            "benchmark_async_reads",
+            requests=4,
+            concurrency=2,
+            workers=2,
+            client_delay=0,
+            stdout=out,
+        )
+
+        self.assertEqual(out.getvalue().count("req/s"), 6)
+        self.assertNotIn("non-200", out.getvalue())
@@ -0,0 +1,83 @@
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TransactionTestCase, skipUnlessDBFeature
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.inventory import SeatMap
+from airport.models import Ticket, Flight
+from airport.tests.test_flight_api import sample_flight, sample_airplane
+from airport.tests.test_order_api import ORDER_URL, order_payload
+
+WORKERS = 12
+ORDERS_PER_WORKER = 5
+MAX_ORDER_SECONDS = 5
+
+
+@skipUnlessDBFeature("has_select_for_update")
+class ConcurrentBookingTests(TransactionTestCase):
+    def setUp(self):
+        self.flight = sample_flight(
+            airplane=sample_airplane(rows=4, seats_in_row=6)
+        )
+        self.users = [
+            get_user_model().objects.create_user(
+                f"worker{index}@test.com", "test1234", is_staff=True
+            )
+            for index in range(WORKERS)
+        ]
+
+    def _book(self, user, results):
+        client = APIClient()
+        client.force_authenticate(user)
+        try:
+            for attempt in range(ORDERS_PER_WORKER):
+                row = (attempt % 4) + 1
+                places = [(row, 1), (row, 2), (row, attempt % 6 + 1)]
+                places = list(dict.fromkeys(places))
+                started = time.monotonic()
+                res = client.post(
+                    ORDER_URL,
+                    order_payload(self.flight, places),
+                    format="json"
+                )
+                results.append(
+                    (res.status_code, len(places), time.monotonic() - started)
+                )
+        finally:
+            connection.close()
+
+    def test_concurrent_orders_do_not_overbook(self):
+        results = []
+        threads = [
+            threading.Thread(target=self._book, args=(user, results))
+            for user in self.users
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        statuses = {code for code, _, _ in results}
+        self.assertLessEqual(
+            statuses, {status.HTTP_201_CREATED, status.HTTP_409_CONFLICT}
+        )
+        sold = sum(
+            count for code, count, _ in results
+            if code == status.HTTP_201_CREATED
+        )
+        self.assertEqual(
+            Ticket.objects.filter(flight=self.flight).count(), sold
+        )
+        self.assertLessEqual(sold, 24)
+        flight = Flight.objects.get(pk=self.flight.pk)
+        self.assertEqual(
+            set(SeatMap(4, 6, flight.seat_map)),
+            set(Ticket.objects.values_list("row", "seat"))
+        )
+        self.assertLess(
+            max(elapsed for _, _, elapsed in results), MAX_ORDER_SECONDS
+        )
@@ -0,0 +1,137 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Airport, Crew
+from airport.tests.test_route_api import sample_route
+
+AIRPORT_URL = reverse("airport:airport-list")
+ROUTE_URL = reverse("airport:route-list")
+CREW_URL = reverse("airport:crew-list")
+
+
+class CatalogCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test1234",
+        )
+        self.client.force_authenticate(self.user)
+        self.airport = Airport.objects.create(
+            name="Boryspil", closest_big_city="Kyiv"
+        )
+
+    def test_list_served_from_cache(self):
+        first = self.client.get(AIRPORT_URL)
+
+        # Only the throttle bucket upsert reaches the database.
+        with self.assertNumQueries(1):
+            second = self.client.get(AIRPORT_URL)
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second["ETag"], first["ETag"])
+
+    def test_save_invalidates_cached_list(self):
+        first = self.client.get(AIRPORT_URL)
+
+        Airport.objects.create(name="Zhuliany", closest_big_city="Kyiv")
+        second = self.client.get(AIRPORT_URL)
+
+        self.assertEqual(len(second.data), 2)
+        self.assertNotEqual(second["ETag"], first["ETag"])
+
+    def test_delete_invalidates_cached_list(self):
+        self.client.get(AIRPORT_URL)
+
+        self.airport.delete()
+
+        self.assertEqual(self.client.get(AIRPORT_URL).data, [])
+
+    def test_query_params_are_part_of_cache_key(self):
+        route = sample_route()
+        sample_route()
+
+        self.client.get(ROUTE_URL)
+        res = self.client.get(ROUTE_URL, {"source": route.source_id})
+
+        self.assertEqual([item["id"] for item in res.data], [route.id])
+
+    def test_route_list_invalidated_by_airport_change(self):
+        route = sample_route()
+        self.client.get(ROUTE_URL)
+
+        route.source.name = "Renamed"
+        route.source.save()
+        res = self.client.get(ROUTE_URL)
+
+        self.assertEqual(res.data[0]["source"], "Renamed")
+
+    def test_if_none_match_returns_not_modified(self):
+        etag = self.client.get(CREW_URL)["ETag"]
+
+        res = self.client.get(CREW_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res["ETag"], etag)
+
+        Crew.objects.create(first_name="Ivan", last_name="Petrenko")
+        res = self.client.get(CREW_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 1)
+
+
+
+@override_settings(CACHES={
+    alias: {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": alias,
+    }
+    for alias in ("default", "worker-1", "worker-2", "shared")
+})
+class CatalogCacheAcrossWorkersTests(TestCase):
+    """The local caches "worker-1" and "worker-2" stand for two workers."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("test@test.com", "test1234")
+        )
+        Airport.objects.create(name="Boryspil", closest_big_city="Kyiv")
+
+    def get_in_worker(self, worker, **headers):
+        with override_settings(AIRPORT_CATALOG_CACHE=worker):
+            return self.client.get(AIRPORT_URL, **headers)
+
+    def create_in_worker(self, worker):
+        with override_settings(AIRPORT_CATALOG_CACHE=worker):
+            Airport.objects.create(name="Zhuliany", closest_big_city="Kyiv")
+
+    @override_settings(AIRPORT_CATALOG_VERSION_TTL=0)
+    def test_change_in_other_worker_invalidates_list(self):
+        etag = self.get_in_worker("worker-1")["ETag"]
+
+        self.create_in_worker("worker-2")
+        res = self.get_in_worker("worker-1", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 2)
+
+    @override_settings(AIRPORT_CATALOG_VERSION_TTL=60)
+    def test_other_worker_keeps_version_until_ttl(self):
+        etag = self.get_in_worker("worker-1")["ETag"]
+
+        self.create_in_worker("worker-2")
+
+        self.assertEqual(
+            self.get_in_worker("worker-1", HTTP_IF_NONE_MATCH=etag)
+            .status_code,
+            status.HTTP_304_NOT_MODIFIED,
+        )
+        self.assertEqual(len(self.get_in_worker("worker-2").data), 2)
@@ -0,0 +1,292 @@
+import json
+import os
+import tempfile
+import textwrap
+from io import StringIO
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command, CommandError
+from django.db import connection
+from django.test import TestCase
+
+from airport.inventory import SeatMap
+from airport.management.commands.benchmark_api import ENDPOINTS
+from airport.models import Airport, Airplane, Route, Flight, Order, Ticket
+from airport.urls import router
+from airport.tests.test_flight_api import sample_flight
+
+
+class ReconcileTicketsSoldTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test1234",
+        )
+        self.flight = sample_flight()
+        order = Order.objects.create(user=user)
+        Ticket.objects.bulk_create([
+            Ticket(flight=self.flight, order=order, row=1, seat=1),
+            Ticket(flight=self.flight, order=order, row=2, seat=2),
+        ])
+
+    def test_reconcile_fixes_drifted_counter(self):
+        out = StringIO()
+
+        call_command("reconcile_tickets_sold", stdout=out)
+
+        flight = Flight.objects.get(pk=self.flight.pk)
+        self.assertEqual(flight.tickets_sold, 2)
+        self.assertEqual(
+            list(SeatMap(5, 5, flight.seat_map)), [(1, 1), (2, 2)]
+        )
+        self.assertIn("1 flight(s) fixed", out.getvalue())
+
+    def test_reconcile_dry_run(self):
+        out = StringIO()
+
+        call_command("reconcile_tickets_sold", "--dry-run", stdout=out)
+
+        self.assertEqual(Flight.objects.get(pk=self.flight.pk).tickets_sold, 0)
+        self.assertIn("1 flight(s) drifted", out.getvalue())
+
+
+class ImportScheduleTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(textwrap.dedent(content).lstrip())
+        return path
+
+    @staticmethod
+    def flight(source, destination, departure, arrival, **extra):
+        return json.dumps({
+            "source": source,
+            "destination": destination,
+            "airplane": "A320",
+            "departure_time": f"2023-09-{departure}:00:00Z",
+            "arrival_time": f"2023-09-{arrival}:30:00Z",
+            **extra,
+        })
+
+    def import_schedule(self, *args):
+        out, err = StringIO(), StringIO()
+        paths = [
+            self.write("airports.csv", """
+                name,closest_big_city
+                Boryspil,Kyiv
+                Chopin,Warsaw
+                Boryspil,Kyiv
+            """),
+            self.write("airplane_types.jsonl", """
+                {"name": "Narrow-body"}
+            """),
+            self.write("airplanes.csv", """
+                name,rows,seats_in_row,airplane_type
+                A320,30,6,Narrow-body
+                Broken,0,6,
+                Ghost,10,4,Wide-body
+            """),
+            self.write("routes.csv", """
+                source,destination,distance
+                Boryspil,Chopin,690
+                Boryspil,Nowhere,100
+            """),
+            self.write("crew.csv", """
+                first_name,last_name
+                Ivan,Petrenko
+                Olena,Shevchenko
+            """),
+            self.write("flights.jsonl", "\n".join([
+                self.flight("Boryspil", "Chopin", "20T08", "20T09",
+                            crew=["Ivan Petrenko", "Olena Shevchenko"]),
+                self.flight("Boryspil", "Chopin", "21T08", "21T09"),
+                self.flight("Chopin", "Boryspil", "21T08", "21T09"),
+                self.flight("Boryspil", "Chopin", "22T08", "22T07"),
+                "not json",
+            ])),
+        ]
+        call_command(
+            "import_schedule",
+            *reversed(paths),
+            *args,
+            batch_size=2,
+            stdout=out,
+            stderr=err,
+        )
+        return out.getvalue(), err.getvalue()
+
+    def assert_imported(self, out, err):
+        self.assertEqual(
+            sorted(Airport.objects.values_list("name", flat=True)),
+            ["Boryspil", "Chopin"],
+        )
+        airplane = Airplane.objects.get()
+        self.assertEqual(airplane.airplane_type.name, "Narrow-body")
+        route = Route.objects.get()
+        self.assertEqual(route.source.name, "Boryspil")
+
+        flights = Flight.objects.order_by("departure_time")
+        self.assertEqual(len(flights), 2)
+        self.assertEqual(
+            sorted(flights[0].crew.values_list("last_name", flat=True)),
+            ["Petrenko", "Shevchenko"],
+        )
+        self.assertEqual(len(flights[1].seat_map), 23)
+        self.assertEqual(flights[1].tickets_sold, 0)
+
+        self.assertIn("airplanes.csv:3: rows must be positive", err)
+        self.assertIn("airplanes.csv:4: unknown airplane_type", err)
+        self.assertIn("routes.csv:3: unknown airport 'Nowhere'", err)
+        self.assertIn("flights.jsonl:3: no route from 'Chopin'", err)
+        self.assertIn("flights.jsonl:4: arrival_time must be after", err)
+        self.assertIn("flights.jsonl:5: invalid JSON", err)
+        self.assertIn("airports: 3 lines, 2 imported, 1 skipped", out)
+        self.assertIn("Done, 6 line(s) with errors", out)
+
+    def test_import_with_bulk_create(self):
+        self.assert_imported(*self.import_schedule("--no-copy"))
+
+    @skipUnless(connection.vendor == "postgresql", "COPY needs PostgreSQL")
+    def test_import_with_copy(self):
+        self.assert_imported(*self.import_schedule())
+
+    def test_import_is_idempotent(self):
+        self.import_schedule("--no-copy")
+
+        out, _ = self.import_schedule("--no-copy")
+
+        self.assertEqual(Flight.objects.count(), 2)
+        self.assertIn("flights: 5 lines, 0 imported, 2 skipped", out)
+
+    def test_unknown_file_name(self):
+        with self.assertRaises(CommandError):
+            call_command("import_schedule", self.write("planes.csv", ""))
+
+
+class SeedPerfDataTests(TestCase):
+    options = {
+        "airports": 6,
+        "routes_per_airport": 2,
+        "airplanes": 3,
+        "crew": 5,
+        "users": 4,
+        "flights": 12,
+        "tickets": 300,
+        "days": 7,
+        "stdout": StringIO(),
+    }
+
+    def seed(self, *args, **options):
+        call_command("seed_perf_data", *args, **self.options, **options)
+        orders = sorted(Order.objects.values_list("created_at", flat=True))
+        users = sorted(
+            get_user_model().objects.values_list(
+                "email", "password", "date_joined"
+            )
+        )
+        return orders, users, [
+            (
+                flight.route.source.name,
+                flight.route.destination.name,
+                flight.airplane.name,
+                flight.departure_time,
+                sorted(flight.tickets.values_list("row", "seat")),
+            )
+            for flight in Flight.objects.select_related(
+                "route__source", "route__destination", "airplane"
+            ).order_by("departure_time", "route__source__name")
+        ]
+
+    def test_counts_and_consistency(self):
+        self.seed()
+
+        self.assertEqual(Airport.objects.count(), 6)
+        self.assertEqual(Route.objects.count(), 12)
+        self.assertEqual(Flight.objects.count(), 12)
+        self.assertGreater(Ticket.objects.count(), 100)
+        self.assertFalse(
+            Order.objects.filter(tickets__isnull=True).exists()
+        )
+        out = StringIO()
+        call_command("reconcile_tickets_sold", "--dry-run", stdout=out)
+        self.assertIn("0 flight(s) drifted", out.getvalue())
+
+    def test_same_seed_same_data(self):
+        first = self.seed("--seed", "7")
+        for model in (Ticket, Order, Flight, Route, Airport):
+            model.objects.all().delete()
+        get_user_model().objects.all().delete()
+
+        self.assertEqual(self.seed("--seed", "7", "--no-copy"), first)
+
+    def test_existing_seed_is_refused(self):
+        self.seed()
+
+        with self.assertRaises(CommandError):
+            self.seed()
+
+
+class BenchmarkApiTests(TestCase):
+    def test_endpoints_within_budgets(self):
+        out = StringIO()
+        output = os.path.join(tempfile.mkdtemp(), "results.json")
+
+        call_command(
+            "benchmark_api",
+            seed=1,
+            iterations=1,
+            ignore_latency=True,
+            output=output,
+            stdout=out,
+        )
+
+        self.assertIn("All budgets met", out.getvalue())
+        with open(output) as file:
+            results = json.load(file)["results"]
+        self.assertEqual(set(results), set(ENDPOINTS))
+
+    def test_exceeded_budget_fails(self):
+        budgets = os.path.join(tempfile.mkdtemp(), "budgets.json")
+        with open(budgets, "w") as file:
+            json.dump({name: {"queries": 0} for name in ENDPOINTS}, file)
+
+        with self.assertRaisesMessage(CommandError, "orders.list: queries"):
+            call_command(
+                "benchmark_api",
+                seed=1,
+                iterations=1,
+                budgets=budgets,
+                stdout=StringIO(),
+            )
+
+    def test_every_list_and_detail_route_is_benchmarked(self):
+        url_names = {url_name for url_name, _, _ in ENDPOINTS.values()}
+
+        for _, viewset, basename in router.registry:
+            for action, suffix in (("list", "list"), ("retrieve", "detail")):
+                if hasattr(viewset, action):
+                    self.assertIn(f"airport:{basename}-{suffix}", url_names)
+
+
+class BenchmarkSerializersTests(TestCase):
+    def test_reports_every_list_and_page_size(self):
+        for _ in range(3):
+            sample_flight()
+        out = StringIO()
+
+        call_command(
+            "benchmark_serializers",
+            page_sizes=[1, 2],
+            iterations=1,
+            stdout=out,
+        )
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 6)
+        self.assertTrue(lines[1].startswith("flights        2 per page"))
+        self.assertIn("values()", lines[-1])
@@ -0,0 +1,242 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from time import monotonic
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.connections import ConnectionIndex, Leg, connection_index
+from airport.models import Route, Flight
+from airport.tests.test_flight_api import sample_airport, sample_airplane
+
+CONNECTIONS_URL = reverse("airport:flight-connections")
+
+
+class ConnectionSearchApiTests(TestCase):
+    def setUp(self):
+        connection_index.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test1234",
+        )
+        self.client.force_authenticate(self.user)
+        self.airplane = sample_airplane()
+        self.kyiv = sample_airport(name="Kyiv")
+        self.warsaw = sample_airport(name="Warsaw")
+        self.berlin = sample_airport(name="Berlin")
+        self.paris = sample_airport(name="Paris")
+
+        self.kyiv_warsaw = self.flight(
+            self.kyiv, self.warsaw, "2023-09-20T08:00Z", "2023-09-20T10:00Z"
+        )
+        self.warsaw_berlin = self.flight(
+            self.warsaw, self.berlin, "2023-09-20T11:00Z", "2023-09-20T12:30Z"
+        )
+        self.short_layover = self.flight(
+            self.warsaw, self.berlin, "2023-09-20T10:10Z", "2023-09-20T11:40Z"
+        )
+        self.kyiv_berlin = self.flight(
+            self.kyiv, self.berlin, "2023-09-20T09:00Z", "2023-09-20T13:00Z"
+        )
+        self.berlin_paris = self.flight(
+            self.berlin, self.paris, "2023-09-20T23:30Z", "2023-09-21T01:00Z"
+        )
+
+    def flight(self, source, destination, departure_time, arrival_time):
+        route, _ = Route.objects.get_or_create(
+            source=source, destination=destination, defaults={"distance": 500}
+        )
+        return Flight.objects.create(
+            route=route,
+            airplane=self.airplane,
+            departure_time=departure_time,
+            arrival_time=arrival_time,
+        )
+
+    def search(self, **params):
+        defaults = {
+            "source": self.kyiv.id,
+            "destination": self.berlin.id,
+            "date": "2023-09-20",
+        }
+        defaults.update(params)
+        return self.client.get(CONNECTIONS_URL, defaults)
+
+    @staticmethod
+    def leg_ids(res):
+        return [
+            [leg["id"] for leg in itinerary["legs"]] for itinerary in res.data
+        ]
+
+    def test_direct_and_one_stop_itineraries(self):
+        res = self.search()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self.leg_ids(res),
+            [
+                [self.kyiv_warsaw.id, self.warsaw_berlin.id],
+                [self.kyiv_berlin.id],
+            ]
+        )
+        self.assertEqual(res.data[0]["layovers"], [60])
+        self.assertEqual(res.data[0]["duration"], 270)
+        self.assertEqual(
+            res.data[0]["legs"][0]["route"], "Kyiv --> Warsaw, 500"
+        )
+
+    def test_min_layover(self):
+        res = self.search(min_layover=5)
+
+        self.assertIn(
+            [self.kyiv_warsaw.id, self.short_layover.id], self.leg_ids(res)
+        )
+
+    def test_max_layover_across_midnight(self):
+        res = self.search(destination=self.paris.id, max_layover=12 * 60)
+
+        self.assertEqual(
+            self.leg_ids(res),
+            [
+                [self.kyiv_berlin.id, self.berlin_paris.id],
+                [self.kyiv_warsaw.id, self.warsaw_berlin.id,
+                 self.berlin_paris.id],
+            ]
+        )
+
+    def test_max_legs(self):
+        res = self.search(
+            destination=self.paris.id, max_layover=12 * 60, max_legs=2
+        )
+
+        self.assertEqual(
+            self.leg_ids(res), [[self.kyiv_berlin.id, self.berlin_paris.id]]
+        )
+
+    def test_index_updated_when_flights_change(self):
+        self.search()
+
+        self.kyiv_berlin.departure_time = "2023-09-21T09:00Z"
+        self.kyiv_berlin.arrival_time = "2023-09-21T13:00Z"
+        self.kyiv_berlin.save()
+        new_flight = self.flight(
+            self.kyiv, self.berlin, "2023-09-20T06:00Z", "2023-09-20T09:00Z"
+        )
+        # Throttle bucket upsert and the flights of the itineraries.
+        with self.assertNumQueries(2):
+            res = self.search()
+
+        self.assertEqual(
+            self.leg_ids(res),
+            [[new_flight.id], [self.kyiv_warsaw.id, self.warsaw_berlin.id]]
+        )
+
+    def test_invalid_layover_range(self):
+        res = self.search(min_layover=120, max_layover=60)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class CountingIndex(ConnectionIndex):
+    def __init__(self, days):
+        super().__init__(ttl=3600)
+        self.calls = 0
+        for day, adjacency in days.items():
+            self._days[day] = (monotonic(), adjacency)
+
+    def departures(self, airport_id, after, before):
+        self.calls += 1
+        return super().departures(airport_id, after, before)
+
+
+class DenseConnectionSearchTests(SimpleTestCase):
+    airports = 60
+    day = date(2023, 9, 20)
+
+    def setUp(self):
+        # A departure every 10 minutes from every airport, so a layover
+        # window of hours holds dozens of onward flights.
+        start = datetime(2023, 9, 20, tzinfo=timezone.utc)
+        adjacency = defaultdict(list)
+        flight_id = 0
+        for source in range(self.airports):
+            for slot in range(120):
+                flight_id += 1
+                departure = start + timedelta(minutes=10 * slot)
+                adjacency[source].append(Leg(
+                    departure,
+                    flight_id,
+                    source,
+                    (source + 7 * slot + 1) % self.airports,
+                    departure + timedelta(hours=1),
+                ))
+        self.index = CountingIndex({
+            self.day: adjacency,
+            self.day + timedelta(days=1): defaultdict(list),
+        })
+
+    def test_search_stops_at_limit(self):
+        itineraries = self.index.search(
+            1,
+            0,
+            self.day,
+            timedelta(minutes=30),
+            timedelta(hours=6),
+            max_legs=4,
+            limit=10,
+        )
+
+        self.assertEqual(len(itineraries), 10)
+        keys = [
+            (legs[-1].arrival_time, len(legs), legs[0].departure_time)
+            for legs in itineraries
+        ]
+        self.assertEqual(keys, sorted(keys))
+        # Onward flights are looked up at most once per flight, where a
+        # full depth-first search would walk millions of paths.
+        self.assertLessEqual(self.index.calls, 1 + self.airports * 120)
+
+
+class HubConnectionSearchTests(SimpleTestCase):
+    day = date(2023, 9, 20)
+
+    def test_late_connection_after_many_early_arrivals(self):
+        # A -> X every 10 minutes, but only one X -> D flight at 20:00,
+        # which the arrivals between 14:00 and 19:30 connect to.
+        start = datetime(2023, 9, 20, tzinfo=timezone.utc)
+        adjacency = defaultdict(list)
+        for slot in range(144):
+            departure = start + timedelta(minutes=10 * slot)
+            adjacency[1].append(Leg(
+                departure, slot + 1, 1, 2, departure + timedelta(hours=1)
+            ))
+        departure = start + timedelta(hours=20)
+        adjacency[2].append(
+            Leg(departure, 1000, 2, 3, departure + timedelta(hours=2))
+        )
+        index = CountingIndex({
+            self.day: adjacency,
+            self.day + timedelta(days=1): defaultdict(list),
+        })
+
+        itineraries = index.search(
+            1,
+            3,
+            self.day,
+            timedelta(minutes=30),
+            timedelta(hours=6),
+            max_legs=2,
+        )
+
+        self.assertEqual(
+            [legs[0].departure_time for legs in itineraries],
+            [
+                start + timedelta(hours=13, minutes=10 * slot)
+                for slot in range(34)
+            ],
+        )
+        self.assertTrue(all(legs[1].flight_id == 1000 for legs in itineraries))
@@ -0,0 +1,154 @@
+import csv
+import io
+import json
+from datetime import datetime, timezone
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.export import export_rows, FLIGHT_COLUMNS
+from airport.models import Flight, Order, Ticket
+from airport.tests.test_flight_api import sample_flight, sample_airplane
+
+FLIGHT_EXPORT_URL = reverse("airport:flight-export")
+ORDER_EXPORT_URL = reverse("airport:order-export")
+TICKET_EXPORT_URL = reverse("airport:order-export-tickets")
+
+
+def read_ndjson(res):
+    return [
+        json.loads(line)
+        for line in b"".join(res.streaming_content).decode().splitlines()
+    ]
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test1234",
+        )
+        self.client.force_authenticate(self.user)
+        airplane = sample_airplane()
+        self.flight = sample_flight(
+            airplane=airplane,
+            departure_time=datetime(2023, 9, 20, 10, tzinfo=timezone.utc),
+        )
+        self.later_flight = sample_flight(
+            airplane=airplane,
+            departure_time=datetime(2023, 10, 2, 10, tzinfo=timezone.utc),
+        )
+        self.order = Order.objects.create(user=self.user)
+        self.ticket = Ticket.objects.create(
+            flight=self.flight, order=self.order, row=3, seat=4
+        )
+        other = get_user_model().objects.create_user(
+            "other@test.com", "test1234"
+        )
+        Ticket.objects.create(
+            flight=self.flight,
+            order=Order.objects.create(user=other),
+            row=1,
+            seat=1,
+        )
+
+    def test_flights_ndjson(self):
+        res = self.client.get(
+            FLIGHT_EXPORT_URL, {"departure_to": "2023-09-30"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        self.assertEqual(
+            read_ndjson(res),
+            [{
+                "id": self.flight.id,
+                "route_id": self.flight.route_id,
+                "source": "airport1",
+                "destination": "airport2",
+                "airplane_id": self.flight.airplane_id,
+                "airplane": "Airplane",
+                "departure_time": "2023-09-20T10:00:00Z",
+                "arrival_time": "2023-09-20T21:00:00Z",
+                "tickets_sold": 2,
+            }],
+        )
+
+    def test_flights_csv(self):
+        res = self.client.get(FLIGHT_EXPORT_URL, {"file_format": "csv"})
+
+        self.assertEqual(res["Content-Type"], "text/csv")
+        self.assertIn("flights.csv", res["Content-Disposition"])
+        rows = list(csv.reader(io.StringIO(
+            b"".join(res.streaming_content).decode()
+        )))
+        self.assertEqual(rows[0], [name for name, _ in FLIGHT_COLUMNS])
+        self.assertEqual(
+            [int(row[0]) for row in rows[1:]],
+            [self.flight.id, self.later_flight.id],
+        )
+
+    def test_invalid_format(self):
+        res = self.client.get(FLIGHT_EXPORT_URL, {"file_format": "xml"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_orders_and_tickets_of_user(self):
+        orders = read_ndjson(self.client.get(ORDER_EXPORT_URL))
+        tickets = read_ndjson(self.client.get(TICKET_EXPORT_URL))
+
+        self.assertEqual([order["id"] for order in orders], [self.order.id])
+        self.assertEqual(
+            [(ticket["id"], ticket["row"], ticket["seat"])
+             for ticket in tickets],
+            [(self.ticket.id, 3, 4)],
+        )
+
+    def test_staff_exports_every_order(self):
+        self.user.is_staff = True
+        self.user.save()
+
+        tickets = read_ndjson(self.client.get(TICKET_EXPORT_URL))
+
+        self.assertEqual(len(tickets), 2)
+
+    def test_created_range(self):
+        res = self.client.get(ORDER_EXPORT_URL, {"created_to": "2000-01-01"})
+
+        self.assertEqual(read_ndjson(res), [])
+
+    def test_rows_are_read_in_chunks(self):
+        for _ in range(4):
+            sample_flight(airplane=self.flight.airplane)
+
+        with self.assertNumQueries(1):
+            lines = list(export_rows(
+                Flight.objects.order_by("id"), FLIGHT_COLUMNS, "ndjson",
+                chunk_size=2,
+            ))
+
+        self.assertEqual(len(lines), 6)
+
+    async def test_asgi_streams_async_iterator(self):
+        res = await self.async_client.get(
+            TICKET_EXPORT_URL,
+            {"file_format": "csv"},
+            headers={
+                "Authorization": f"Bearer {AccessToken.for_user(self.user)}"
+            },
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.is_async)
+        body = b"".join([line async for line in res.streaming_content])
+        rows = list(csv.reader(io.StringIO(body.decode())))
+        self.assertEqual(
+            [(row[0], row[-2], row[-1]) for row in rows[1:]],
+            [(str(self.ticket.id), "3", "4")],
+        )
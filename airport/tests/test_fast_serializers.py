@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qs, urlparse
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from airport.fast_serializers import ValuesListSerializer
+from airport.images import VARIANTS
+from airport.models import Airport, Order, Ticket
+from airport.tests.test_airplane_api import jpeg_file, sample_airplane_type
+from airport.tests.test_flight_api import sample_flight, sample_airplane
+
+FLIGHT_URL = reverse("airport:flight-list")
+ROUTE_URL = reverse("airport:route-list")
+AIRPLANE_URL = reverse("airport:airplane-list")
+
+
+class FastListTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test1234",
+        )
+        self.client.force_authenticate(self.user)
+        airplane = sample_airplane(
+            name="Boeing 737", airplane_type=sample_airplane_type()
+        )
+        start = datetime(2023, 9, 20, 10, 30, 15, 250000, tzinfo=timezone.utc)
+        self.flights = [
+            sample_flight(
+                airplane=airplane,
+                departure_time=start + timedelta(hours=hours),
+                arrival_time=start + timedelta(hours=hours + 2),
+            )
+            for hours in range(5)
+        ]
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(
+            flight=self.flights[0], order=order, row=1, seat=1
+        )
+
+    def get_both(self, url, params=None):
+        """Return the normal and the fast response bodies of ``url``"""
+        responses = []
+        for fast in (False, True):
+            cache.clear()
+            with override_settings(AIRPORT_FAST_LISTS=fast):
+                res = self.client.get(url, params)
+            self.assertEqual(res.status_code, 200)
+            responses.append(res.content)
+        return responses
+
+    def test_flight_list_is_identical(self):
+        normal, fast = self.get_both(FLIGHT_URL, {"page_size": 2})
+
+        self.assertEqual(fast, normal)
+        self.assertIn(b'"tickets_available":24', fast)
+
+    def test_flight_list_cursor_pages_and_filters_are_identical(self):
+        res = self.client.get(FLIGHT_URL, {"page_size": 2})
+        cursor = parse_qs(urlparse(res.json()["next"]).query)["cursor"][0]
+
+        for params in (
+            {"page_size": 2, "cursor": cursor},
+            {"departure_time": "2023-09-20"},
+            {"route": str(self.flights[1].route_id)},
+        ):
+            normal, fast = self.get_both(FLIGHT_URL, params)
+            self.assertEqual(fast, normal, params)
+
+    def test_flight_list_query_count(self):
+        with override_settings(AIRPORT_FAST_LISTS=True):
+            # Throttle bucket upsert and the flight page.
+            with self.assertNumQueries(2):
+                self.client.get(FLIGHT_URL)
+
+    def test_route_list_is_identical(self):
+        normal, fast = self.get_both(ROUTE_URL)
+
+        self.assertEqual(fast, normal)
+
+    def test_airplane_list_is_identical(self):
+        airplane = sample_airplane(name="With image")
+        airplane.image.save("airplane.jpg", jpeg_file((10, 10)))
+        self.addCleanup(airplane.image.delete, save=False)
+        airplane.image_variants = {"source": airplane.image.name}
+        airplane.image_variants.update(
+            (name, f"upload-image/variants/airplane-{name}.jpg")
+            for name in VARIANTS
+        )
+        airplane.save()
+
+        normal, fast = self.get_both(AIRPLANE_URL)
+
+        self.assertEqual(fast, normal)
+        self.assertIn(b"http://testserver/media/upload-image/", fast)
+
+
+class ValuesListSerializerTests(TestCase):
+    def test_lookups_are_output_as_is_by_default(self):
+        class AirportValuesSerializer(ValuesListSerializer):
+            lookups = ("id", "name")
+
+        airport = Airport.objects.create(
+            name="Boryspil", closest_big_city="Kyiv"
+        )
+        serializer = AirportValuesSerializer()
+
+        self.assertEqual(
+            serializer.to_representation(
+                serializer.values(Airport.objects.all())
+            ),
+            [{"id": airport.id, "name": "Boryspil"}],
+        )
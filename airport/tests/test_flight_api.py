@@ -117,7 +117,7 @@ class AuthenticatedFlightApiTests(TestCase):
         serializer = FlightListSerializer(flight, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_filter_flights_by_route(self):
         flight1 = sample_flight()
@@ -128,11 +128,11 @@ class AuthenticatedFlightApiTests(TestCase):
         serializer1 = FlightListSerializer(flight1)
         serializer2 = FlightListSerializer(flight2)
 
-        for data in res.data:
+        for data in res.data["results"]:
             data.pop("tickets_available", None)
 
-        self.assertIn(serializer1.data, res.data)
-        self.assertNotIn(serializer2.data, res.data)
+        self.assertIn(serializer1.data, res.data["results"])
+        self.assertNotIn(serializer2.data, res.data["results"])
 
     def test_filter_flights_by_departure_time(self):
         flight1 = sample_flight()
@@ -143,11 +143,11 @@ class AuthenticatedFlightApiTests(TestCase):
         serializer1 = FlightListSerializer(flight1)
         serializer2 = FlightListSerializer(flight2)
 
-        for data in res.data:
+        for data in res.data["results"]:
             data.pop("tickets_available", None)
 
-        self.assertIn(serializer1.data, res.data)
-        self.assertNotIn(serializer2.data, res.data)
+        self.assertIn(serializer1.data, res.data["results"])
+        self.assertNotIn(serializer2.data, res.data["results"])
 
     def test_retrieve_flight_detail(self):
         flight = sample_flight()
@@ -0,0 +1,147 @@
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Flight
+from airport.tests.test_flight_api import (
+    sample_flight,
+    sample_route,
+    sample_airplane,
+)
+
+FLIGHT_URL = reverse("airport:flight-list")
+
+
+def result_ids(res):
+    return [flight["id"] for flight in res.data["results"]]
+
+
+class FlightFilterTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test1234",
+        )
+        self.client.force_authenticate(self.user)
+        self.route1 = sample_route()
+        self.route2 = sample_route()
+        self.route3 = sample_route()
+        self.late_evening = sample_flight(
+            route=self.route1,
+            departure_time="2023-09-19T23:59:59Z",
+            arrival_time="2023-09-20T02:00:00Z",
+        )
+        self.midnight = sample_flight(
+            route=self.route2,
+            departure_time="2023-09-20T00:00:00Z",
+            arrival_time="2023-09-20T02:00:00Z",
+        )
+        self.next_day = sample_flight(
+            route=self.route3,
+            departure_time="2023-09-21T23:59:59Z",
+            arrival_time="2023-09-22T02:00:00Z",
+        )
+        self.later = sample_flight(
+            route=self.route1,
+            departure_time="2023-09-22T00:00:00Z",
+            arrival_time="2023-09-22T02:00:00Z",
+        )
+
+    def test_filter_by_departure_day(self):
+        res = self.client.get(FLIGHT_URL, {"departure_time": "2023-09-20"})
+
+        self.assertEqual(result_ids(res), [self.midnight.id])
+
+    def test_filter_by_departure_range(self):
+        res = self.client.get(
+            FLIGHT_URL,
+            {"departure_from": "2023-09-20", "departure_to": "2023-09-21"},
+        )
+
+        self.assertEqual(result_ids(res), [self.midnight.id, self.next_day.id])
+
+    def test_filter_by_departure_from_only(self):
+        res = self.client.get(FLIGHT_URL, {"departure_from": "2023-09-21"})
+
+        self.assertEqual(result_ids(res), [self.next_day.id, self.later.id])
+
+    def test_filter_by_several_routes(self):
+        res = self.client.get(
+            FLIGHT_URL, {"route": f"{self.route1.id},{self.route3.id}"}
+        )
+
+        self.assertEqual(
+            result_ids(res),
+            [self.late_evening.id, self.next_day.id, self.later.id]
+        )
+
+    def test_invalid_date(self):
+        res = self.client.get(FLIGHT_URL, {"departure_from": "20-09-2023"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("departure_from", res.data)
+
+
+@skipUnless(
+    connection.vendor == "postgresql",
+    "Index usage is checked on PostgreSQL plans"
+)
+class FlightFilterIndexTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test1234",
+        )
+        self.client.force_authenticate(self.user)
+        self.route = sample_route()
+        sample_flight(route=self.route)
+
+    def _plan(self, params):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(FLIGHT_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        sql = queries.captured_queries[-1]["sql"]
+        self.assertNotIn("::date", sql)
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute(f"EXPLAIN {sql}")
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+            cursor.execute("SET LOCAL enable_seqscan = on")
+        return plan
+
+    def test_departure_range_uses_departure_index(self):
+        plan = self._plan(
+            {"departure_from": "2023-09-20", "departure_to": "2023-09-21"}
+        )
+
+        self.assertIn("flight_departure_idx", plan)
+
+    def test_route_and_date_use_composite_index(self):
+        other_route = sample_route()
+        airplane = sample_airplane()
+        Flight.objects.bulk_create(
+            Flight(
+                route=other_route,
+                airplane=airplane,
+                departure_time="2023-09-20T10:00:00Z",
+                arrival_time="2023-09-20T12:00:00Z",
+            )
+            for _ in range(500)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {Flight._meta.db_table}")
+
+        plan = self._plan({
+            "route": str(self.route.id),
+            "departure_time": "2023-09-20",
+        })
+
+        self.assertIn("flight_route_departure_idx", plan)
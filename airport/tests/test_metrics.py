@@ -0,0 +1,175 @@
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from prometheus_client.parser import text_string_to_metric_families
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.metrics import MULTIPROCESS_ENV, collector_registry
+from airport.tests.test_flight_api import sample_flight, sample_airplane
+from airport.tests.test_order_api import ORDER_URL, order_payload
+from airport.throttling import SharedUserRateThrottle
+
+FLIGHT_URL = reverse("airport:flight-list")
+METRICS_URL = reverse("metrics")
+
+
+def sample_value(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test1234",
+            is_staff=True,
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight(airplane=sample_airplane())
+
+    def test_request_latency_and_queries_per_route(self):
+        labels = {"route": "airport:flight-list"}
+        requests = sample_value(
+            "airport_request_duration_seconds_count", method="GET", **labels
+        )
+        queries = sample_value("airport_db_queries_total", **labels)
+
+        self.client.get(FLIGHT_URL)
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res["Content-Type"].startswith("text/plain"))
+        families = {
+            family.name: family
+            for family in text_string_to_metric_families(res.content.decode())
+        }
+        self.assertEqual(
+            families["airport_request_duration_seconds"].type, "histogram"
+        )
+        self.assertEqual(
+            sample_value(
+                "airport_request_duration_seconds_count",
+                method="GET",
+                **labels,
+            ),
+            requests + 1,
+        )
+        # Throttle bucket upsert and the page of flights.
+        self.assertEqual(
+            sample_value("airport_db_queries_total", **labels), queries + 2
+        )
+
+    def test_orders_tickets_and_conflicts(self):
+        orders = sample_value("airport_orders_created_total")
+        tickets = sample_value("airport_tickets_sold_total")
+        conflicts = sample_value("airport_seat_conflicts_total")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                ORDER_URL,
+                order_payload(self.flight, [(1, 1), (1, 2)]),
+                format="json",
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(
+                ORDER_URL,
+                order_payload(self.flight, [(1, 2)]),
+                format="json",
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            sample_value("airport_orders_created_total"), orders + 1
+        )
+        self.assertEqual(
+            sample_value("airport_tickets_sold_total"), tickets + 2
+        )
+        self.assertEqual(
+            sample_value("airport_seat_conflicts_total"), conflicts + 1
+        )
+
+    def test_throttled_requests(self):
+        throttled = sample_value(
+            "airport_throttled_requests_total", scope="user"
+        )
+
+        with mock.patch.object(
+            SharedUserRateThrottle, "THROTTLE_RATES", {"user": "1/min"}
+        ):
+            for _ in range(3):
+                self.client.get(FLIGHT_URL)
+
+        self.assertEqual(
+            sample_value("airport_throttled_requests_total", scope="user"),
+            throttled + 2,
+        )
+
+
+class MetricsAccessTests(TestCase):
+    def test_forbidden_outside_internal_ips(self):
+        res = self.client.get(METRICS_URL, REMOTE_ADDR="203.0.113.7")
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(AIRPORT_METRICS_TOKEN="scrape")
+    def test_token_opens_metrics_outside_internal_ips(self):
+        res = self.client.get(
+            METRICS_URL,
+            REMOTE_ADDR="203.0.113.7",
+            HTTP_AUTHORIZATION="Bearer scrape",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    @override_settings(AIRPORT_METRICS_TOKEN="scrape")
+    def test_wrong_token_is_forbidden(self):
+        res = self.client.get(
+            METRICS_URL,
+            REMOTE_ADDR="203.0.113.7",
+            HTTP_AUTHORIZATION="Bearer guess",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class MultiprocessMetricsTests(TestCase):
+    def test_values_of_worker_processes_are_added_up(self):
+        with tempfile.TemporaryDirectory() as directory:
+            env = {
+                **os.environ,
+                "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE,
+                MULTIPROCESS_ENV: directory,
+            }
+            for _ in range(2):
+                subprocess.run(
+                    [
+                        sys.executable,
+                        "-c",
+                        "import django; django.setup(); "
+                        "from airport.metrics import record_order; "
+                        "record_order(3)",
+                    ],
+                    env=env,
+                    cwd=settings.BASE_DIR,
+                    check=True,
+                )
+
+            with mock.patch.dict(os.environ, {MULTIPROCESS_ENV: directory}):
+                registry = collector_registry()
+
+            self.assertEqual(
+                registry.get_sample_value("airport_orders_created_total"), 2
+            )
+            self.assertEqual(
+                registry.get_sample_value("airport_tickets_sold_total"), 6
+            )
@@ -0,0 +1,260 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.inventory import SeatMap
+from airport.models import Order, Ticket, Flight
+from airport.tests.test_flight_api import sample_flight, sample_airplane
+
+ORDER_URL = reverse("airport:order-list")
+
+
+def order_payload(flight, places):
+    return {
+        "tickets": [
+            {"flight": flight.id, "row": row, "seat": seat}
+            for row, seat in places
+        ]
+    }
+
+
+class OrderCreateApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "admin@test.com",
+            "test1234",
+            is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight(
+            airplane=sample_airplane(rows=10, seats_in_row=9)
+        )
+
+    def test_create_order(self):
+        res = self.client.post(
+            ORDER_URL,
+            order_payload(self.flight, [(1, 1), (1, 2)]),
+            format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        order = Order.objects.get(id=res.data["id"])
+        self.assertEqual(order.user, self.user)
+        self.assertEqual(
+            list(order.tickets.values_list("row", "seat")),
+            [(1, 1), (1, 2)]
+        )
+        self.flight.refresh_from_db()
+        self.assertEqual(
+            list(SeatMap(10, 9, self.flight.seat_map)), [(1, 1), (1, 2)]
+        )
+
+    def test_create_order_row_out_of_range(self):
+        res = self.client.post(
+            ORDER_URL,
+            order_payload(self.flight, [(1, 1), (11, 1)]),
+            format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data["tickets"]["row"],
+            ["row number must be in available range: (1, rows): (1, 10)"]
+        )
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_create_order_seat_out_of_range(self):
+        res = self.client.post(
+            ORDER_URL,
+            order_payload(self.flight, [(1, 10)]),
+            format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data["tickets"]["seat"],
+            ["seat number must be in available range: "
+             "(1, seats_in_row): (1, 9)"]
+        )
+
+    def test_create_order_duplicate_seat_in_request(self):
+        res = self.client.post(
+            ORDER_URL,
+            order_payload(self.flight, [(2, 2), (2, 2)]),
+            format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Order.objects.exists())
+
+    def test_create_order_seat_already_taken(self):
+        self.client.post(
+            ORDER_URL, order_payload(self.flight, [(3, 3)]), format="json"
+        )
+
+        res = self.client.post(
+            ORDER_URL,
+            order_payload(self.flight, [(3, 4), (3, 3)]),
+            format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            res.data["taken_places"],
+            [{"flight": self.flight.id, "row": 3, "seat": 3}]
+        )
+        self.assertEqual(Ticket.objects.count(), 1)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_create_order_stale_seat_map_returns_conflict(self):
+        self.client.post(
+            ORDER_URL, order_payload(self.flight, [(3, 3)]), format="json"
+        )
+        Flight.objects.filter(pk=self.flight.pk).update(
+            seat_map=bytes(SeatMap.size_in_bytes(10, 9))
+        )
+
+        res = self.client.post(
+            ORDER_URL, order_payload(self.flight, [(3, 3)]), format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            res.data["taken_places"],
+            [{"flight": self.flight.id, "row": 3, "seat": 3}]
+        )
+
+    def test_create_order_unknown_flight(self):
+        res = self.client.post(
+            ORDER_URL,
+            {"tickets": [{"flight": 0, "row": 1, "seat": 1}]},
+            format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_order_queries_do_not_grow_with_ticket_count(self):
+        """Benchmark: queries per order stay flat from 1 to 9 tickets."""
+        self.client.post(
+            ORDER_URL, order_payload(self.flight, [(10, 9)]), format="json"
+        )
+        query_counts = {}
+        for row, ticket_count in enumerate((1, 3, 9), start=1):
+            places = [(row, seat) for seat in range(1, ticket_count + 1)]
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.post(
+                    ORDER_URL,
+                    order_payload(self.flight, places),
+                    format="json"
+                )
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+            query_counts[ticket_count] = len(queries)
+
+        self.assertEqual(len(set(query_counts.values())), 1, query_counts)
+
+    def test_order_updates_tickets_sold(self):
+        self.client.post(
+            ORDER_URL,
+            order_payload(self.flight, [(1, 1), (1, 2), (1, 3)]),
+            format="json"
+        )
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 3)
+
+        Order.objects.get().delete()
+
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 0)
+
+    def test_flight_list_tickets_available(self):
+        self.client.post(
+            ORDER_URL,
+            order_payload(self.flight, [(1, 1), (1, 2)]),
+            format="json"
+        )
+
+        # Throttle bucket upsert and the flight page.
+        with self.assertNumQueries(2) as queries:
+            res = self.client.get(reverse("airport:flight-list"))
+
+        self.assertEqual(res.data["results"][0]["tickets_available"], 88)
+        self.assertNotIn("GROUP BY", queries.captured_queries[-1]["sql"])
+
+    def test_order_over_several_flights(self):
+        other_flight = sample_flight()
+
+        res = self.client.post(
+            ORDER_URL,
+            {
+                "tickets": [
+                    {"flight": self.flight.id, "row": 1, "seat": 1},
+                    {"flight": other_flight.id, "row": 1, "seat": 1},
+                ]
+            },
+            format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        for flight in Flight.objects.filter(
+            id__in=[self.flight.id, other_flight.id]
+        ):
+            self.assertEqual(
+                list(SeatMap(
+                    flight.airplane.rows,
+                    flight.airplane.seats_in_row,
+                    flight.seat_map
+                )),
+                [(1, 1)]
+            )
+
+
+class OrderListApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@test.com",
+            "test1234",
+        )
+        self.client.force_authenticate(self.user)
+        airplane = sample_airplane(rows=10, seats_in_row=9)
+        self.flights = [sample_flight(airplane=airplane) for _ in range(3)]
+
+    def create_orders(self, count, tickets_per_order, first_row):
+        for row in range(first_row, first_row + count):
+            order = Order.objects.create(user=self.user)
+            for seat in range(1, tickets_per_order + 1):
+                Ticket.objects.create(
+                    order=order,
+                    flight=self.flights[seat % len(self.flights)],
+                    row=row,
+                    seat=seat,
+                )
+
+    def test_list_query_count_is_fixed(self):
+        self.create_orders(1, 1, first_row=1)
+        # Throttle bucket upsert, orders, tickets and their flights.
+        with self.assertNumQueries(4):
+            res = self.client.get(ORDER_URL, {"page_size": 20})
+        self.assertEqual(len(res.data["results"]), 1)
+
+        self.create_orders(8, 6, first_row=2)
+        with self.assertNumQueries(4):
+            res = self.client.get(ORDER_URL, {"page_size": 20})
+        self.assertEqual(len(res.data["results"]), 9)
+
+    def test_list_tickets_show_flight_details(self):
+        self.create_orders(1, 2, first_row=1)
+
+        res = self.client.get(ORDER_URL)
+
+        tickets = res.data["results"][0]["tickets"]
+        flight = self.flights[1]
+        self.assertEqual(tickets[0]["flight"]["id"], flight.id)
+        self.assertEqual(tickets[0]["flight"]["route"], str(flight.route))
+        self.assertEqual(tickets[0]["flight"]["airplane"], "Airplane")
+        self.assertEqual(tickets[0]["flight"]["tickets_available"], 89)
@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta, timezone
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Order
+from airport.tests.test_flight_api import (
+    sample_flight,
+    sample_route,
+    sample_airplane,
+)
+
+FLIGHT_URL = reverse("airport:flight-list")
+ORDER_URL = reverse("airport:order-list")
+
+
+class FlightKeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test1234",
+        )
+        self.client.force_authenticate(self.user)
+        route = sample_route()
+        airplane = sample_airplane()
+        start = datetime(2023, 9, 20, 10, tzinfo=timezone.utc)
+        self.flights = [
+            sample_flight(
+                route=route,
+                airplane=airplane,
+                departure_time=start + timedelta(hours=index // 2),
+                arrival_time=start + timedelta(hours=index // 2 + 2),
+            )
+            for index in range(7)
+        ]
+
+    def _walk(self, url, params=None):
+        ids = []
+        res = self.client.get(url, params)
+        while True:
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            ids.extend(flight["id"] for flight in res.data["results"])
+            if not res.data["next"]:
+                return ids, res
+            res = self.client.get(res.data["next"])
+
+    def test_pages_follow_departure_time_then_id(self):
+        ids, _ = self._walk(FLIGHT_URL, {"page_size": 3})
+
+        self.assertEqual(ids, [flight.id for flight in self.flights])
+
+    def test_previous_link_returns_previous_page(self):
+        first = self.client.get(FLIGHT_URL, {"page_size": 3})
+        second = self.client.get(first.data["next"])
+
+        previous = self.client.get(second.data["previous"])
+
+        self.assertEqual(previous.data["results"], first.data["results"])
+        self.assertIsNone(first.data["previous"])
+
+    def test_page_query_count_does_not_depend_on_depth(self):
+        first = self.client.get(FLIGHT_URL, {"page_size": 2})
+        last = self.client.get(first.data["next"])
+        last = self.client.get(last.data["next"])
+
+        # Throttle bucket upsert and the flight page.
+        with self.assertNumQueries(2):
+            self.client.get(last.data["next"])
+
+    def test_invalid_cursor(self):
+        res = self.client.get(FLIGHT_URL, {"cursor": "not-a-cursor"})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class OrderKeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test1234",
+        )
+        self.client.force_authenticate(self.user)
+        self.orders = [Order.objects.create(user=self.user) for _ in range(3)]
+
+    def test_orders_newest_first(self):
+        ids = []
+        res = self.client.get(ORDER_URL)
+        while res.data["next"]:
+            ids.extend(order["id"] for order in res.data["results"])
+            res = self.client.get(res.data["next"])
+        ids.extend(order["id"] for order in res.data["results"])
+
+        self.assertEqual(ids, [order.id for order in reversed(self.orders)])
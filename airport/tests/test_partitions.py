@@ -0,0 +1,209 @@
+from datetime import date, datetime, timezone as dt_timezone
+from io import StringIO
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import SimpleTestCase, TestCase
+
+from airport.inventory import forget_airplane_dimensions
+from airport.models import Flight, Order, Ticket
+from airport.partitions import (
+    add_months,
+    archived_before,
+    create_ticket_partitions,
+    detach_ticket_partitions,
+    ticket_partitions,
+)
+from airport.tests.test_flight_api import sample_flight
+
+DEPARTURE = datetime(2023, 9, 20, 19, 16, 44, tzinfo=dt_timezone.utc)
+
+
+class TicketFlightDepartureTests(TestCase):
+    def setUp(self):
+        forget_airplane_dimensions()
+        self.addCleanup(forget_airplane_dimensions)
+        user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test1234",
+        )
+        self.flight = sample_flight()
+        self.order = Order.objects.create(user=user)
+
+    def test_save_copies_flight_departure(self):
+        ticket = Ticket(
+            flight_id=self.flight.id, order=self.order, row=1, seat=1
+        )
+        ticket.save()
+
+        self.assertEqual(
+            Ticket.objects.get(pk=ticket.pk).flight_departure, DEPARTURE
+        )
+
+    def test_bulk_create_copies_flight_departure(self):
+        Ticket.objects.bulk_create([
+            Ticket(flight_id=self.flight.id, order=self.order, row=1, seat=1),
+            Ticket(flight=self.flight, order=self.order, row=1, seat=2),
+        ])
+
+        self.assertEqual(
+            list(Ticket.objects.values_list("flight_departure", flat=True)),
+            [DEPARTURE, DEPARTURE],
+        )
+
+    def test_save_reads_departure_of_rescheduled_flight(self):
+        # Another process moves the flight, this one still holds the old
+        # departure in its loaded flight.
+        stale = Flight.objects.get(pk=self.flight.pk)
+        new_departure = datetime(2023, 11, 2, 8, 0, tzinfo=dt_timezone.utc)
+        Flight.objects.filter(pk=self.flight.pk).update(
+            departure_time=new_departure
+        )
+
+        ticket = Ticket(flight=stale, order=self.order, row=1, seat=1)
+        ticket.save()
+
+        self.assertEqual(
+            Ticket.objects.get(pk=ticket.pk).flight_departure, new_departure
+        )
+
+    @skipUnless(
+        connection.vendor == "postgresql", "trigger needs PostgreSQL"
+    )
+    def test_database_rejects_stale_departure(self):
+        stale = datetime(2023, 11, 2, 8, 0, tzinfo=dt_timezone.utc)
+
+        with self.assertRaises(IntegrityError) as error:
+            with transaction.atomic():
+                Ticket.objects.bulk_create([
+                    Ticket(
+                        flight=self.flight,
+                        order=self.order,
+                        row=1,
+                        seat=1,
+                        flight_departure=stale,
+                    )
+                ])
+
+        self.assertEqual(
+            error.exception.__cause__.diag.constraint_name,
+            "airport_ticket_departure",
+        )
+
+    def test_rescheduled_flight_moves_its_tickets(self):
+        Ticket.objects.create(
+            flight=self.flight, order=self.order, row=1, seat=1
+        )
+        new_departure = datetime(2023, 11, 2, 8, 0, tzinfo=dt_timezone.utc)
+
+        self.flight.departure_time = new_departure
+        self.flight.save()
+
+        self.assertEqual(
+            Ticket.objects.get().flight_departure, new_departure
+        )
+
+
+class AddMonthsTests(SimpleTestCase):
+    def test_add_months_crosses_years(self):
+        self.assertEqual(add_months(date(2023, 11, 1), 3), date(2024, 2, 1))
+        self.assertEqual(add_months(date(2024, 1, 1), -1), date(2023, 12, 1))
+
+
+@skipUnless(
+    connection.vendor == "postgresql",
+    "Tickets are partitioned on PostgreSQL only",
+)
+class TicketPartitionTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test1234",
+        )
+        self.flight = sample_flight()
+        self.order = Order.objects.create(user=user)
+
+    def partition_of(self, ticket):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT tableoid::regclass::text FROM airport_ticket "
+                "WHERE id = %s",
+                [ticket.pk],
+            )
+            return cursor.fetchone()[0]
+
+    def test_new_month_takes_rows_from_default_partition(self):
+        ticket = Ticket.objects.create(
+            flight=self.flight, order=self.order, row=1, seat=1
+        )
+        self.assertEqual(self.partition_of(ticket), "airport_ticket_default")
+
+        created = create_ticket_partitions(DEPARTURE, DEPARTURE)
+
+        self.assertEqual(created, ["airport_ticket_2023_09"])
+        self.assertEqual(self.partition_of(ticket), "airport_ticket_2023_09")
+        self.assertEqual(create_ticket_partitions(DEPARTURE, DEPARTURE), [])
+
+    def test_detach_hides_old_months(self):
+        create_ticket_partitions(DEPARTURE, add_months(DEPARTURE, 1))
+        Ticket.objects.create(
+            flight=self.flight, order=self.order, row=1, seat=1
+        )
+
+        detached = detach_ticket_partitions(date(2023, 10, 1))
+
+        self.assertEqual(detached, ["airport_ticket_2023_09"])
+        self.assertNotIn(
+            (date(2023, 9, 1), "airport_ticket_2023_09"), ticket_partitions()
+        )
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_archived_flight_can_be_deleted(self):
+        create_ticket_partitions(DEPARTURE, DEPARTURE)
+        Ticket.objects.create(
+            flight=self.flight, order=self.order, row=1, seat=1
+        )
+        detach_ticket_partitions(date(2023, 10, 1))
+
+        self.flight.delete()
+        self.order.delete()
+
+        self.assertFalse(Flight.objects.exists())
+        with connection.cursor() as cursor:
+            # The foreign keys are deferred, check them now rather than at
+            # the commit the test case never reaches.
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+            cursor.execute("SELECT count(*) FROM airport_ticket_2023_09")
+            self.assertEqual(cursor.fetchone(), (1,))
+
+    def test_reconcile_keeps_counters_of_archived_flights(self):
+        create_ticket_partitions(DEPARTURE, DEPARTURE)
+        Ticket.objects.create(
+            flight=self.flight, order=self.order, row=1, seat=1
+        )
+        self.assertIsNone(archived_before())
+        detach_ticket_partitions(date(2023, 10, 1))
+        out = StringIO()
+
+        call_command("reconcile_tickets_sold", stdout=out)
+
+        self.assertEqual(
+            archived_before(),
+            datetime(2023, 10, 1, tzinfo=dt_timezone.utc),
+        )
+        self.assertIn("0 flight(s) fixed", out.getvalue())
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 1)
+
+    def test_command_creates_months_ahead(self):
+        out = StringIO()
+
+        call_command("ticket_partitions", "--months-ahead", "2", stdout=out)
+
+        months = [month for month, _ in ticket_partitions()]
+        this_month = date.today().replace(day=1)
+        for offset in range(3):
+            self.assertIn(add_months(this_month, offset), months)
+        self.assertIn("month partition(s) attached", out.getvalue())
@@ -0,0 +1,110 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.cache.backends.db import DatabaseCache
+from django.db import connections
+from django.test import SimpleTestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from airport.models import Flight, Order
+from airport.replicas import (
+    ReplicaRouter,
+    choose_replica,
+    pin_to_primary,
+    reads_from,
+)
+from airport.tests.test_flight_api import sample_flight
+from airport.tests.test_order_api import ORDER_URL, order_payload
+
+FLIGHT_URL = reverse("airport:flight-list")
+
+
+class ReplicaRouterTests(SimpleTestCase):
+    def test_reads_use_primary_outside_reads_from(self):
+        self.assertIsNone(ReplicaRouter().db_for_read(Flight))
+
+    def test_reads_from_routes_reads_only(self):
+        router = ReplicaRouter()
+
+        with reads_from("replica"):
+            self.assertEqual(router.db_for_read(Flight), "replica")
+            self.assertEqual(router.db_for_write(Flight), "default")
+
+        self.assertIsNone(router.db_for_read(Flight))
+
+    def test_database_cache_is_read_from_primary(self):
+        cache = DatabaseCache("airport_shared_cache", {})
+
+        with reads_from("replica"):
+            self.assertIsNone(
+                ReplicaRouter().db_for_read(cache.cache_model_class)
+            )
+
+    @override_settings(AIRPORT_READ_REPLICAS=["replica"])
+    def test_replicas_are_not_migrated(self):
+        router = ReplicaRouter()
+
+        self.assertFalse(router.allow_migrate("replica", "airport"))
+        self.assertIsNone(router.allow_migrate("default", "airport"))
+
+
+@override_settings(AIRPORT_READ_REPLICAS=["replica"])
+class ReplicaReadTests(TransactionTestCase):
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        for alias in ("default", "shared"):
+            caches[alias].clear()
+            self.addCleanup(caches[alias].clear)
+        self.user = get_user_model().objects.create_user(
+            "user@test.com",
+            "test1234",
+            is_staff=True,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+
+    def test_choose_replica_until_pinned(self):
+        self.assertEqual(choose_replica(self.user), "replica")
+
+        pin_to_primary(self.user)
+
+        self.assertIsNone(choose_replica(self.user))
+
+    def test_safe_methods_read_from_replica(self):
+        with CaptureQueriesContext(connections["replica"]) as replica:
+            res = self.client.get(FLIGHT_URL)
+
+        self.assertEqual(
+            [flight["id"] for flight in res.data["results"]],
+            [self.flight.id],
+        )
+        self.assertTrue(replica.captured_queries)
+
+    def test_order_pins_user_to_primary(self):
+        self.client.post(
+            ORDER_URL,
+            order_payload(self.flight, [(1, 1)]),
+            format="json"
+        )
+
+        with CaptureQueriesContext(connections["replica"]) as replica:
+            res = self.client.get(ORDER_URL)
+
+        self.assertEqual(replica.captured_queries, [])
+        self.assertEqual(
+            res.data["results"][0]["id"], Order.objects.get().id
+        )
+
+    def test_writes_go_to_primary(self):
+        with CaptureQueriesContext(connections["replica"]) as replica:
+            self.client.post(
+                ORDER_URL,
+                order_payload(self.flight, [(1, 1)]),
+                format="json"
+            )
+
+        self.assertEqual(replica.captured_queries, [])
+        self.assertTrue(Order.objects.exists())
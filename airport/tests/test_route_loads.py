@@ -0,0 +1,189 @@
+from datetime import date
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Flight, RouteDailyLoad, Ticket
+from airport.tests.test_flight_api import (
+    sample_airplane,
+    sample_flight,
+    sample_route,
+)
+from airport.tests.test_order_api import ORDER_URL, order_payload
+
+ROUTE_LOAD_URL = reverse("airport:route-load-list")
+DAY = date(2023, 9, 20)
+
+
+def route_loads():
+    return list(
+        RouteDailyLoad.objects.order_by("route_id", "day").values_list(
+            "route_id", "day", "flights", "seats", "sold"
+        )
+    )
+
+
+class RouteDailyLoadTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@test.com",
+            "test1234",
+            is_staff=True,
+        )
+        self.client.force_authenticate(self.user)
+        self.route = sample_route()
+        self.airplane = sample_airplane(rows=10, seats_in_row=9)
+        self.flight = sample_flight(route=self.route, airplane=self.airplane)
+
+    def test_flight_adds_its_seats(self):
+        sample_flight(route=self.route, airplane=self.airplane)
+
+        self.assertEqual(route_loads(), [(self.route.id, DAY, 2, 180, 0)])
+
+    def test_order_increments_sold_seats(self):
+        self.client.post(
+            ORDER_URL,
+            order_payload(self.flight, [(1, 1), (1, 2)]),
+            format="json"
+        )
+        self.client.post(
+            ORDER_URL,
+            order_payload(self.flight, [(2, 1)]),
+            format="json"
+        )
+
+        self.assertEqual(route_loads(), [(self.route.id, DAY, 1, 90, 3)])
+
+    def test_rejected_order_leaves_rollup(self):
+        self.client.post(
+            ORDER_URL,
+            order_payload(self.flight, [(1, 1)]),
+            format="json"
+        )
+
+        res = self.client.post(
+            ORDER_URL,
+            order_payload(self.flight, [(1, 2), (1, 1)]),
+            format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(route_loads(), [(self.route.id, DAY, 1, 90, 1)])
+
+    def test_deleted_ticket_frees_seat(self):
+        self.client.post(
+            ORDER_URL,
+            order_payload(self.flight, [(1, 1), (1, 2)]),
+            format="json"
+        )
+
+        Ticket.objects.filter(row=1, seat=2).get().delete()
+
+        self.assertEqual(route_loads(), [(self.route.id, DAY, 1, 90, 1)])
+
+    def test_rescheduled_flight_moves_day(self):
+        self.client.post(
+            ORDER_URL,
+            order_payload(self.flight, [(1, 1)]),
+            format="json"
+        )
+        flight = Flight.objects.get(pk=self.flight.pk)
+
+        flight.departure_time = "2023-09-22T10:00:00Z"
+        flight.save()
+
+        self.assertEqual(
+            route_loads(), [(self.route.id, date(2023, 9, 22), 1, 90, 1)]
+        )
+
+    def test_deleted_flight_removes_day(self):
+        self.flight.delete()
+
+        self.assertEqual(route_loads(), [])
+
+    def test_resized_airplane_changes_seats(self):
+        self.airplane.rows = 20
+        self.airplane.save()
+
+        self.assertEqual(route_loads(), [(self.route.id, DAY, 1, 180, 0)])
+
+    def test_rebuild_command_matches_incremental_rollup(self):
+        self.client.post(
+            ORDER_URL,
+            order_payload(self.flight, [(1, 1), (3, 4)]),
+            format="json"
+        )
+        expected = route_loads()
+        RouteDailyLoad.objects.update(sold=0, seats=0)
+        out = StringIO()
+
+        call_command("rebuild_route_loads", stdout=out)
+
+        self.assertEqual(route_loads(), expected)
+        self.assertIn("1 route day(s) rebuilt", out.getvalue())
+
+
+class RouteLoadApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(
+            "admin@test.com",
+            "test1234",
+            is_staff=True,
+        )
+        self.client.force_authenticate(self.admin)
+        self.route = sample_route()
+        sample_flight(route=self.route)
+        sample_flight(
+            route=self.route,
+            departure_time="2023-09-25T08:00:00Z",
+            arrival_time="2023-09-25T10:00:00Z",
+        )
+        sample_flight()
+
+    def test_staff_only(self):
+        user = get_user_model().objects.create_user(
+            "user@test.com",
+            "test1234",
+        )
+        self.client.force_authenticate(user)
+
+        res = self.client.get(ROUTE_LOAD_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_filter_by_route_and_dates(self):
+        res = self.client.get(
+            ROUTE_LOAD_URL,
+            {
+                "route": self.route.id,
+                "date_from": "2023-09-21",
+                "date_to": "2023-09-30",
+            },
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [
+                (row["route"], row["day"], row["load_factor"])
+                for row in res.data["results"]
+            ],
+            [(self.route.id, "2023-09-25", 0.0)],
+        )
+
+    def test_invalid_date(self):
+        res = self.client.get(ROUTE_LOAD_URL, {"date_from": "25.09.2023"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_query_count_does_not_depend_on_history(self):
+        # Throttle bucket upsert and the rollup page.
+        with self.assertNumQueries(2):
+            res = self.client.get(ROUTE_LOAD_URL)
+        self.assertEqual(len(res.data["results"]), 3)
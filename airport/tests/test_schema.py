@@ -0,0 +1,82 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from airport.schema import (
+    JSON_CONTENT_TYPE,
+    YAML_CONTENT_TYPE,
+    forget_schema,
+    generate_schema,
+)
+
+SCHEMA_URL = reverse("schema")
+
+
+class CommittedSchemaTests(SimpleTestCase):
+    def test_committed_schema_is_up_to_date(self):
+        call_command("build_schema", "--check", stdout=StringIO())
+
+
+class SchemaFileTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "schema.yml"
+        settings = override_settings(AIRPORT_SCHEMA_FILE=self.path)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        forget_schema()
+        self.addCleanup(forget_schema)
+
+    def test_check_fails_on_drift(self):
+        self.path.write_bytes(b"openapi: 3.0.3\n")
+
+        with self.assertRaisesMessage(CommandError, "out of date"):
+            call_command("build_schema", "--check", stdout=StringIO())
+
+    def test_build_writes_schema(self):
+        call_command("build_schema", stdout=StringIO())
+
+        self.assertEqual(self.path.read_bytes(), generate_schema())
+        call_command("build_schema", "--check", stdout=StringIO())
+
+    def test_serves_file_without_queries(self):
+        self.path.write_bytes(b"openapi: 3.0.3\ninfo:\n  title: Stored\n")
+
+        res = self.client.get(SCHEMA_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res["Content-Type"], YAML_CONTENT_TYPE)
+        self.assertEqual(res.content, self.path.read_bytes())
+
+    def test_json_format(self):
+        self.path.write_bytes(b"openapi: 3.0.3\ninfo:\n  title: Stored\n")
+
+        res = self.client.get(SCHEMA_URL, {"format": "json"})
+
+        self.assertEqual(res["Content-Type"], JSON_CONTENT_TYPE)
+        self.assertEqual(
+            json.loads(res.content),
+            {"openapi": "3.0.3", "info": {"title": "Stored"}},
+        )
+
+    def test_not_modified_when_etag_matches(self):
+        self.path.write_bytes(b"openapi: 3.0.3\n")
+        etag = self.client.get(SCHEMA_URL)["ETag"]
+
+        res = self.client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res.content, b"")
+
+    def test_generates_when_file_is_missing(self):
+        res = self.client.get(SCHEMA_URL)
+
+        self.assertEqual(res.content, generate_schema())
+        self.assertFalse(self.path.exists())
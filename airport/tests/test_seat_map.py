@@ -0,0 +1,158 @@
+import base64
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.inventory import SeatMap
+from airport.models import Flight, Order, Ticket
+from airport.tests.test_flight_api import sample_flight, sample_airplane
+
+
+def detail_url(flight_id):
+    return reverse("airport:flight-detail", args=[flight_id])
+
+
+class SeatMapTests(TestCase):
+    def test_add_and_contains(self):
+        seat_map = SeatMap(3, 4)
+        seat_map.add(1, 1)
+        seat_map.add(3, 4)
+
+        self.assertIn((1, 1), seat_map)
+        self.assertIn((3, 4), seat_map)
+        self.assertNotIn((2, 2), seat_map)
+        self.assertEqual(len(seat_map), 2)
+        self.assertEqual(list(seat_map), [(1, 1), (3, 4)])
+
+    def test_discard(self):
+        seat_map = SeatMap.from_tickets(2, 2, [(1, 2), (2, 1)])
+        seat_map.discard(1, 2)
+
+        self.assertEqual(list(seat_map), [(2, 1)])
+
+    def test_size_is_one_bit_per_seat(self):
+        self.assertEqual(len(SeatMap(30, 9).to_bytes()), 34)
+
+    def test_out_of_range_seat(self):
+        with self.assertRaises(IndexError):
+            SeatMap(2, 2).add(3, 1)
+
+    def test_encode(self):
+        seat_map = SeatMap.from_tickets(2, 4, [(1, 1), (2, 4)])
+
+        self.assertEqual(
+            base64.b64decode(seat_map.encode()), bytes([0b10000001])
+        )
+
+
+class FlightSeatMapApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test1234",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight(airplane=sample_airplane(rows=10))
+        self.order = Order.objects.create(user=self.user)
+
+    def test_ticket_writes_update_seat_map(self):
+        ticket = Ticket.objects.create(
+            flight=self.flight, order=self.order, row=2, seat=3
+        )
+        self.flight.refresh_from_db()
+        self.assertEqual(
+            list(SeatMap(10, 5, self.flight.seat_map)), [(2, 3)]
+        )
+
+        ticket.delete()
+        self.flight.refresh_from_db()
+        self.assertEqual(list(SeatMap(10, 5, self.flight.seat_map)), [])
+
+    def test_order_delete_frees_seats(self):
+        for seat in range(1, 4):
+            Ticket.objects.create(
+                flight=self.flight, order=self.order, row=1, seat=seat
+            )
+
+        self.order.delete()
+
+        self.flight.refresh_from_db()
+        self.assertEqual(len(SeatMap(10, 5, self.flight.seat_map)), 0)
+
+    def test_retrieve_compact_seat_map(self):
+        Ticket.objects.create(
+            flight=self.flight, order=self.order, row=1, seat=1
+        )
+        Ticket.objects.create(
+            flight=self.flight, order=self.order, row=10, seat=5
+        )
+
+        res = self.client.get(
+            detail_url(self.flight.id), {"seat_map": "compact"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn("taken_places", res.data)
+        seat_map = res.data["seat_map"]
+        self.assertEqual(seat_map["rows"], 10)
+        self.assertEqual(seat_map["seats_in_row"], 5)
+        self.assertEqual(seat_map["taken_count"], 2)
+        self.assertEqual(
+            list(SeatMap(10, 5, base64.b64decode(seat_map["taken"]))),
+            [(1, 1), (10, 5)],
+        )
+
+    def test_compact_seat_map_query_count_does_not_grow(self):
+        Ticket.objects.create(
+            flight=self.flight, order=self.order, row=1, seat=1
+        )
+        # Throttle bucket upsert, the flight and its crew.
+        with self.assertNumQueries(3):
+            self.client.get(
+                detail_url(self.flight.id), {"seat_map": "compact"}
+            )
+
+        for row in range(2, 11):
+            for seat in range(1, 6):
+                Ticket.objects.create(
+                    flight=self.flight, order=self.order, row=row, seat=seat
+                )
+        with self.assertNumQueries(3):
+            res = self.client.get(
+                detail_url(self.flight.id), {"seat_map": "compact"}
+            )
+        self.assertEqual(res.data["seat_map"]["taken_count"], 46)
+
+    def test_seat_map_rebuilt_when_airplane_changes(self):
+        Ticket.objects.create(
+            flight=self.flight, order=self.order, row=2, seat=2
+        )
+        admin = get_user_model().objects.create_user(
+            "admin@test.com", "test1234", is_staff=True
+        )
+        self.client.force_authenticate(admin)
+        airplane = sample_airplane(rows=4, seats_in_row=3)
+
+        self.client.patch(
+            detail_url(self.flight.id), {"airplane": airplane.id}
+        )
+
+        flight = Flight.objects.get(pk=self.flight.pk)
+        self.assertEqual(list(SeatMap(4, 3, flight.seat_map)), [(2, 2)])
+
+    def test_seat_map_rebuilt_when_layout_keeps_its_size(self):
+        airplane = sample_airplane(rows=10, seats_in_row=6)
+        flight = sample_flight(airplane=airplane)
+        Ticket.objects.create(flight=flight, order=self.order, row=2, seat=1)
+
+        # 10 x 6 and 12 x 5 seats both fit in 8 bytes.
+        airplane.rows, airplane.seats_in_row = 12, 5
+        airplane.save()
+
+        flight = Flight.objects.get(pk=flight.pk)
+        self.assertEqual(list(SeatMap(12, 5, flight.seat_map)), [(2, 1)])
+        self.assertEqual(flight.tickets_sold, 1)
@@ -0,0 +1,115 @@
+import time
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import ThrottleBucket
+from airport.throttling import (
+    delete_idle_buckets,
+    take_token,
+    SharedUserRateThrottle,
+)
+
+FLIGHT_URL = reverse("airport:flight-list")
+
+
+class TakeTokenTests(TestCase):
+    def test_bucket_depletes(self):
+        results = [take_token("k", 3, 60, now=100.0)[0] for _ in range(4)]
+
+        self.assertEqual(results, [True, True, True, False])
+        self.assertEqual(ThrottleBucket.objects.get(key="k").tokens, 0)
+
+    def test_bucket_refills_over_time(self):
+        for _ in range(3):
+            take_token("k", 3, 60, now=100.0)
+
+        self.assertFalse(take_token("k", 3, 60, now=110.0)[0])
+        allowed, tokens = take_token("k", 3, 60, now=120.0)
+
+        self.assertTrue(allowed)
+        self.assertAlmostEqual(tokens, 0.0)
+
+    def test_refill_is_capped_at_capacity(self):
+        take_token("k", 3, 60, now=100.0)
+
+        allowed, tokens = take_token("k", 3, 60, now=10_000.0)
+
+        self.assertTrue(allowed)
+        self.assertEqual(tokens, 2)
+
+    def test_buckets_are_independent(self):
+        take_token("a", 1, 60, now=100.0)
+
+        self.assertTrue(take_token("b", 1, 60, now=100.0)[0])
+
+    def test_one_query_per_request(self):
+        take_token("k", 100, 60)
+
+        with self.assertNumQueries(1):
+            take_token("k", 100, 60)
+
+
+class DeleteIdleBucketsTests(TestCase):
+    def test_only_refilled_buckets_are_deleted(self):
+        take_token("idle", 3, 60, now=100.0)
+        take_token("busy", 3, 60, now=150.0)
+
+        self.assertEqual(delete_idle_buckets(60, now=170.0), 1)
+
+        self.assertEqual(
+            list(ThrottleBucket.objects.values_list("key", flat=True)),
+            ["busy"],
+        )
+
+    def test_command_defaults_to_longest_rate(self):
+        take_token("old", 3, 60, now=time.time() - 2 * 24 * 3600)
+        take_token("recent", 3, 60)
+        out = StringIO()
+
+        # The anon and user rates are per day.
+        call_command("prune_throttle_buckets", stdout=out)
+
+        self.assertEqual(
+            list(ThrottleBucket.objects.values_list("key", flat=True)),
+            ["recent"],
+        )
+        self.assertIn(
+            "1 bucket(s) idle for over 86400s deleted", out.getvalue()
+        )
+
+
+class SharedThrottleApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test1234",
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_requests_over_rate_are_throttled(self):
+        with mock.patch.object(
+            SharedUserRateThrottle, "THROTTLE_RATES", {"user": "2/min"}
+        ):
+            codes = [
+                self.client.get(FLIGHT_URL).status_code for _ in range(3)
+            ]
+
+        self.assertEqual(
+            codes,
+            [
+                status.HTTP_200_OK,
+                status.HTTP_200_OK,
+                status.HTTP_429_TOO_MANY_REQUESTS,
+            ],
+        )
+
+    def test_benchmark_command(self):
+        call_command("benchmark_throttle", requests=20, verbosity=0)
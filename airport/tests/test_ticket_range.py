@@ -0,0 +1,102 @@
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+
+from airport.inventory import forget_airplane_dimensions
+from airport.models import Airplane, Order, Ticket
+from airport.tests.test_flight_api import sample_flight, sample_airplane
+
+
+class TicketRangeTests(TestCase):
+    def setUp(self):
+        forget_airplane_dimensions()
+        self.addCleanup(forget_airplane_dimensions)
+        user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test1234",
+        )
+        self.airplane = sample_airplane(rows=10, seats_in_row=5)
+        self.flight = sample_flight(airplane=self.airplane)
+        self.order = Order.objects.create(user=user)
+
+    def test_save_validates_with_cached_dimensions(self):
+        Ticket(
+            flight_id=self.flight.id, order=self.order, row=1, seat=1
+        ).save()
+
+        # Savepoint and flight lock, which also reads the departure, the
+        # ticket INSERT, the seat map and route load UPDATEs and release.
+        with self.assertNumQueries(6):
+            Ticket(
+                flight_id=self.flight.id, order=self.order, row=1, seat=2
+            ).save()
+
+    def test_out_of_range_save_keeps_message(self):
+        ticket = Ticket(
+            flight_id=self.flight.id, order=self.order, row=11, seat=1
+        )
+
+        with self.assertRaises(ValidationError) as error:
+            ticket.save()
+
+        self.assertEqual(
+            error.exception.message_dict,
+            {"row": [
+                "row number must be in available range: (1, rows): (1, 10)"
+            ]},
+        )
+
+    @skipUnless(
+        connection.vendor == "postgresql", "trigger needs PostgreSQL"
+    )
+    def test_database_rejects_out_of_range_bulk_create(self):
+        with self.assertRaises(IntegrityError) as error:
+            with transaction.atomic():
+                Ticket.objects.bulk_create([
+                    Ticket(flight=self.flight, order=self.order, row=1, seat=6)
+                ])
+
+        self.assertEqual(
+            Ticket.range_violation(error.exception).message_dict,
+            {"seat": [
+                "seat number must be in available range: "
+                "(1, seats_in_row): (1, 5)"
+            ]},
+        )
+
+    @skipUnless(
+        connection.vendor == "postgresql", "trigger needs PostgreSQL"
+    )
+    def test_database_check_wins_over_stale_dimensions(self):
+        Ticket(
+            flight_id=self.flight.id, order=self.order, row=1, seat=1
+        ).save()
+        # Changed behind the back of the dimension cache.
+        Airplane.objects.filter(pk=self.airplane.pk).update(rows=5)
+
+        with self.assertRaises(ValidationError) as error:
+            with transaction.atomic():
+                Ticket(
+                    flight_id=self.flight.id, order=self.order, row=8, seat=1
+                ).save()
+
+        self.assertEqual(
+            error.exception.message_dict,
+            {"row": [
+                "row number must be in available range: (1, rows): (1, 5)"
+            ]},
+        )
+
+    def test_duplicate_seat_is_left_to_unique_index(self):
+        Ticket.objects.create(
+            flight=self.flight, order=self.order, row=1, seat=1
+        )
+
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                Ticket.objects.create(
+                    flight=self.flight, order=self.order, row=1, seat=1
+                )
@@ -0,0 +1,131 @@
+import time
+
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.models import Flight
+from airport.serializers import FlightListSerializer
+from airport.timing import (
+    ServerTimingMiddleware,
+    collect_timings,
+    reset_view_histograms,
+    view_histograms,
+)
+from airport.tests.test_flight_api import sample_flight, sample_airplane
+
+FLIGHT_URL = reverse("airport:flight-list")
+ASYNC_FLIGHT_URL = reverse("airport:async-flight-list")
+
+
+def parse_server_timing(header):
+    metrics = {}
+    for metric in header.split(", "):
+        name, *params = metric.split(";")
+        metrics[name] = dict(param.split("=", 1) for param in params)
+    return metrics
+
+
+class ServerTimingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test1234",
+        )
+        self.client.force_authenticate(self.user)
+        airplane = sample_airplane()
+        for _ in range(3):
+            sample_flight(airplane=airplane)
+        reset_view_histograms()
+        self.addCleanup(reset_view_histograms)
+
+    def test_header_reports_queries_and_stages(self):
+        with self.assertNumQueries(2) as captured:
+            res = self.client.get(FLIGHT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        metrics = parse_server_timing(res["Server-Timing"])
+        self.assertEqual(set(metrics), {"db", "serialize", "total"})
+        self.assertEqual(
+            metrics["db"]["desc"], f'"{len(captured)} queries"'
+        )
+        self.assertGreater(float(metrics["serialize"]["dur"]), 0)
+        self.assertGreaterEqual(
+            float(metrics["total"]["dur"]), float(metrics["db"]["dur"])
+        )
+
+    def test_async_view_is_measured(self):
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+        res = client.get(ASYNC_FLIGHT_URL)
+
+        metrics = parse_server_timing(res["Server-Timing"])
+        self.assertRegex(metrics["db"]["desc"], r'^"[1-9]\d* queries"$')
+        self.assertGreater(float(metrics["serialize"]["dur"]), 0)
+
+    def test_histograms_per_view_name(self):
+        for _ in range(2):
+            self.client.get(FLIGHT_URL)
+        self.client.get(reverse("airport:airport-list"))
+        self.client.get("/api/airport/missing/")
+
+        histograms = view_histograms()
+
+        self.assertEqual(
+            set(histograms), {"airport:flight-list", "airport:airport-list"}
+        )
+        flights = histograms["airport:flight-list"]
+        self.assertEqual(flights["count"], 2)
+        self.assertEqual(sum(flights["buckets"].values()), 2)
+        # Throttle bucket upsert and the page of flights, twice.
+        self.assertEqual(flights["queries"], 4)
+        self.assertGreater(flights["total_ms"], flights["db_ms"])
+
+    @override_settings(AIRPORT_SERVER_TIMING_HEADER=False)
+    def test_header_can_be_turned_off(self):
+        res = self.client.get(FLIGHT_URL)
+
+        self.assertNotIn("Server-Timing", res)
+        self.assertEqual(view_histograms()["airport:flight-list"]["count"], 1)
+
+
+class CollectTimingsTests(TestCase):
+    def test_nested_serializers_are_not_counted_twice(self):
+        airplane = sample_airplane()
+        flights = [sample_flight(airplane=airplane) for _ in range(20)]
+
+        start = time.perf_counter()
+        with collect_timings() as timings:
+            FlightListSerializer(flights, many=True).data
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        self.assertFalse(timings.serializing)
+        self.assertGreater(timings.serialize_ms, 0)
+        self.assertLessEqual(timings.serialize_ms, elapsed_ms)
+
+    def test_queries_are_counted(self):
+        with collect_timings() as timings:
+            Flight.objects.count()
+            list(Flight.objects.all())
+
+        self.assertEqual(timings.queries, 2)
+        self.assertGreater(timings.db_ms, 0)
+
+    def test_middleware_stays_async_under_asgi(self):
+        async def get_response(request):
+            pass
+
+        self.assertTrue(
+            iscoroutinefunction(ServerTimingMiddleware(get_response))
+        )
+        self.assertFalse(
+            iscoroutinefunction(ServerTimingMiddleware(lambda request: None))
+        )
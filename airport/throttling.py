@@ -0,0 +1,142 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.db import connection
+from rest_framework.throttling import (
+    AnonRateThrottle,
+    SimpleRateThrottle,
+    UserRateThrottle,
+)
+
+from airport.metrics import THROTTLED_REQUESTS
+from airport.models import ThrottleBucket
+
+
+def _take_token_sql():
+    quote = connection.ops.quote_name
+    table = quote(ThrottleBucket._meta.db_table)
+    key, tokens, updated_at, allowed = (
+        quote(column) for column in ("key", "tokens", "updated_at", "allowed")
+    )
+    refilled = (
+        f"({table}.{tokens} + (%(now)s - {table}.{updated_at}) * %(rate)s)"
+    )
+    refilled = (
+        f"(CASE WHEN {refilled} > %(capacity)s THEN %(capacity)s "
+        f"ELSE {refilled} END)"
+    )
+    return (
+        f"INSERT INTO {table} ({key}, {tokens}, {updated_at}, {allowed}) "
+        f"VALUES (%(key)s, %(capacity)s - 1, %(now)s, TRUE) "
+        f"ON CONFLICT ({key}) DO UPDATE SET "
+        f"{tokens} = CASE WHEN {refilled} >= 1 THEN {refilled} - 1 "
+        f"ELSE {refilled} END, "
+        f"{allowed} = {refilled} >= 1, "
+        f"{updated_at} = %(now)s "
+        f"RETURNING {allowed}, {tokens}"
+    )
+
+
+def take_token(key, capacity, duration, now=None):
+    """Take one token from the bucket ``key`` in a single statement.
+
+    The bucket holds up to ``capacity`` tokens and refills at
+    ``capacity / duration`` tokens per second. Returns ``(allowed, tokens)``
+    where ``tokens`` is what is left after the request.
+    """
+    params = {
+        "key": key,
+        "capacity": float(capacity),
+        "rate": capacity / duration,
+        "now": time.time() if now is None else now,
+    }
+    with connection.cursor() as cursor:
+        cursor.execute(_take_token_sql(), params)
+        allowed, tokens = cursor.fetchone()
+    return bool(allowed), tokens
+
+
+def refill_seconds():
+    """Return the longest duration of the configured throttle rates.
+
+    An idle bucket of any scope is full again after that many seconds.
+    """
+    durations = [
+        SimpleRateThrottle.parse_rate(None, rate)[1]
+        for rate in SimpleRateThrottle.THROTTLE_RATES.values()
+        if rate
+    ]
+    return max(durations, default=0)
+
+
+def delete_idle_buckets(idle_seconds=None, now=None):
+    """Delete buckets that were not used for ``idle_seconds``.
+
+    Defaults to ``refill_seconds()``. Such a bucket has refilled to its
+    capacity, which is what ``take_token`` starts a missing bucket with,
+    so deleting it lets no request through early. Returns the number of
+    deleted buckets.
+    """
+    if idle_seconds is None:
+        idle_seconds = refill_seconds()
+    now = time.time() if now is None else now
+    deleted, _ = ThrottleBucket.objects.filter(
+        updated_at__lt=now - idle_seconds
+    ).delete()
+    return deleted
+
+
+class SharedRateThrottleMixin:
+    """Token-bucket throttling stored in the ``ThrottleBucket`` table.
+
+    Every worker process shares the same counters, and each request costs
+    one upsert instead of reading and rewriting a list of timestamps.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        allowed, self.tokens = take_token(
+            self.key, self.num_requests, self.duration
+        )
+        if not allowed:
+            return self.throttle_failure()
+        return self.throttle_success()
+
+    def throttle_success(self):
+        return True
+
+    def throttle_failure(self):
+        THROTTLED_REQUESTS.labels(self.scope).inc()
+        return False
+
+    def wait(self):
+        return max(0.0, (1 - self.tokens) * self.duration / self.num_requests)
+
+
+class SharedAnonRateThrottle(SharedRateThrottleMixin, AnonRateThrottle):
+    pass
+
+
+class SharedUserRateThrottle(SharedRateThrottleMixin, UserRateThrottle):
+    pass
+
+
+@contextmanager
+def throttling_disabled():
+    """Let every rate-based throttle allow all requests inside the block.
+
+    Used by benchmarks, which would otherwise measure 429 responses.
+    """
+    rates = SimpleRateThrottle.THROTTLE_RATES
+    SimpleRateThrottle.THROTTLE_RATES = defaultdict(lambda: None)
+    try:
+        yield
+    finally:
+        SimpleRateThrottle.THROTTLE_RATES = rates
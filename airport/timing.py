@@ -0,0 +1,189 @@
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from airport.metrics import observe_request
+
+# Upper bounds of the view duration histogram buckets, in milliseconds.
+DURATION_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class RequestTimings:
+    """Time spent in the database and in serializers during one request"""
+
+    __slots__ = ("queries", "db_ms", "serialize_ms", "serializing")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_ms = 0.0
+        self.serialize_ms = 0.0
+        self.serializing = False
+
+
+_current = contextvars.ContextVar("airport_request_timings", default=None)
+
+
+@contextmanager
+def collect_timings():
+    """Collect queries and serializer time of the enclosed code"""
+    timings = RequestTimings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+def time_query(execute, sql, params, many, context):
+    """Database execute wrapper adding the query to the current request.
+
+    It is installed on every connection (see ``airport.signals``) and only
+    costs a context variable lookup outside of requests.
+    """
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db_ms += (time.perf_counter() - start) * 1000
+        timings.queries += 1
+
+
+class TimedSerializerMixin:
+    """Add the time spent in ``to_representation`` to the request timings.
+
+    Only the outermost serializer is timed, nested serializers and the
+    items of a ``many=True`` list are not counted twice. Queries made
+    while serializing count towards both the serializer and the database.
+    """
+
+    def to_representation(self, instance):
+        timings = _current.get()
+        if timings is None or timings.serializing:
+            return super().to_representation(instance)
+        timings.serializing = True
+        start = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            timings.serialize_ms += (time.perf_counter() - start) * 1000
+            timings.serializing = False
+
+
+class ViewHistogram:
+    """Request count, duration buckets and totals of one view"""
+
+    def __init__(self):
+        self.buckets = [0] * (len(DURATION_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.db_ms = 0.0
+        self.serialize_ms = 0.0
+        self.queries = 0
+
+    def observe(self, duration_ms, timings):
+        bucket = bisect.bisect_left(DURATION_BUCKETS_MS, duration_ms)
+        self.buckets[bucket] += 1
+        self.count += 1
+        self.total_ms += duration_ms
+        self.db_ms += timings.db_ms
+        self.serialize_ms += timings.serialize_ms
+        self.queries += timings.queries
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "buckets": dict(zip(
+                (*DURATION_BUCKETS_MS, float("inf")), self.buckets
+            )),
+            "total_ms": self.total_ms,
+            "db_ms": self.db_ms,
+            "serialize_ms": self.serialize_ms,
+            "queries": self.queries,
+        }
+
+
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+
+def observe_view(view_name, duration_ms, timings):
+    with _histograms_lock:
+        histogram = _histograms.get(view_name)
+        if histogram is None:
+            histogram = _histograms[view_name] = ViewHistogram()
+        histogram.observe(duration_ms, timings)
+
+
+def view_histograms():
+    """Return snapshots of the histograms of this process by view name"""
+    with _histograms_lock:
+        return {
+            name: histogram.snapshot()
+            for name, histogram in _histograms.items()
+        }
+
+
+def reset_view_histograms():
+    with _histograms_lock:
+        _histograms.clear()
+
+
+def server_timing_header(timings, duration_ms):
+    return (
+        f'db;dur={timings.db_ms:.1f};desc="{timings.queries} queries", '
+        f"serialize;dur={timings.serialize_ms:.1f}, "
+        f"total;dur={duration_ms:.1f}"
+    )
+
+
+class ServerTimingMiddleware:
+    """Measure every request and report it in a ``Server-Timing`` header.
+
+    Durations are added to the in-process histogram of the resolved view
+    name and to the Prometheus metrics in ``airport.metrics``. Set
+    ``AIRPORT_SERVER_TIMING_HEADER = False`` to keep collecting them
+    without exposing the header to clients. Streaming responses are
+    measured up to the first byte.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with collect_timings() as timings:
+            start = time.perf_counter()
+            response = self.get_response(request)
+        return self._finish(request, response, timings, start)
+
+    async def __acall__(self, request):
+        with collect_timings() as timings:
+            start = time.perf_counter()
+            response = await self.get_response(request)
+        return self._finish(request, response, timings, start)
+
+    def _finish(self, request, response, timings, start):
+        duration_ms = (time.perf_counter() - start) * 1000
+        if request.resolver_match is not None:
+            view_name = request.resolver_match.view_name
+            observe_view(view_name, duration_ms, timings)
+            observe_request(view_name, request.method, duration_ms, timings)
+        if getattr(settings, "AIRPORT_SERVER_TIMING_HEADER", True):
+            response["Server-Timing"] = server_timing_header(
+                timings, duration_ms
+            )
+        return response
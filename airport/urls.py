@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework import routers
 
+from airport.async_views import AsyncFlightListView, AsyncFlightDetailView
 from airport.views import (
     AirplaneTypeViewSet,
     AirplaneViewSet,
@@ -8,7 +9,8 @@ from airport.views import (
     RouteViewSet,
     CrewViewSet,
     FlightViewSet,
-    OrderViewSet
+    OrderViewSet,
+    RouteLoadListView,
 )
 
 router = routers.DefaultRouter()
@@ -22,6 +24,21 @@ router.register("orders", OrderViewSet)
 
 
 urlpatterns = [
+    path(
+        "async/flights/",
+        AsyncFlightListView.as_view(),
+        name="async-flight-list",
+    ),
+    path(
+        "async/flights/<int:pk>/",
+        AsyncFlightDetailView.as_view(),
+        name="async-flight-detail",
+    ),
+    path(
+        "analytics/route_loads/",
+        RouteLoadListView.as_view(),
+        name="route-load-list",
+    ),
     path("", include(router.urls))
 ]
 
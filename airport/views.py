@@ -1,25 +1,46 @@
-from datetime import datetime
+from datetime import datetime, time, timedelta
 
-from django.db.models import F, Count
+from django.db.models import F, Prefetch
+from django.utils import timezone
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
-from rest_framework import viewsets, mixins, status
+from rest_framework import generics, viewsets, mixins, status
 from rest_framework.decorators import action
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
+from airport.cache import CachedListMixin
+from airport.connections import connection_index
+from airport.export import (
+    FLIGHT_COLUMNS,
+    ORDER_COLUMNS,
+    TICKET_COLUMNS,
+    export_response,
+)
+from airport.fast_serializers import (
+    AirplaneValuesSerializer,
+    FastListMixin,
+    FlightListValuesSerializer,
+    RouteListValuesSerializer,
+)
+from airport.inventory import rebuild_seat_map
 from airport.models import (
     AirplaneType,
     Airplane,
     Airport,
     Route,
+    RouteDailyLoad,
     Crew,
     Flight,
-    Order
+    Order,
+    Ticket,
 )
+from airport.pagination import KeysetPagination
+from airport.partitions import archived_before
 from airport.permissions import IsAdminOrIfAuthenticatedReadOnly
+from airport.replicas import ReplicaReadMixin, pin_to_primary
 from airport.serializers import (
     AirplaneTypeSerializer,
     AirplaneSerializer,
@@ -30,14 +51,20 @@ from airport.serializers import (
     FlightListSerializer,
     RouteDetailSerializer,
     FlightDetailSerializer,
+    FlightDetailSeatMapSerializer,
+    ConnectionSearchSerializer,
+    ItinerarySerializer,
     OrderSerializer,
     OrderListSerializer,
     AirplaneImageSerializer,
     RouteListSerializer,
+    RouteDailyLoadSerializer,
 )
 
 
 class AirplaneTypeViewSet(
+    ReplicaReadMixin,
+    CachedListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     GenericViewSet,
@@ -48,13 +75,18 @@ class AirplaneTypeViewSet(
 
 
 class AirplaneViewSet(
+    ReplicaReadMixin,
+    FastListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     GenericViewSet,
 ):
-    queryset = Airplane.objects.select_related("airplane_type")
+    queryset = (
+        Airplane.objects.select_related("airplane_type").order_by("id")
+    )
     serializer_class = AirplaneSerializer
+    values_serializer_class = AirplaneValuesSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
     @staticmethod
@@ -62,7 +94,7 @@ class AirplaneViewSet(
         return [int(str_id) for str_id in qs.split(",")]
 
     def get_queryset(self):
-        queryset = self.queryset
+        queryset = self.queryset.all()
 
         airplane_type = self.request.query_params.get("airplane_type")
         if airplane_type:
@@ -106,6 +138,8 @@ class AirplaneViewSet(
 
 
 class AirportViewSet(
+    ReplicaReadMixin,
+    CachedListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     GenericViewSet,
@@ -116,6 +150,9 @@ class AirportViewSet(
 
 
 class RouteViewSet(
+    ReplicaReadMixin,
+    CachedListMixin,
+    FastListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
@@ -123,14 +160,16 @@ class RouteViewSet(
 ):
     queryset = Route.objects.select_related("destination", "source")
     serializer_class = RouteSerializer
+    values_serializer_class = RouteListValuesSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_models = (Route, Airport)
 
     @staticmethod
     def _params_to_int(qs):
         return [int(str_id) for str_id in qs.split(",")]
 
     def get_queryset(self):
-        queryset = self.queryset
+        queryset = self.queryset.all()
 
         source = self.request.query_params.get("source")
         if source:
@@ -172,6 +211,8 @@ class RouteViewSet(
 
 
 class CrewViewSet(
+    ReplicaReadMixin,
+    CachedListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     GenericViewSet,
@@ -181,7 +222,92 @@ class CrewViewSet(
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
 
-class FlightViewSet(viewsets.ModelViewSet):
+def _date(params, param):
+    try:
+        return datetime.strptime(params[param], "%Y-%m-%d").date()
+    except ValueError:
+        raise ValidationError(
+            {param: "Date has wrong format. Use YYYY-MM-DD."}
+        )
+
+
+def _start_of_day(params, param, days=0):
+    date = _date(params, param)
+    return timezone.make_aware(
+        datetime.combine(date + timedelta(days=days), time.min)
+    )
+
+
+def filter_flights(queryset, params):
+    """Apply the flight list filters in ``params`` to ``queryset``"""
+    if params.get("departure_time"):
+        queryset = queryset.filter(
+            departure_time__gte=_start_of_day(params, "departure_time"),
+            departure_time__lt=_start_of_day(
+                params, "departure_time", days=1
+            ),
+        )
+
+    if params.get("departure_from"):
+        queryset = queryset.filter(
+            departure_time__gte=_start_of_day(params, "departure_from")
+        )
+
+    if params.get("departure_to"):
+        queryset = queryset.filter(
+            departure_time__lt=_start_of_day(params, "departure_to", days=1)
+        )
+
+    route_id_str = params.get("route")
+    if route_id_str:
+        route_ids = [int(str_id) for str_id in route_id_str.split(",")]
+        queryset = queryset.filter(route_id__in=route_ids)
+
+    return queryset
+
+
+def annotate_tickets_available(queryset):
+    return queryset.annotate(
+        tickets_available=(
+                F("airplane__rows") * F("airplane__seats_in_row")
+                - F("tickets_sold")
+        )
+    )
+
+
+EXPORT_FORMAT_PARAMETER = OpenApiParameter(
+    "file_format",
+    type=OpenApiTypes.STR,
+    enum=["ndjson", "csv"],
+    description="Export format, NDJSON by default (ex. ?file_format=csv)",
+)
+
+CREATED_RANGE_PARAMETERS = [
+    OpenApiParameter(
+        "created_from",
+        type=OpenApiTypes.DATE,
+        description="Filter by orders created on or after the date"
+                    " (ex. ?created_from=2023-09-01)",
+    ),
+    OpenApiParameter(
+        "created_to",
+        type=OpenApiTypes.DATE,
+        description="Filter by orders created on or before the date"
+                    " (ex. ?created_to=2023-09-30)",
+    ),
+]
+
+
+class FlightPagination(KeysetPagination):
+    ordering = ("departure_time", "id")
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+class FlightViewSet(
+    ReplicaReadMixin, FastListMixin, viewsets.ModelViewSet
+):
     queryset = (
         Flight.objects.
         select_related(
@@ -189,40 +315,52 @@ class FlightViewSet(viewsets.ModelViewSet):
             "route",
             "route__source",
             "route__destination"
-        ).
-        prefetch_related("crew", "tickets")
-        .annotate(
-            tickets_available=(
-                    F("airplane__rows") * F("airplane__seats_in_row")
-                    - Count("tickets")
-            )
         )
     )
     serializer_class = FlightSerializer
+    values_serializer_class = FlightListValuesSerializer
+    pagination_class = FlightPagination
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
-    def get_queryset(self):
-        date = self.request.query_params.get("departure_time")
-        route_id_str = self.request.query_params.get("route")
-
-        queryset = self.queryset
+    def _compact_seat_map(self):
+        return (
+            self.action == "retrieve"
+            and self.request.query_params.get("seat_map") == "compact"
+        )
 
-        if date:
-            date = datetime.strptime(date, "%Y-%m-%d").date()
-            queryset = queryset.filter(departure_time__date=date)
+    def get_queryset(self):
+        queryset = filter_flights(
+            self.queryset.all(), self.request.query_params
+        )
 
-        if route_id_str:
-            queryset = queryset.filter(route_id=int(route_id_str))
+        if self.action == "list":
+            queryset = annotate_tickets_available(queryset)
+        elif self.action == "retrieve":
+            queryset = queryset.prefetch_related("crew")
+            if not self._compact_seat_map():
+                queryset = queryset.prefetch_related("tickets")
 
         return queryset
 
     def get_serializer_class(self):
         if self.action == "list":
             return FlightListSerializer
+        if self.action == "connections":
+            return ItinerarySerializer
         if self.action == "retrieve":
+            if self._compact_seat_map():
+                return FlightDetailSeatMapSerializer
             return FlightDetailSerializer
         return FlightSerializer
 
+    def perform_update(self, serializer):
+        airplane_id = serializer.instance.airplane_id
+        flight = serializer.save()
+        if flight.airplane_id != airplane_id:
+            archived = archived_before()
+            if archived is None or flight.departure_time >= archived:
+                rebuild_seat_map(flight)
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
@@ -231,6 +369,18 @@ class FlightViewSet(viewsets.ModelViewSet):
                 description="Filter by departure_time"
                             " {ex. ?departure_time=2023-09-20)",
             ),
+            OpenApiParameter(
+                "departure_from",
+                type=OpenApiTypes.DATE,
+                description="Filter by flights departing on or after the date"
+                            " (ex. ?departure_from=2023-09-20)",
+            ),
+            OpenApiParameter(
+                "departure_to",
+                type=OpenApiTypes.DATE,
+                description="Filter by flights departing on or before the "
+                            "date (ex. ?departure_to=2023-09-27)",
+            ),
             OpenApiParameter(
                 "route",
                 type={"type": "list", "items": {"type": "number"}},
@@ -241,14 +391,88 @@ class FlightViewSet(viewsets.ModelViewSet):
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "seat_map",
+                type=OpenApiTypes.STR,
+                enum=["compact"],
+                description="Return taken seats as a base64 bitset "
+                            "instead of a list (ex. ?seat_map=compact)",
+            ),
+        ]
+    )
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
 
-class OrderPagination(PageNumberPagination):
+    @extend_schema(
+        parameters=[ConnectionSearchSerializer],
+        responses=ItinerarySerializer(many=True),
+    )
+    @action(methods=["GET"], detail=False, url_path="connections")
+    def connections(self, request):
+        """Search itineraries of up to max_legs flights between airports"""
+        params = ConnectionSearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        itineraries = connection_index.search(
+            data["source"],
+            data["destination"],
+            data["date"],
+            timedelta(minutes=data["min_layover"]),
+            timedelta(minutes=data["max_layover"]),
+            data["max_legs"],
+        )
+        flights = annotate_tickets_available(self.queryset).in_bulk(
+            {leg.flight_id for legs in itineraries for leg in legs}
+        )
+
+        results = []
+        for legs in itineraries:
+            if any(leg.flight_id not in flights for leg in legs):
+                continue
+            results.append({
+                "departure_time": legs[0].departure_time,
+                "arrival_time": legs[-1].arrival_time,
+                "duration": int(
+                    (legs[-1].arrival_time - legs[0].departure_time)
+                    .total_seconds() // 60
+                ),
+                "layovers": [
+                    int((leg.departure_time - previous.arrival_time)
+                        .total_seconds() // 60)
+                    for previous, leg in zip(legs, legs[1:])
+                ],
+                "legs": [flights[leg.flight_id] for leg in legs],
+            })
+
+        serializer = self.get_serializer(results, many=True)
+        return Response(serializer.data)
+
+    @extend_schema(
+        parameters=[EXPORT_FORMAT_PARAMETER],
+        responses={(200, "application/x-ndjson"): OpenApiTypes.STR},
+    )
+    @action(methods=["GET"], detail=False, url_path="export")
+    def export(self, request):
+        """Stream flights matching the list filters as NDJSON or CSV"""
+        queryset = filter_flights(
+            Flight.objects.order_by("departure_time", "id"),
+            request.query_params,
+        )
+        return export_response(request, queryset, FLIGHT_COLUMNS, "flights")
+
+
+class OrderPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
     page_size = 1
     page_size_query_param = "page_size"
     max_page_size = 100
 
 
 class OrderViewSet(
+    ReplicaReadMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     GenericViewSet,
@@ -259,12 +483,18 @@ class OrderViewSet(
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
     def get_queryset(self):
-        queryset = self.queryset.filter(user=self.request.user)
+        queryset = self.queryset.filter(user_id=self.request.user.id)
 
         if self.action == "list":
+            # Three queries for any page: orders, tickets and their flights
+            # with the airplane and both airports joined.
             queryset = queryset.prefetch_related(
-                "tickets__flight__route",
-                "tickets__flight__airplane"
+                Prefetch(
+                    "tickets__flight",
+                    queryset=annotate_tickets_available(
+                        FlightViewSet.queryset.all()
+                    ),
+                )
             )
 
         return queryset
@@ -275,4 +505,124 @@ class OrderViewSet(
         return OrderSerializer
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        serializer.save(user_id=self.request.user.id)
+        # The next order list of this user must show the new order.
+        pin_to_primary(self.request.user)
+
+    def _created_range(self, queryset, field):
+        params = self.request.query_params
+        if params.get("created_from"):
+            queryset = queryset.filter(**{
+                f"{field}__gte": _start_of_day(params, "created_from")
+            })
+        if params.get("created_to"):
+            queryset = queryset.filter(**{
+                f"{field}__lt": _start_of_day(params, "created_to", days=1)
+            })
+        return queryset
+
+    @extend_schema(
+        parameters=[EXPORT_FORMAT_PARAMETER, *CREATED_RANGE_PARAMETERS],
+        responses={(200, "application/x-ndjson"): OpenApiTypes.STR},
+    )
+    @action(methods=["GET"], detail=False, url_path="export")
+    def export(self, request):
+        """Stream orders as NDJSON or CSV, every user's orders for staff"""
+        queryset = Order.objects.order_by("id")
+        if not request.user.is_staff:
+            queryset = queryset.filter(user_id=request.user.id)
+        queryset = self._created_range(queryset, "created_at")
+        return export_response(request, queryset, ORDER_COLUMNS, "orders")
+
+    @extend_schema(
+        parameters=[EXPORT_FORMAT_PARAMETER, *CREATED_RANGE_PARAMETERS],
+        responses={(200, "application/x-ndjson"): OpenApiTypes.STR},
+    )
+    @action(methods=["GET"], detail=False, url_path="tickets/export")
+    def export_tickets(self, request):
+        """Stream tickets of the orders as NDJSON or CSV"""
+        queryset = Ticket.objects.order_by("id")
+        if not request.user.is_staff:
+            queryset = queryset.filter(order__user_id=request.user.id)
+        queryset = self._created_range(queryset, "order__created_at")
+        return export_response(
+            request, queryset, TICKET_COLUMNS, "tickets"
+        )
+
+
+class RouteLoadPagination(KeysetPagination):
+    ordering = ("day", "id")
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+
+class RouteLoadListView(ReplicaReadMixin, generics.ListAPIView):
+    """Load factor per route and departure day, for staff only.
+
+    Served from the ``RouteDailyLoad`` rollup, so a page costs one indexed
+    range scan however many tickets were sold.
+    """
+
+    queryset = RouteDailyLoad.objects.select_related(
+        "route__source", "route__destination"
+    )
+    serializer_class = RouteDailyLoadSerializer
+    pagination_class = RouteLoadPagination
+    permission_classes = (IsAdminUser,)
+
+    def get_queryset(self):
+        params = self.request.query_params
+        queryset = self.queryset.all()
+
+        if params.get("date_from"):
+            queryset = queryset.filter(day__gte=_date(params, "date_from"))
+        if params.get("date_to"):
+            queryset = queryset.filter(day__lte=_date(params, "date_to"))
+
+        for param, lookup in (
+            ("route", "route_id__in"),
+            ("source", "route__source_id__in"),
+            ("destination", "route__destination_id__in"),
+        ):
+            if params.get(param):
+                queryset = queryset.filter(**{
+                    lookup: RouteViewSet._params_to_int(params[param])
+                })
+
+        return queryset
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "date_from",
+                type=OpenApiTypes.DATE,
+                description="Filter by departure days on or after the date"
+                            " (ex. ?date_from=2023-09-01)",
+            ),
+            OpenApiParameter(
+                "date_to",
+                type=OpenApiTypes.DATE,
+                description="Filter by departure days on or before the date"
+                            " (ex. ?date_to=2023-09-30)",
+            ),
+            OpenApiParameter(
+                "route",
+                type={"type": "list", "items": {"type": "number"}},
+                description="Filter by route id (ex. ?route=1,2)",
+            ),
+            OpenApiParameter(
+                "source",
+                type={"type": "list", "items": {"type": "number"}},
+                description="Filter by source airport id (ex. ?source=2,5)",
+            ),
+            OpenApiParameter(
+                "destination",
+                type={"type": "list", "items": {"type": "number"}},
+                description="Filter by destination airport id "
+                            "(ex. ?destination=2,5)",
+            ),
+        ]
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
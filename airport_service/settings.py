@@ -23,9 +23,13 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = os.environ["DJANGO_SECRET_KEY"]
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.environ.get("DJANGO_DEBUG", "1") == "1"
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [
+    host.strip()
+    for host in os.environ.get("DJANGO_ALLOWED_HOSTS", "").split(",")
+    if host.strip()
+]
 
 
 # Application definition
@@ -39,7 +43,6 @@ INSTALLED_APPS = [
     "django.contrib.staticfiles",
     'drf_spectacular',
     "rest_framework_simplejwt",
-    "debug_toolbar",
     "rest_framework",
     "rest_framework.authtoken",
     "airport",
@@ -47,8 +50,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "airport.timing.ServerTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -57,6 +60,15 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# The toolbar middleware is sync only, under ASGI it would run every
+# request through a thread, so it is left out unless debugging.
+if DEBUG:
+    INSTALLED_APPS.append("debug_toolbar")
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index("django.middleware.security.SecurityMiddleware") + 1,
+        "debug_toolbar.middleware.DebugToolbarMiddleware",
+    )
+
 
 ROOT_URLCONF = "airport_service.urls"
 
@@ -92,6 +104,60 @@ DATABASES = {
     }
 }
 
+# Read replicas, e.g. POSTGRES_REPLICA_HOSTS=replica-1,replica-2. The
+# "replica" alias always exists so tests can route to it; it points at
+# the primary and stays unused while no replica host is set.
+REPLICA_HOSTS = [
+    host.strip()
+    for host in os.environ.get("POSTGRES_REPLICA_HOSTS", "").split(",")
+    if host.strip()
+]
+for index, host in enumerate(REPLICA_HOSTS or [DATABASES["default"]["HOST"]]):
+    DATABASES["replica" if index == 0 else f"replica_{index + 1}"] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["airport.replicas.ReplicaRouter"]
+
+# The "shared" cache holds state every worker process has to see. It is
+# Redis when REDIS_URL is set, e.g. redis://redis:6379/0, and otherwise
+# the table created by "python manage.py createcachetable".
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "shared": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ["REDIS_URL"],
+    } if os.environ.get("REDIS_URL") else {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "airport_shared_cache",
+    },
+}
+
+# Aliases that safe-method API reads are spread over.
+AIRPORT_READ_REPLICAS = [
+    alias for alias in DATABASES if alias != "default"
+] if REPLICA_HOSTS else []
+
+# Serve the flight, route and airplane lists from values() rows and
+# precomputed converters instead of model instances and ModelSerializers.
+# The output is identical, compare both with benchmark_serializers.
+AIRPORT_FAST_LISTS = False
+
+# Catalog list versions are kept in the shared cache and remembered by
+# every worker for AIRPORT_CATALOG_VERSION_TTL seconds, which bounds how
+# long other workers keep serving a list cached before a change.
+AIRPORT_CATALOG_VERSION_CACHE = "shared"
+AIRPORT_CATALOG_VERSION_TTL = 5
+
+# Seconds a user reads from the primary after creating an order. The pin
+# is kept in this cache, which has to be shared by all workers.
+AIRPORT_REPLICA_PIN_SECONDS = 10
+AIRPORT_REPLICA_PIN_CACHE = "shared"
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -142,19 +208,39 @@ INTERNAL_IPS = [
     "127.0.0.1",
 ]
 
+# Bearer token that lets a scraper outside INTERNAL_IPS read /metrics.
+AIRPORT_METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
 REST_FRAMEWORK = {
     # YOUR SETTINGS
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "airport.throttling.SharedAnonRateThrottle",
+        "airport.throttling.SharedUserRateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {"anon": "10/day", "user": "100/day"},
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.StatelessJWTAuthentication",
     ),
 }
 
+SIMPLE_JWT = {
+    "TOKEN_OBTAIN_SERIALIZER": (
+        "user.authentication.UserClaimsTokenObtainPairSerializer"
+    ),
+    "TOKEN_REFRESH_SERIALIZER": (
+        "user.authentication.ActiveUserTokenRefreshSerializer"
+    ),
+}
+
+# Cache holding the marks of revoked access tokens, has to be shared by
+# all workers.
+AIRPORT_TOKEN_REVOCATION_CACHE = "shared"
+# Seconds a worker keeps the answer of the revocation cache locally, so
+# the shared cache is not read on every request. Revocations made by
+# other workers apply after at most that long.
+AIRPORT_TOKEN_REVOCATION_TTL = 2
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Airport Service API",
     "DESCRIPTION": "Order tickets for your flights",
@@ -167,3 +253,6 @@ SPECTACULAR_SETTINGS = {
         "defaultModelExpandDepth": 2,
     },
 }
+
+# Precomputed schema served at /api/schema/, written by build_schema.
+AIRPORT_SCHEMA_FILE = BASE_DIR / "schema.yml"
@@ -0,0 +1,172 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from rest_framework import exceptions
+from rest_framework_simplejwt.authentication import (
+    JWTStatelessUserAuthentication,
+)
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+def _revocation_cache():
+    return caches[
+        getattr(settings, "AIRPORT_TOKEN_REVOCATION_CACHE", "default")
+    ]
+
+
+def _local_cache():
+    """Return the per-process cache in front of the revocation cache.
+
+    None when both are the same cache, a local copy would shorten the
+    lifetime of the marks.
+    """
+    alias = getattr(
+        settings, "AIRPORT_TOKEN_REVOCATION_LOCAL_CACHE", "default"
+    )
+    if caches[alias] is _revocation_cache():
+        return None
+    return caches[alias]
+
+
+def _local_ttl():
+    return getattr(settings, "AIRPORT_TOKEN_REVOCATION_TTL", 2)
+
+
+def _revocation_key(user_id):
+    return f"airport:tokens-revoked:{user_id}"
+
+
+def revoked_at(user_id):
+    """Return when the access tokens of a user were last revoked, or None.
+
+    The answer, also when there is no mark, is kept in the local cache for
+    ``AIRPORT_TOKEN_REVOCATION_TTL`` seconds, so a shared cache without
+    Redis is not queried on every request. Marks set by another worker
+    apply after at most that long, those of this worker at once.
+    """
+    key = _revocation_key(user_id)
+    local = _local_cache()
+    if local is None:
+        return _revocation_cache().get(key)
+    mark = local.get(key)
+    if mark is None:
+        mark = _revocation_cache().get(key, 0)
+        local.set(key, mark, _local_ttl())
+    return mark or None
+
+
+async def arevoked_at(user_id):
+    key = _revocation_key(user_id)
+    local = _local_cache()
+    if local is None:
+        return await _revocation_cache().aget(key)
+    mark = await local.aget(key)
+    if mark is None:
+        mark = await _revocation_cache().aget(key, 0)
+        await local.aset(key, mark, _local_ttl())
+    return mark or None
+
+
+def add_user_claims(token, user):
+    """Sign the fields the API checks on every request into ``token``.
+
+    ``claims_time`` records when they were read with sub-second precision,
+    the whole-second ``iat`` cannot tell a token obtained right after a
+    change from one obtained right before it.
+    """
+    token["email"] = user.email
+    token["is_staff"] = user.is_staff
+    token["claims_time"] = time.time()
+
+
+def revoke_tokens(user_id):
+    """Reject the access tokens issued to a user until now.
+
+    Called when the claims of the user change or the user is deactivated.
+    The mark only has to outlive the access tokens, refreshing reloads the
+    user. It has to live in a cache shared by all workers to hold across
+    them, see ``revoked_at``.
+    """
+    leeway = jwt_settings.LEEWAY
+    if not isinstance(leeway, timedelta):
+        leeway = timedelta(seconds=leeway)
+    lifetime = jwt_settings.ACCESS_TOKEN_LIFETIME + leeway
+    key, mark = _revocation_key(user_id), time.time()
+    _revocation_cache().set(key, mark, int(lifetime.total_seconds()) + 1)
+    local = _local_cache()
+    if local is not None:
+        local.set(key, mark, _local_ttl())
+
+
+def check_not_revoked(token, revoked_at):
+    if revoked_at is None:
+        return
+    if token.get("claims_time", token.get("iat", 0)) < revoked_at:
+        raise exceptions.AuthenticationFailed(
+            "Token was issued before the user changed",
+            code="token_revoked",
+        )
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """JWT authentication that builds the user from the signed claims.
+
+    ``request.user`` is a ``TokenUser`` with the ``user_id``, ``email`` and
+    ``is_staff`` claims instead of a ``User`` row, so authenticating costs
+    a cached lookup of ``revoke_tokens`` marks instead of a query.
+    """
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        check_not_revoked(validated_token, revoked_at(user.id))
+        return user
+
+    async def aget_user(self, validated_token):
+        user = super().get_user(validated_token)
+        check_not_revoked(validated_token, await arevoked_at(user.id))
+        return user
+
+
+class UserClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        add_user_claims(token, user)
+        return token
+
+
+class ActiveUserTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refresh an access token with the current claims of its user.
+
+    Costs one query per refresh, so users that were deactivated or deleted
+    get no new access tokens and changed claims are picked up.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        user = get_user_model().objects.filter(
+            **{
+                jwt_settings.USER_ID_FIELD: refresh.get(
+                    jwt_settings.USER_ID_CLAIM
+                ),
+                "is_active": True,
+            }
+        ).first()
+        if user is None:
+            raise exceptions.AuthenticationFailed(
+                "User is inactive", code="user_inactive"
+            )
+
+        data = super().validate(attrs)
+        access = AccessToken(data["access"])
+        add_user_claims(access, user)
+        data["access"] = str(access)
+        return data
@@ -0,0 +1,30 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import (
+    SimpleJWTScheme,
+    TokenObtainPairSerializerExtension,
+    TokenRefreshSerializerExtension,
+)
+
+# The simplejwt extensions only match their exact classes, these keep the
+# schema of the subclasses in user.authentication unchanged.
+
+
+class StatelessJWTScheme(SimpleJWTScheme):
+    target_class = "user.authentication.StatelessJWTAuthentication"
+
+
+class UserClaimsTokenObtainPairSerializerExtension(
+    TokenObtainPairSerializerExtension
+):
+    target_class = "user.authentication.UserClaimsTokenObtainPairSerializer"
+
+    def get_name(self, auto_schema, direction):
+        return "TokenObtainPair"
+
+
+class ActiveUserTokenRefreshSerializerExtension(
+    TokenRefreshSerializerExtension
+):
+    target_class = "user.authentication.ActiveUserTokenRefreshSerializer"
+
+    def get_name(self, auto_schema, direction):
+        return "TokenRefresh"
@@ -3,8 +3,10 @@ from rest_framework import serializers
 from django.utils.translation import gettext as _
 from rest_framework.exceptions import ValidationError
 
+from airport.timing import TimedSerializerMixin
 
-class UserSerializer(serializers.ModelSerializer):
+
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
 
     class Meta:
         model = get_user_model()
@@ -0,0 +1,32 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from user.authentication import revoke_tokens
+from user.models import User
+
+# Changing one of these makes the access tokens issued before invalid.
+TOKEN_FIELDS = ("email", "is_staff", "is_active", "password")
+
+
+@receiver(pre_save, sender=User)
+def remember_token_fields(sender, instance, raw=False, **kwargs):
+    instance._previous_token_fields = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_token_fields = User.objects.filter(
+        pk=instance.pk
+    ).values_list(*TOKEN_FIELDS).first()
+
+
+@receiver(post_save, sender=User)
+def revoke_changed_user_tokens(sender, instance, raw=False, **kwargs):
+    previous = getattr(instance, "_previous_token_fields", None)
+    if raw or previous is None:
+        return
+    if previous != tuple(getattr(instance, field) for field in TOKEN_FIELDS):
+        revoke_tokens(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def revoke_deleted_user_tokens(sender, instance, **kwargs):
+    revoke_tokens(instance.pk)
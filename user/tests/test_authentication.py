@@ -0,0 +1,193 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.models import Order
+from airport.tests.test_flight_api import sample_flight
+from airport.tests.test_order_api import ORDER_URL, order_payload
+
+TOKEN_OBTAIN_URL = reverse("user:token_obtain_pair")
+TOKEN_REFRESH_URL = reverse("user:token_refresh")
+ROUTE_LOAD_URL = reverse("airport:route-load-list")
+
+
+class StatelessAuthenticationTests(APITestCase):
+    def setUp(self):
+        for alias in ("default", "shared"):
+            caches[alias].clear()
+            self.addCleanup(caches[alias].clear)
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="admin@test.com", password="test1234", is_staff=True
+        )
+
+    def obtain_tokens(self):
+        res = self.client.post(
+            TOKEN_OBTAIN_URL,
+            {"email": "admin@test.com", "password": "test1234"},
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data["access"], res.data["refresh"]
+
+    def get_route_loads(self, access):
+        return self.client.get(
+            ROUTE_LOAD_URL, HTTP_AUTHORIZATION=f"Bearer {access}"
+        )
+
+    def test_token_carries_user_claims(self):
+        access, _ = self.obtain_tokens()
+
+        token = AccessToken(access)
+
+        self.assertEqual(token["email"], "admin@test.com")
+        self.assertTrue(token["is_staff"])
+
+    def test_staff_request_without_user_query(self):
+        access, _ = self.obtain_tokens()
+        self.get_route_loads(access)
+
+        # Throttle bucket upsert and the rollup page, the revocation mark
+        # of the first request is still in the local cache.
+        with self.assertNumQueries(2):
+            res = self.get_route_loads(access)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_token_without_staff_claim_is_not_staff(self):
+        res = self.get_route_loads(AccessToken.for_user(self.user))
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_deactivated_user_token_is_revoked(self):
+        access, refresh = self.obtain_tokens()
+
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertEqual(
+            self.get_route_loads(access).status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+        res = self.client.post(TOKEN_REFRESH_URL, {"refresh": refresh})
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_demoted_user_token_is_revoked(self):
+        access, _ = self.obtain_tokens()
+
+        self.user.is_staff = False
+        self.user.save()
+
+        self.assertEqual(
+            self.get_route_loads(access).status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+
+    def test_token_obtained_right_after_change_is_accepted(self):
+        self.user.set_password("test5678")
+        self.user.save()
+
+        res = self.client.post(
+            TOKEN_OBTAIN_URL,
+            {"email": "admin@test.com", "password": "test5678"},
+        )
+
+        self.assertEqual(
+            self.get_route_loads(res.data["access"]).status_code,
+            status.HTTP_200_OK,
+        )
+
+    def test_unrelated_change_keeps_token(self):
+        access, _ = self.obtain_tokens()
+
+        self.user.first_name = "Ivan"
+        self.user.save()
+
+        self.assertEqual(
+            self.get_route_loads(access).status_code, status.HTTP_200_OK
+        )
+
+    def test_refresh_uses_current_claims(self):
+        _, refresh = self.obtain_tokens()
+        self.user.is_staff = False
+        self.user.save()
+
+        res = self.client.post(TOKEN_REFRESH_URL, {"refresh": refresh})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(AccessToken(res.data["access"])["is_staff"])
+
+    def test_order_is_created_for_token_user(self):
+        access, _ = self.obtain_tokens()
+        flight = sample_flight()
+
+        res = self.client.post(
+            ORDER_URL,
+            order_payload(flight, [(1, 1)]),
+            format="json",
+            HTTP_AUTHORIZATION=f"Bearer {access}",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Order.objects.get().user_id, self.user.id)
+
+
+@override_settings(CACHES={
+    alias: {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": alias,
+    }
+    for alias in ("default", "worker-1", "worker-2", "shared")
+})
+class RevocationAcrossWorkersTests(APITestCase):
+    """The local caches "worker-1" and "worker-2" stand for two workers."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="admin@test.com", password="test1234", is_staff=True
+        )
+        self.access = AccessToken.for_user(self.user)
+        self.access["is_staff"] = True
+
+    def get_in_worker(self, worker):
+        with override_settings(AIRPORT_TOKEN_REVOCATION_LOCAL_CACHE=worker):
+            return self.client.get(
+                ROUTE_LOAD_URL, HTTP_AUTHORIZATION=f"Bearer {self.access}"
+            )
+
+    def demote_in_worker(self, worker):
+        with override_settings(AIRPORT_TOKEN_REVOCATION_LOCAL_CACHE=worker):
+            self.user.is_staff = False
+            self.user.save()
+
+    @override_settings(AIRPORT_TOKEN_REVOCATION_TTL=0)
+    def test_revocation_in_other_worker_rejects_token(self):
+        self.assertEqual(
+            self.get_in_worker("worker-1").status_code, status.HTTP_200_OK
+        )
+
+        self.demote_in_worker("worker-2")
+
+        self.assertEqual(
+            self.get_in_worker("worker-1").status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+
+    @override_settings(AIRPORT_TOKEN_REVOCATION_TTL=60)
+    def test_other_worker_keeps_answer_until_ttl(self):
+        self.assertEqual(
+            self.get_in_worker("worker-1").status_code, status.HTTP_200_OK
+        )
+
+        self.demote_in_worker("worker-2")
+
+        self.assertEqual(
+            self.get_in_worker("worker-1").status_code, status.HTTP_200_OK
+        )
+        self.assertEqual(
+            self.get_in_worker("worker-2").status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
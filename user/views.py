@@ -1,5 +1,5 @@
+from django.contrib.auth import get_user_model
 from rest_framework import generics
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.settings import api_settings
@@ -18,8 +18,8 @@ class CreateTokenView(ObtainAuthToken):
 
 class ManageUserView(generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
-    authentication_classes = (TokenAuthentication, )
     permission_classes = (IsAuthenticated, )
 
     def get_object(self):
-        return self.request.user
+        # request.user is built from the token claims, edit the stored user.
+        return get_user_model().objects.get(pk=self.request.user.pk)